@@ -91,6 +91,18 @@ class Llamada(Nodo):
         return visitor.visit_llamada(self)
 
 
+class DefinicionFuncion(Nodo):
+    """Nodo para la definición de una función del usuario: f(x, y) = cuerpo"""
+    
+    def __init__(self, nombre, parametros, cuerpo):
+        self.nombre = nombre
+        self.parametros = parametros
+        self.cuerpo = cuerpo
+    
+    def accept(self, visitor):
+        return visitor.visit_definicion_funcion(self)
+
+
 class Sentencia(Nodo):
     """Nodo para una sentencia (expresión con o sin punto y coma)"""
     
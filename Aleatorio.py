@@ -0,0 +1,78 @@
+"""
+Flujos de números aleatorios reproducibles
+
+Cada evaluador tiene su propio FlujoAleatorio, inicializado con una
+semilla explícita (o una aleatoria que queda registrada). Los valores se
+generan por bloques que se rellenan de una sola vez, y de un flujo pueden
+derivarse flujos hijos independientes y deterministas, por ejemplo uno
+por proceso de trabajo:
+
+    flujo = FlujoAleatorio(semilla=42)
+    hijo = flujo.derivar(indice_trabajador)
+"""
+
+import hashlib
+import os
+import random
+
+
+# Cantidad de valores que se generan en cada relleno del bloque
+TAM_BLOQUE = 1024
+
+
+class FlujoAleatorio:
+    """Flujo de números aleatorios uniformes en [0, 1)"""
+    
+    def __init__(self, semilla=None, tam_bloque=TAM_BLOQUE):
+        """
+        Constructor
+        
+        Args:
+            semilla: int - Semilla del flujo; si es None se elige una al azar
+            tam_bloque: int - Valores generados por cada relleno
+        """
+        if semilla is None:
+            semilla = int.from_bytes(os.urandom(16), "big")
+        self.semilla = semilla
+        self.tam_bloque = tam_bloque
+        self.reiniciar()
+    
+    def reiniciar(self):
+        """Vuelve al inicio del flujo (repite la misma secuencia)"""
+        self._generador = random.Random(self.semilla)
+        self._bloque = iter(())
+    
+    def siguiente(self):
+        """
+        Retorna el siguiente valor del flujo
+        
+        Returns:
+            float: Número en [0, 1)
+        """
+        try:
+            return next(self._bloque)
+        except StopIteration:
+            self._rellenar()
+            return next(self._bloque)
+    
+    def derivar(self, indice):
+        """
+        Crea un flujo hijo independiente
+        
+        La semilla del hijo se obtiene de (semilla, indice), de modo que el
+        mismo índice produce siempre la misma secuencia sin importar cuántos
+        valores se hayan consumido del flujo padre.
+        
+        Args:
+            indice: int - Identificador del hijo (p. ej. número de proceso)
+        
+        Returns:
+            FlujoAleatorio: Flujo hijo
+        """
+        resumen = hashlib.sha256(f"{self.semilla}:{indice}".encode()).digest()
+        return FlujoAleatorio(int.from_bytes(resumen[:16], "big"), self.tam_bloque)
+    
+    def _rellenar(self):
+        """Genera un bloque completo de valores"""
+        aleatorio = self._generador.random
+        self._bloque = iter([aleatorio() for _ in range(self.tam_bloque)])
@@ -0,0 +1,126 @@
+"""
+Cadenas de texto con concatenación en tiempo constante (rope)
+
+Una Cuerda representa la concatenación de dos fragmentos (str o Cuerda)
+sin copiarlos. El texto completo solo se construye cuando se necesita
+(al imprimir, comparar o pasar el valor a una función) y se guarda para
+los siguientes usos. Así, un ciclo de sentencias 's = s + "x"' cuesta
+tiempo lineal en lugar de cuadrático.
+
+Al serializarse con pickle (imágenes de sesión, entorno en disco,
+procesos de trabajo) una Cuerda se guarda como el str que representa.
+"""
+
+
+# Por debajo de esta longitud se concatena directamente con str
+MIN_LONGITUD_CUERDA = 64
+
+
+class Cuerda:
+    """Nodo inmutable de concatenación de texto"""
+    
+    # _contenido es el par (izquierda, derecha) o, una vez aplanada, el
+    # texto completo; se reemplaza con una sola asignación
+    __slots__ = ("_contenido", "_longitud", "_nodos")
+    
+    def __init__(self, izquierda, derecha):
+        """
+        Constructor
+        
+        Args:
+            izquierda: str | Cuerda - Fragmento izquierdo
+            derecha: str | Cuerda - Fragmento derecho
+        """
+        self._contenido = (izquierda, derecha)
+        self._longitud = len(izquierda) + len(derecha)
+        self._nodos = 1 + getattr(izquierda, "_nodos", 0) + getattr(derecha, "_nodos", 0)
+    
+    @property
+    def nodos(self):
+        """Nodos de concatenación que ocupa la cuerda (0 si ya se aplanó)"""
+        return 0 if type(self._contenido) is str else self._nodos
+    
+    def aplanar(self):
+        """
+        Construye (una sola vez) el texto completo
+        
+        Returns:
+            str: Texto representado por la cuerda
+        """
+        contenido = self._contenido
+        if type(contenido) is str:
+            return contenido
+        
+        # Recorrido iterativo: las cuerdas construidas por concatenación
+        # repetida son muy profundas
+        partes = []
+        pendientes = [contenido[1], contenido[0]]
+        while pendientes:
+            nodo = pendientes.pop()
+            if type(nodo) is str:
+                partes.append(nodo)
+                continue
+            contenido = nodo._contenido
+            if type(contenido) is str:
+                partes.append(contenido)
+            else:
+                pendientes.append(contenido[1])
+                pendientes.append(contenido[0])
+        
+        texto = "".join(partes)
+        # Se liberan los fragmentos y se conserva solo el texto plano
+        self._contenido = texto
+        return texto
+    
+    def __str__(self):
+        return self.aplanar()
+    
+    def __repr__(self):
+        return repr(self.aplanar())
+    
+    def __len__(self):
+        return self._longitud
+    
+    def __eq__(self, otro):
+        if isinstance(otro, (str, Cuerda)):
+            return str(self) == str(otro)
+        return NotImplemented
+    
+    def __hash__(self):
+        return hash(self.aplanar())
+    
+    def __reduce__(self):
+        # Se serializa como str: las cuerdas profundas excederían el límite
+        # de recursión de pickle
+        return (str, (self.aplanar(),))
+
+
+def concatenar(izquierda, derecha):
+    """
+    Concatena dos textos (str o Cuerda)
+    
+    Args:
+        izquierda: str | Cuerda - Texto izquierdo
+        derecha: str | Cuerda - Texto derecho
+    
+    Returns:
+        str | Cuerda: str si el resultado es corto, Cuerda en otro caso
+    """
+    if len(izquierda) + len(derecha) < MIN_LONGITUD_CUERDA:
+        return str(izquierda) + str(derecha)
+    return Cuerda(izquierda, derecha)
+
+
+def aplanar(valor):
+    """
+    Convierte una Cuerda en str; cualquier otro valor se retorna sin cambios
+    
+    Args:
+        valor: object - Valor del lenguaje
+    
+    Returns:
+        object: El valor con las cuerdas convertidas a str
+    """
+    if type(valor) is Cuerda:
+        return valor.aplanar()
+    return valor
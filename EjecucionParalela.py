@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ejecución en paralelo de las sentencias independientes de un script
+
+planificar() analiza cada línea y determina qué recursos lee y escribe:
+variables, funciones (con el nombre seguido de "()") y EFECTOS, que
+representa el estado compartido de las funciones impuras como rand().
+Con esos conjuntos se arma un grafo de dependencias (lectura después de
+escritura, escritura después de lectura y escritura después de escritura)
+en el que las sentencias que usan rand() quedan en su orden original.
+
+ejecutar_paralelo() recorre el grafo: las sentencias puras que llaman a
+alguna función se envían a un grupo de procesos (o al ejecutor indicado)
+con una copia de las variables que leen, y el resto se ejecuta en el
+proceso principal. Las variables asignadas se aplican al entorno de la
+sesión cuando la sentencia termina, y la salida se imprime en el orden de
+las líneas, así que el resultado es el mismo que el de ejecutarlas una por
+una:
+
+    sesion = Sesion()
+    ejecutar_paralelo(sesion, ["a = f(1)", "b = g(2)", "a + b"], procesos=4)
+    
+    python EjecucionParalela.py script.txt --procesos 4
+"""
+
+import argparse
+import copy
+import hashlib
+import heapq
+import io
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from ASA import *
+from Cuerda import Cuerda
+from Evaluador import Evaluador
+from Funciones import REGISTRO
+from FuncionesUsuario import FuncionUsuario
+from Sesion import Sesion, CACHE_ASA
+
+
+# Recurso que escriben las llamadas a funciones impuras (rand(), ...)
+EFECTOS = "<efectos>"
+
+# Tipos de valores que se copian a los procesos de trabajo; una sentencia
+# que lee otro tipo de valor (p. ej. un arreglo) se ejecuta localmente
+TIPOS_COPIABLES = (type(None), bool, int, float, str, Cuerda)
+
+
+class Paso:
+    """Una línea del script con sus recursos y dependencias"""
+    
+    __slots__ = ("indice", "fuente", "lecturas", "escrituras", "funciones", "remoto", "clave",
+                 "dependencias")
+    
+    def __init__(self, indice, fuente, lecturas=frozenset(), escrituras=frozenset(),
+                 funciones=None, remoto=False, clave=None):
+        """
+        Constructor
+        
+        Args:
+            indice: int - Posición de la línea en el script
+            fuente: str - Código fuente de la línea
+            lecturas: frozenset - Recursos que lee
+            escrituras: frozenset - Recursos que escribe
+            funciones: dict - Funciones del usuario que llama (directa o
+                       indirectamente): nombre -> (parámetros, cuerpo)
+            remoto: bool - Si puede ejecutarse en otro proceso
+            clave: str - Clave estable de las funciones (ver
+                   _clave_funciones), o None si no se calculó
+        """
+        self.indice = indice
+        self.fuente = fuente
+        self.lecturas = lecturas
+        self.escrituras = escrituras
+        self.funciones = funciones or {}
+        self.remoto = remoto
+        self.clave = clave
+        self.dependencias = ()  # Índices de los pasos que deben terminar antes
+    
+    def __repr__(self):
+        return f"Paso({self.indice}, {self.fuente!r}, dependencias={list(self.dependencias)})"
+
+
+def planificar(fuentes, evaluador, cache_ast=None):
+    """
+    Analiza las líneas de un script y arma su grafo de dependencias
+    
+    Args:
+        fuentes: list - Líneas del script (sin líneas vacías)
+        evaluador: Evaluador - Evaluador donde se ejecutará el script (se
+                   consulta su tabla de funciones; no se modifica)
+        cache_ast: CacheASA - Caché de análisis (por defecto CACHE_ASA)
+    
+    Returns:
+        list: Un Paso por línea, con sus dependencias
+    """
+    cache_ast = CACHE_ASA if cache_ast is None else cache_ast
+    # Otros evaluadores (reactivo, asíncrono) cambian la semántica de la asignación
+    admite_remotos = type(evaluador) is Evaluador
+    definidas = {}  # Funciones definidas por el script hasta la línea actual
+    serializadas = {}  # id(cuerpo) -> ASA serializado, para las claves de funciones
+    pasos = []
+    
+    for indice, fuente in enumerate(fuentes):
+        try:
+            ast = cache_ast.analizar(fuente)
+        except Exception:
+            # Se ejecuta localmente para reportar el error en su lugar
+            pasos.append(Paso(indice, fuente))
+            continue
+        lecturas, escrituras, funciones, remoto = _recursos(ast, definidas, evaluador.funciones)
+        remoto = remoto and admite_remotos
+        clave = _clave_funciones(funciones, serializadas) if remoto else None
+        pasos.append(Paso(indice, fuente, lecturas, escrituras, funciones, remoto, clave))
+        if isinstance(ast, Sentencia) and isinstance(ast.expresion, DefinicionFuncion):
+            definicion = ast.expresion
+            definidas[definicion.nombre.lexema] = (
+                [parametro.lexema for parametro in definicion.parametros], definicion.cuerpo)
+    
+    _enlazar(pasos)
+    return pasos
+
+
+def ejecutar_paralelo(sesion, fuentes, ejecutor=None, procesos=None):
+    """
+    Ejecuta un script en una sesión, con las sentencias independientes en paralelo
+    
+    Cada línea imprime lo mismo que Sesion.ejecutar() y en el mismo orden;
+    un error en una línea no detiene las siguientes.
+    
+    Args:
+        sesion: Sesion - Sesión donde se ejecuta el script
+        fuentes: iterable - Líneas del script
+        ejecutor: Executor - Ejecutor de las sentencias remotas (por
+                  defecto un ProcessPoolExecutor que se crea si hace falta)
+        procesos: int - Procesos del ejecutor por defecto
+    
+    Returns:
+        bool: True si todas las líneas se ejecutaron sin errores
+    """
+    pasos = planificar([f for f in fuentes if f.strip()], sesion.evaluador, sesion.cache_ast)
+    faltan = [len(paso.dependencias) for paso in pasos]
+    dependientes = [[] for _ in pasos]
+    for paso in pasos:
+        for dependencia in paso.dependencias:
+            dependientes[dependencia].append(paso.indice)
+    
+    listos = [paso.indice for paso in pasos if not paso.dependencias]
+    salidas = [None] * len(pasos)
+    en_vuelo = {}  # futuro -> índice del paso
+    propio = None
+    impresos = 0
+    sin_errores = True
+    
+    def terminar(indice, texto):
+        salidas[indice] = texto
+        for dependiente in dependientes[indice]:
+            faltan[dependiente] -= 1
+            if not faltan[dependiente]:
+                heapq.heappush(listos, dependiente)
+    
+    try:
+        while impresos < len(pasos):
+            while listos:
+                paso = pasos[heapq.heappop(listos)]
+                valores = _valores(sesion.entorno, paso) if paso.remoto else None
+                # Sin nada más que hacer mientras tanto, enviarla solo agrega latencia
+                if valores is None or not (listos or en_vuelo):
+                    texto, correcto = _ejecutar_local(sesion, paso.fuente)
+                    sin_errores = sin_errores and correcto
+                    terminar(paso.indice, texto)
+                    continue
+                if ejecutor is None:
+                    ejecutor = propio = ProcessPoolExecutor(procesos)
+                futuro = ejecutor.submit(ejecutar_paso, paso.fuente, paso.funciones, valores,
+                                         paso.escrituras, sesion.presupuesto, paso.clave)
+                en_vuelo[futuro] = paso.indice
+            
+            while impresos < len(pasos) and salidas[impresos] is not None:
+                print(salidas[impresos], end="", file=sesion.salida)
+                impresos += 1
+            
+            if en_vuelo:
+                hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    indice = en_vuelo.pop(futuro)
+                    try:
+                        texto, error, cambios = futuro.result()
+                    except Exception:
+                        # Por ejemplo, un resultado que no se puede serializar:
+                        # la sentencia es pura, así que se repite localmente
+                        texto, correcto = _ejecutar_local(sesion, pasos[indice].fuente)
+                        sin_errores = sin_errores and correcto
+                    else:
+                        entorno = sesion.entorno
+                        for nombre, valor in cambios.items():
+                            entorno[nombre] = valor
+                        if error is not None:
+                            sesion.existen_errores = True
+                            sesion.ultimo_error = error
+                            sin_errores = False
+                    terminar(indice, texto)
+    finally:
+        if propio is not None:
+            propio.shutdown(cancel_futures=True)
+    return sin_errores
+
+
+# Sesión de cada hilo o proceso de trabajo
+_trabajo = threading.local()
+
+
+def ejecutar_paso(fuente, funciones, valores, escrituras, presupuesto=None, clave=None):
+    """
+    Ejecuta una sentencia en una sesión de trabajo (proceso o hilo)
+    
+    Args:
+        fuente: str - Código fuente de la línea
+        funciones: dict - Funciones del usuario: nombre -> (parámetros, cuerpo)
+        valores: dict - Variables que lee la sentencia
+        escrituras: frozenset - Recursos que puede escribir
+        presupuesto: Presupuesto - Límites de la evaluación (los de la
+                     sesión principal)
+        clave: str - Clave estable de las funciones (_clave_funciones);
+               con None no se reutiliza la sesión del paso anterior
+    
+    Returns:
+        tuple: (texto impreso, mensaje de error o None, variables asignadas)
+    """
+    sesion = getattr(_trabajo, "sesion", None)
+    # Los ASA que llegan de otro proceso son objetos nuevos: las funciones
+    # se comparan por su clave y no por identidad
+    if sesion is None or clave is None or clave != _trabajo.clave:
+        # El ejecutor puede atender a varias sesiones: las funciones del
+        # usuario de un paso anterior (que pueden ocultar una nativa) no
+        # deben quedar en la tabla, así que se parte de una sesión nueva
+        sesion = _trabajo.sesion = Sesion()
+        tabla = sesion.evaluador.funciones
+        for nombre, (parametros, cuerpo) in funciones.items():
+            tabla[nombre] = FuncionUsuario(nombre, parametros, cuerpo, tabla)
+        _trabajo.clave = clave
+    evaluador = sesion.evaluador
+    evaluador.entorno = entorno = dict(valores)
+    
+    sesion.salida = io.StringIO()
+    sesion.presupuesto = copy.copy(presupuesto)
+    if sesion.ejecutar(fuente):
+        error = None
+    else:
+        error = sesion.ultimo_error
+    cambios = {nombre: entorno[nombre] for nombre in escrituras
+               if nombre in entorno and (nombre not in valores or entorno[nombre] is not valores[nombre])}
+    return sesion.salida.getvalue(), error, cambios
+
+
+def _clave_funciones(funciones, serializadas):
+    """
+    Clave estable de las funciones del usuario que llama un paso
+    
+    Es un hash de los nombres, los parámetros y los ASA serializados de
+    las funciones, así que dos copias de las mismas definiciones tienen la
+    misma clave aunque sean objetos distintos.
+    
+    Args:
+        funciones: dict - nombre -> (parámetros, cuerpo)
+        serializadas: dict - id(cuerpo) -> ASA ya serializado (se completa)
+    
+    Returns:
+        str: Clave ("" sin funciones), o None si algún ASA no puede
+             serializarse
+    """
+    if not funciones:
+        return ""
+    resumen = hashlib.sha256()
+    for nombre in sorted(funciones):
+        parametros, cuerpo = funciones[nombre]
+        bruto = serializadas.get(id(cuerpo))
+        if bruto is None:
+            try:
+                bruto = pickle.dumps(cuerpo, pickle.HIGHEST_PROTOCOL)
+            except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+                return None
+            serializadas[id(cuerpo)] = bruto
+        resumen.update(repr((nombre, parametros)).encode())
+        resumen.update(bruto)
+    return resumen.hexdigest()
+
+
+def _recursos(ast, definidas, funciones):
+    """
+    Determina los recursos que lee y escribe una línea
+    
+    Args:
+        ast: Nodo - ASA de la línea
+        definidas: dict - Funciones definidas antes en el script
+        funciones: TablaFunciones - Funciones del evaluador
+    
+    Returns:
+        tuple: (lecturas, escrituras, funciones del usuario llamadas, remoto)
+    """
+    lecturas = set()
+    escrituras = set()
+    llamadas = {}
+    remoto = True
+    tiene_llamadas = False
+    pendientes = [(ast, ())]  # (nodo, parámetros de la función que lo contiene)
+    
+    while pendientes:
+        nodo, parametros = pendientes.pop()
+        if isinstance(nodo, Variable):
+            if nodo.nombre.lexema not in parametros:
+                lecturas.add(nodo.nombre.lexema)
+        elif isinstance(nodo, Asignacion):
+            # Dentro de una función también se asigna una variable global
+            escrituras.add(nodo.nombre.lexema)
+            pendientes.append((nodo.valor, parametros))
+        elif isinstance(nodo, Binaria):
+            pendientes.append((nodo.izquierda, parametros))
+            pendientes.append((nodo.derecha, parametros))
+        elif isinstance(nodo, (Unaria, Agrupacion, Sentencia)):
+            pendientes.append((nodo.expresion, parametros))
+        elif isinstance(nodo, DefinicionFuncion):
+            escrituras.add(nodo.nombre.lexema + "()")
+            remoto = False
+        elif isinstance(nodo, Llamada):
+            tiene_llamadas = True
+            pendientes.extend((argumento, parametros) for argumento in nodo.argumentos)
+            if not isinstance(nodo.callee, Variable):
+                pendientes.append((nodo.callee, parametros))
+                remoto = False
+                continue
+            nombre = nodo.callee.nombre.lexema
+            lecturas.add(nombre + "()")
+            if nombre in definidas:
+                definicion = definidas[nombre]
+            else:
+                funcion = funciones.get(nombre)
+                if isinstance(funcion, FuncionUsuario):
+                    definicion = (funcion.parametros, funcion.cuerpo)
+                else:
+                    if funcion is None or not funcion.pura:
+                        escrituras.add(EFECTOS)
+                        remoto = False
+                    elif nombre not in REGISTRO or REGISTRO.obtener(nombre) is not funcion:
+                        # Los procesos de trabajo solo tienen las funciones del registro
+                        remoto = False
+                    continue
+            if nombre not in llamadas:
+                llamadas[nombre] = definicion
+                pendientes.append((definicion[1], frozenset(definicion[0])))
+    
+    return frozenset(lecturas), frozenset(escrituras), llamadas, remoto and tiene_llamadas
+
+
+def _enlazar(pasos):
+    """Calcula las dependencias de cada paso según los recursos que comparte con los anteriores"""
+    ultimo_escritor = {}  # recurso -> índice
+    lectores = {}         # recurso -> índices que lo leyeron desde la última escritura
+    for paso in pasos:
+        dependencias = set()
+        for recurso in paso.lecturas:
+            if recurso in ultimo_escritor:
+                dependencias.add(ultimo_escritor[recurso])
+        for recurso in paso.escrituras:
+            if recurso in ultimo_escritor:
+                dependencias.add(ultimo_escritor[recurso])
+            dependencias.update(lectores.get(recurso, ()))
+        for recurso in paso.lecturas:
+            lectores.setdefault(recurso, []).append(paso.indice)
+        for recurso in paso.escrituras:
+            ultimo_escritor[recurso] = paso.indice
+            lectores[recurso] = []
+        dependencias.discard(paso.indice)
+        paso.dependencias = tuple(sorted(dependencias))
+
+
+def _valores(entorno, paso):
+    """Variables que lee un paso, o None si alguna no puede copiarse a otro proceso"""
+    valores = {}
+    for nombre in paso.lecturas:
+        if nombre in entorno:
+            valor = entorno[nombre]
+            if not isinstance(valor, TIPOS_COPIABLES):
+                return None
+            valores[nombre] = valor
+    return valores
+
+
+def _ejecutar_local(sesion, fuente):
+    """Ejecuta una línea en la sesión y retorna (texto impreso, sin errores)"""
+    salida = sesion.salida
+    sesion.salida = buffer = io.StringIO()
+    try:
+        correcto = sesion.ejecutar(fuente)
+    finally:
+        sesion.salida = salida
+    return buffer.getvalue(), correcto
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Args:
+        argumentos: list - Argumentos (por defecto sys.argv[1:])
+    
+    Returns:
+        int: 0 si el script se ejecutó sin errores, 1 si no
+    """
+    analizador = argparse.ArgumentParser(description="Ejecuta un script con sus sentencias independientes en paralelo")
+    analizador.add_argument("script", help="Archivo del script")
+    analizador.add_argument("--procesos", type=int, help="Procesos de trabajo (por defecto, uno por núcleo)")
+    analizador.add_argument("--hilos", action="store_true",
+                            help="Usar hilos en lugar de procesos (útil si las funciones liberan el GIL)")
+    opciones = analizador.parse_args(argumentos)
+    
+    with open(opciones.script, encoding="utf-8") as archivo:
+        fuentes = archivo.read().splitlines()
+    if opciones.hilos:
+        with ThreadPoolExecutor(opciones.procesos) as ejecutor:
+            correcto = ejecutar_paralelo(Sesion(), fuentes, ejecutor)
+    else:
+        correcto = ejecutar_paralelo(Sesion(), fuentes, procesos=opciones.procesos)
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ejecución de muchos scripts en un grupo de procesos
+
+Equivale a ejecutar `python Interprete.py < script` para cada script, pero
+sin pagar el arranque de Python en cada uno: los scripts se reparten
+entre procesos de trabajo y cada uno se ejecuta en una Sesion nueva
+(entorno vacío). El resultado de cada script se escribe en un único
+archivo JSON Lines, una línea por script, a medida que terminan:
+
+    python EjecutorLotes.py scripts/ -o resultados.jsonl --procesos 8
+    python EjecutorLotes.py --lista scripts.txt -o resultados.jsonl --tiempo-limite 10
+    
+    {"script": "scripts/a.txt", "ok": true, "error": null, "salida": "42\\n", "segundos": 0.0003}
+
+Cada proceso toma el siguiente script pendiente apenas se desocupa, así
+que un script lento solo ocupa a su proceso. Con os.fork se usa
+ServidorFork.GrupoFork (procesos precalentados; un script que excede el
+tiempo límite se termina y su proceso se reemplaza); en otros sistemas,
+un ProcessPoolExecutor sin tiempo límite.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from ServidorFork import GrupoFork, ejecutar_trabajo
+
+
+def buscar_scripts(rutas, patron="*"):
+    """
+    Lista los scripts de un conjunto de archivos y directorios
+    
+    Args:
+        rutas: iterable - Archivos y directorios (los directorios se
+               recorren recursivamente)
+        patron: str - Patrón de nombre de archivo dentro de los directorios
+    
+    Returns:
+        list: Rutas de los scripts, en orden
+    
+    Raises:
+        FileNotFoundError: Si alguna ruta no existe
+    """
+    scripts = []
+    for ruta in map(Path, rutas):
+        if ruta.is_dir():
+            scripts.extend(sorted(str(p) for p in ruta.rglob(patron) if p.is_file()))
+        elif ruta.exists():
+            scripts.append(str(ruta))
+        else:
+            raise FileNotFoundError(f"No existe el script o directorio: {ruta}")
+    return scripts
+
+
+def ejecutar_archivo(ruta):
+    """
+    Ejecuta un script en una sesión nueva
+    
+    Args:
+        ruta: str - Archivo del script (UTF-8)
+    
+    Returns:
+        dict: Resultado de ServidorFork.ejecutar_trabajo(); si el archivo
+              no se puede leer, errores es True y error tiene el motivo
+    """
+    inicio = time.perf_counter()
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            codigo = archivo.read()
+    except (OSError, UnicodeDecodeError) as ex:
+        return {"salida": "", "errores": True, "error": f"No se pudo leer el script: {ex}",
+                "segundos": time.perf_counter() - inicio}
+    return ejecutar_trabajo(codigo)
+
+
+def ejecutar_lote(scripts, destino, procesos=None, tiempo_limite=None):
+    """
+    Ejecuta varios scripts y escribe sus resultados en un archivo JSON Lines
+    
+    Args:
+        scripts: list - Rutas de los scripts
+        destino: str - Archivo de resultados (se sobrescribe)
+        procesos: int - Procesos de trabajo (por defecto os.cpu_count())
+        tiempo_limite: float - Segundos máximos por script (requiere os.fork)
+    
+    Returns:
+        dict: scripts, con_errores, segundos y por_segundo
+    """
+    procesos = procesos or os.cpu_count() or 1
+    con_errores = 0
+    inicio = time.perf_counter()
+    
+    with open(destino, "w", encoding="utf-8") as salida:
+        for indice, resultado in _repartir(scripts, procesos, tiempo_limite):
+            con_errores += bool(resultado["errores"])
+            registro = {"script": scripts[indice], "ok": not resultado["errores"],
+                        "error": resultado["error"], "salida": resultado["salida"],
+                        "segundos": resultado["segundos"]}
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    
+    segundos = time.perf_counter() - inicio
+    return {
+        "scripts": len(scripts),
+        "con_errores": con_errores,
+        "segundos": segundos,
+        "por_segundo": len(scripts) / segundos if segundos else 0.0,
+    }
+
+
+def _repartir(scripts, procesos, tiempo_limite):
+    """Genera (índice, resultado) de cada script a medida que termina"""
+    if hasattr(os, "fork"):
+        with GrupoFork(procesos, funcion=ejecutar_archivo) as grupo:
+            yield from grupo.repartir(scripts, tiempo_limite)
+        return
+    
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        futuros = {grupo.submit(ejecutar_archivo, ruta): indice for indice, ruta in enumerate(scripts)}
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Args:
+        argumentos: list - Argumentos (por defecto sys.argv[1:])
+    
+    Returns:
+        int: 0 si todos los scripts se ejecutaron sin errores, 1 si no
+    """
+    analizador = argparse.ArgumentParser(description="Ejecuta muchos scripts en un grupo de procesos")
+    analizador.add_argument("rutas", nargs="*", help="Scripts o directorios de scripts")
+    analizador.add_argument("--lista", metavar="ARCHIVO", help="Archivo con una ruta de script por línea")
+    analizador.add_argument("--patron", default="*", help="Patrón de nombre dentro de los directorios")
+    analizador.add_argument("-o", "--salida", default="resultados.jsonl", help="Archivo de resultados (JSON Lines)")
+    analizador.add_argument("--procesos", type=int, help="Procesos de trabajo (por defecto, uno por núcleo)")
+    analizador.add_argument("--tiempo-limite", type=float, metavar="SEGUNDOS", help="Tiempo máximo por script")
+    opciones = analizador.parse_args(argumentos)
+    
+    rutas = list(opciones.rutas)
+    if opciones.lista:
+        with open(opciones.lista, encoding="utf-8") as lista:
+            rutas.extend(linea.strip() for linea in lista if linea.strip())
+    if not rutas:
+        analizador.error("indique al menos un script, un directorio o --lista")
+    
+    scripts = buscar_scripts(rutas, opciones.patron)
+    resumen = ejecutar_lote(scripts, opciones.salida, opciones.procesos, opciones.tiempo_limite)
+    print(f"{resumen['scripts']} scripts en {resumen['segundos']:.2f} s "
+          f"({resumen['por_segundo']:.0f}/s), {resumen['con_errores']} con errores -> {opciones.salida}",
+          file=sys.stderr)
+    return 1 if resumen["con_errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
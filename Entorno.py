@@ -0,0 +1,320 @@
+"""
+Entorno persistente de variables
+
+EntornoPersistente es un diccionario basado en un HAMT (hash array mapped
+trie): un árbol de 32 ramas indexado por los bits del hash de cada nombre.
+Las modificaciones copian solo el camino desde la raíz hasta la hoja
+(O(log32 n)) y comparten el resto del árbol, de modo que tomar una
+instantánea o bifurcar el entorno es O(1):
+
+    entorno = EntornoPersistente()
+    evaluador = Evaluador(entorno=entorno)
+    ...
+    antes = entorno.instantanea()          # O(1), inmutable
+    try:
+        evaluador.evaluar(ast)
+    except ErrorSemantico:
+        entorno.restaurar(antes)           # O(1), deshace las asignaciones
+    
+    hipotesis = Evaluador(entorno=entorno.bifurcar())  # cambios aislados
+
+Miles de bifurcaciones de un entorno con cientos de miles de variables
+solo ocupan la memoria de los caminos que cada una modifica.
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+
+# Bits del hash que se consumen en cada nivel del árbol (32 ramas)
+BITS_POR_NIVEL = 5
+_MASCARA_NIVEL = (1 << BITS_POR_NIVEL) - 1
+_MASCARA_HASH = (1 << 64) - 1
+
+
+class _Nodo:
+    """
+    Nodo interno: 'mapa' tiene un bit por cada rama ocupada y 'hijos' las
+    ramas ocupadas en orden. Cada hijo es una hoja (hash, clave, valor),
+    otro _Nodo o una _Colision.
+    """
+    
+    __slots__ = ("mapa", "hijos")
+    
+    def __init__(self, mapa, hijos):
+        self.mapa = mapa
+        self.hijos = hijos
+
+
+class _Colision:
+    """Claves distintas con el mismo hash: pares (clave, valor)"""
+    
+    __slots__ = ("hash", "pares")
+    
+    def __init__(self, hash_, pares):
+        self.hash = hash_
+        self.pares = pares
+
+
+_VACIO = _Nodo(0, ())
+
+
+def _hash(clave):
+    return hash(clave) & _MASCARA_HASH
+
+
+def _buscar(nodo, h, clave):
+    """Retorna el valor de una clave o lanza KeyError"""
+    desplazamiento = 0
+    while True:
+        bit = 1 << ((h >> desplazamiento) & _MASCARA_NIVEL)
+        if not nodo.mapa & bit:
+            raise KeyError(clave)
+        hijo = nodo.hijos[(nodo.mapa & (bit - 1)).bit_count()]
+        tipo = type(hijo)
+        if tipo is tuple:
+            if hijo[0] == h and (hijo[1] is clave or hijo[1] == clave):
+                return hijo[2]
+            raise KeyError(clave)
+        if tipo is _Colision:
+            for otra, valor in hijo.pares:
+                if otra == clave:
+                    return valor
+            raise KeyError(clave)
+        nodo = hijo
+        desplazamiento += BITS_POR_NIVEL
+
+
+def _fusionar(hoja, h, clave, valor, desplazamiento):
+    """Crea el subárbol que contiene una hoja existente y una clave nueva"""
+    if hoja[0] == h:
+        return _Colision(h, ((hoja[1], hoja[2]), (clave, valor)))
+    indice_hoja = (hoja[0] >> desplazamiento) & _MASCARA_NIVEL
+    indice = (h >> desplazamiento) & _MASCARA_NIVEL
+    if indice_hoja == indice:
+        return _Nodo(1 << indice, (_fusionar(hoja, h, clave, valor, desplazamiento + BITS_POR_NIVEL),))
+    nueva = (h, clave, valor)
+    hijos = (hoja, nueva) if indice_hoja < indice else (nueva, hoja)
+    return _Nodo((1 << indice_hoja) | (1 << indice), hijos)
+
+
+def _asociar(nodo, h, clave, valor, desplazamiento):
+    """
+    Retorna (nodo nuevo, agregada) con la clave asociada al valor
+    
+    'agregada' indica si la clave no existía. Si el valor ya era el mismo
+    objeto se retorna el nodo original.
+    """
+    bit = 1 << ((h >> desplazamiento) & _MASCARA_NIVEL)
+    posicion = (nodo.mapa & (bit - 1)).bit_count()
+    hijos = nodo.hijos
+    
+    if not nodo.mapa & bit:
+        return _Nodo(nodo.mapa | bit, hijos[:posicion] + ((h, clave, valor),) + hijos[posicion:]), True
+    
+    hijo = hijos[posicion]
+    tipo = type(hijo)
+    if tipo is tuple:
+        if hijo[0] == h and (hijo[1] is clave or hijo[1] == clave):
+            if hijo[2] is valor:
+                return nodo, False
+            nuevo, agregada = (h, clave, valor), False
+        else:
+            nuevo, agregada = _fusionar(hijo, h, clave, valor, desplazamiento + BITS_POR_NIVEL), True
+    elif tipo is _Colision:
+        if hijo.hash == h:
+            pares = tuple(par for par in hijo.pares if par[0] != clave)
+            agregada = len(pares) == len(hijo.pares)
+            nuevo = _Colision(h, pares + ((clave, valor),))
+        else:
+            # Una colisión ocupa la rama solo mientras no haya otros hashes
+            colision = _Nodo(1 << ((hijo.hash >> (desplazamiento + BITS_POR_NIVEL)) & _MASCARA_NIVEL), (hijo,))
+            nuevo, agregada = _asociar(colision, h, clave, valor, desplazamiento + BITS_POR_NIVEL)
+    else:
+        nuevo, agregada = _asociar(hijo, h, clave, valor, desplazamiento + BITS_POR_NIVEL)
+        if nuevo is hijo:
+            return nodo, False
+    
+    return _Nodo(nodo.mapa, hijos[:posicion] + (nuevo,) + hijos[posicion + 1:]), agregada
+
+
+def _eliminar(nodo, h, clave, desplazamiento):
+    """
+    Retorna el nodo sin la clave (o una hoja/None si el nodo queda con una
+    sola hoja o vacío); lanza KeyError si la clave no existe
+    """
+    bit = 1 << ((h >> desplazamiento) & _MASCARA_NIVEL)
+    if not nodo.mapa & bit:
+        raise KeyError(clave)
+    posicion = (nodo.mapa & (bit - 1)).bit_count()
+    hijo = nodo.hijos[posicion]
+    tipo = type(hijo)
+    
+    if tipo is tuple:
+        if not (hijo[0] == h and (hijo[1] is clave or hijo[1] == clave)):
+            raise KeyError(clave)
+        nuevo = None
+    elif tipo is _Colision:
+        pares = tuple(par for par in hijo.pares if par[0] != clave)
+        if len(pares) == len(hijo.pares):
+            raise KeyError(clave)
+        nuevo = (h, pares[0][0], pares[0][1]) if len(pares) == 1 else _Colision(h, pares)
+    else:
+        nuevo = _eliminar(hijo, h, clave, desplazamiento + BITS_POR_NIVEL)
+    
+    hijos = nodo.hijos
+    if nuevo is None:
+        mapa = nodo.mapa & ~bit
+        hijos = hijos[:posicion] + hijos[posicion + 1:]
+    else:
+        mapa = nodo.mapa
+        hijos = hijos[:posicion] + (nuevo,) + hijos[posicion + 1:]
+    
+    # Un nodo que queda con una sola hoja se reemplaza por la hoja
+    if not hijos:
+        return None
+    if len(hijos) == 1 and type(hijos[0]) is not _Nodo and desplazamiento:
+        return hijos[0]
+    return _Nodo(mapa, hijos)
+
+
+def _recorrer(raiz):
+    """Genera las hojas (clave, valor) del árbol"""
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        for hijo in nodo.hijos:
+            tipo = type(hijo)
+            if tipo is tuple:
+                yield hijo[1], hijo[2]
+            elif tipo is _Colision:
+                yield from hijo.pares
+            else:
+                pendientes.append(hijo)
+
+
+class _MapaPersistente:
+    """Operaciones de lectura comunes al entorno y a sus instantáneas"""
+    
+    __slots__ = ()
+    
+    def __getitem__(self, clave):
+        return _buscar(self._raiz, hash(clave) & _MASCARA_HASH, clave)
+    
+    def __contains__(self, clave):
+        try:
+            _buscar(self._raiz, _hash(clave), clave)
+        except KeyError:
+            return False
+        return True
+    
+    def get(self, clave, defecto=None):
+        try:
+            return _buscar(self._raiz, _hash(clave), clave)
+        except KeyError:
+            return defecto
+    
+    def __iter__(self):
+        for clave, _ in _recorrer(self._raiz):
+            yield clave
+    
+    def items(self):
+        return _recorrer(self._raiz)
+    
+    def __len__(self):
+        return self._tamano
+    
+    def __repr__(self):
+        contenido = ", ".join(f"{clave!r}: {valor!r}" for clave, valor in _recorrer(self._raiz))
+        return f"{type(self).__name__}({{{contenido}}})"
+
+
+class InstantaneaEntorno(_MapaPersistente, Mapping):
+    """Vista inmutable de un entorno en un momento dado"""
+    
+    __slots__ = ("_raiz", "_tamano")
+    
+    def __init__(self, raiz=_VACIO, tamano=0):
+        self._raiz = raiz
+        self._tamano = tamano
+    
+    def __reduce__(self):
+        return (_instantanea_desde, (dict(_recorrer(self._raiz)),))
+
+
+class EntornoPersistente(_MapaPersistente, MutableMapping):
+    """
+    Diccionario de variables con instantáneas y bifurcaciones O(1).
+    
+    Se usa como cualquier diccionario (es el tipo de Evaluador.entorno);
+    cada asignación reemplaza la raíz por una nueva que comparte todo lo
+    que no cambió.
+    """
+    
+    __slots__ = ("_raiz", "_tamano")
+    
+    def __init__(self, variables=()):
+        """
+        Constructor
+        
+        Args:
+            variables: Mapping | iterable - Variables iniciales
+        """
+        self._raiz = _VACIO
+        self._tamano = 0
+        if variables:
+            self.update(variables)
+    
+    def __setitem__(self, clave, valor):
+        self._raiz, agregada = _asociar(self._raiz, _hash(clave), clave, valor, 0)
+        if agregada:
+            self._tamano += 1
+    
+    def __delitem__(self, clave):
+        raiz = _eliminar(self._raiz, _hash(clave), clave, 0)
+        self._raiz = _VACIO if raiz is None else raiz
+        self._tamano -= 1
+    
+    def clear(self):
+        self._raiz = _VACIO
+        self._tamano = 0
+    
+    def instantanea(self):
+        """
+        Toma una instantánea inmutable del entorno en O(1)
+        
+        Returns:
+            InstantaneaEntorno: Estado actual del entorno
+        """
+        return InstantaneaEntorno(self._raiz, self._tamano)
+    
+    def restaurar(self, instantanea):
+        """
+        Vuelve al estado de una instantánea en O(1)
+        
+        Args:
+            instantanea: InstantaneaEntorno - Estado a restaurar
+        """
+        self._raiz = instantanea._raiz
+        self._tamano = instantanea._tamano
+    
+    def bifurcar(self):
+        """
+        Crea en O(1) un entorno independiente con las mismas variables
+        
+        Returns:
+            EntornoPersistente: Copia cuyos cambios no afectan a este entorno
+        """
+        copia = EntornoPersistente()
+        copia._raiz = self._raiz
+        copia._tamano = self._tamano
+        return copia
+    
+    copy = bifurcar
+    
+    def __reduce__(self):
+        return (EntornoPersistente, (dict(_recorrer(self._raiz)),))
+
+
+def _instantanea_desde(variables):
+    """Reconstruye una instantánea (los hashes pueden cambiar entre procesos)"""
+    return EntornoPersistente(variables).instantanea()
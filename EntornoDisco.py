@@ -0,0 +1,284 @@
+"""
+Entorno de variables respaldado en disco
+
+EntornoDisco mantiene en memoria solo las variables usadas recientemente
+(una LRU acotada por número de variables y por bytes estimados). Las
+demás se guardan en una base SQLite local y se vuelven a cargar cuando se
+leen, de modo que una sesión puede acumular más datos que la memoria
+disponible:
+
+    entorno = EntornoDisco(max_bytes=256 * 2**20)
+    evaluador = Evaluador(entorno=entorno)
+    ...
+    entorno.estadisticas()   # aciertos, fallos, desalojos, bytes en memoria...
+
+Los valores se guardan con pickle. Una variable que se carga desde el
+disco y no se modifica no vuelve a escribirse al desalojarla.
+"""
+
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from Cuerda import Cuerda
+from Errores import ErrorSemantico
+
+
+# Límites por defecto de la parte en memoria
+MAX_VARIABLES_POR_DEFECTO = 10000
+MAX_BYTES_POR_DEFECTO = 64 * 2**20
+
+# Memoria de cada nodo de una cuerda sin aplanar: el nodo, el par de
+# fragmentos y (como máximo) un fragmento str
+TAMANO_NODO_CUERDA = sys.getsizeof(Cuerda("", "")) + sys.getsizeof(("", "")) + sys.getsizeof("")
+
+
+def estimar_tamano(valor):
+    """
+    Estima la memoria ocupada por un valor del lenguaje
+    
+    Args:
+        valor: object - Valor a medir
+    
+    Returns:
+        int: Bytes aproximados
+    """
+    if type(valor) is Cuerda:
+        return sys.getsizeof("") + len(valor) + valor.nodos * TAMANO_NODO_CUERDA
+    # Arreglos de NumPy: el búfer de datos no se incluye en getsizeof
+    nbytes = getattr(valor, "nbytes", None)
+    if isinstance(nbytes, int):
+        return sys.getsizeof(valor) + nbytes
+    return sys.getsizeof(valor)
+
+
+class EntornoDisco(MutableMapping):
+    """
+    Diccionario de variables con una parte caliente en memoria y el resto
+    en SQLite.
+    
+    Los límites (atributos max_variables y max_bytes) pueden cambiarse en
+    cualquier momento; se aplican en la siguiente modificación o con
+    ajustar(). La variable más reciente siempre se conserva en memoria,
+    aunque por sí sola supere max_bytes.
+    
+    Puede usarse desde varios hilos: la parte en memoria, los contadores
+    y la conexión se protegen con un mismo candado.
+    
+    Una variable cuyo valor no puede serializarse se informa con un error
+    semántico la primera vez que se intenta desalojarla y desde entonces
+    queda en memoria (no se guarda al volcar) hasta que se reasigna.
+    """
+    
+    def __init__(self, ruta=None, max_variables=MAX_VARIABLES_POR_DEFECTO,
+                 max_bytes=MAX_BYTES_POR_DEFECTO):
+        """
+        Constructor
+        
+        Args:
+            ruta: str - Archivo SQLite; si es None se usa un archivo
+                  temporal que se elimina al cerrar el entorno. Si el
+                  archivo ya existe, sus variables forman parte del entorno
+            max_variables: int - Máximo de variables en memoria
+            max_bytes: int - Máximo de bytes estimados en memoria
+        """
+        self.max_variables = max_variables
+        self.max_bytes = max_bytes
+        
+        temporal = self.temporal = ruta is None
+        if temporal:
+            descriptor, ruta = tempfile.mkstemp(prefix="entorno_", suffix=".sqlite")
+            os.close(descriptor)
+        self.ruta = ruta
+        
+        self._conexion = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=OFF" if temporal else "PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=OFF")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS variables (nombre TEXT PRIMARY KEY, valor BLOB NOT NULL)"
+        )
+        # Serializa el acceso a la parte en memoria, los contadores y la conexión
+        self._candado = threading.Lock()
+        self._cierre = weakref.finalize(self, _cerrar, self._conexion, ruta if temporal else None)
+        
+        self._memoria = OrderedDict()  # nombre -> [valor, tamano, sucio, residente]
+        self._en_disco = {nombre for (nombre,) in self._conexion.execute("SELECT nombre FROM variables")}
+        self._bytes = 0
+        
+        self.aciertos = 0     # Lecturas resueltas en memoria
+        self.fallos = 0       # Lecturas cargadas desde el disco
+        self.desalojos = 0    # Variables sacadas de la memoria
+        self.escrituras = 0   # Variables escritas en el disco
+    
+    def __getitem__(self, nombre):
+        with self._candado:
+            entrada = self._memoria.get(nombre)
+            if entrada is not None:
+                self._memoria.move_to_end(nombre)
+                self.aciertos += 1
+                return entrada[0]
+            
+            if nombre not in self._en_disco:
+                raise KeyError(nombre)
+            fila = self._conexion.execute(
+                "SELECT valor FROM variables WHERE nombre = ?", (nombre,)
+            ).fetchone()
+            valor = pickle.loads(fila[0])
+            self.fallos += 1
+            self._cargar(nombre, valor, sucio=False)
+            return valor
+    
+    def __setitem__(self, nombre, valor):
+        with self._candado:
+            entrada = self._memoria.pop(nombre, None)
+            if entrada is not None:
+                self._bytes -= entrada[1]
+            self._cargar(nombre, valor, sucio=True)
+    
+    def __delitem__(self, nombre):
+        with self._candado:
+            entrada = self._memoria.pop(nombre, None)
+            if entrada is not None:
+                self._bytes -= entrada[1]
+            if nombre in self._en_disco:
+                self._conexion.execute("DELETE FROM variables WHERE nombre = ?", (nombre,))
+                self._en_disco.discard(nombre)
+            elif entrada is None:
+                raise KeyError(nombre)
+    
+    def __contains__(self, nombre):
+        with self._candado:
+            return nombre in self._memoria or nombre in self._en_disco
+    
+    def __iter__(self):
+        with self._candado:
+            nombres = list(self._memoria)
+            nombres.extend(nombre for nombre in self._en_disco if nombre not in self._memoria)
+        yield from nombres
+    
+    def __len__(self):
+        with self._candado:
+            return len(self._en_disco) + sum(1 for nombre in self._memoria if nombre not in self._en_disco)
+    
+    def ajustar(self):
+        """Desaloja variables hasta respetar los límites de memoria"""
+        with self._candado:
+            self._ajustar()
+    
+    def volcar(self):
+        """Escribe en el disco todas las variables modificadas en memoria"""
+        with self._candado:
+            for nombre, entrada in self._memoria.items():
+                valor, _, sucio, residente = entrada
+                if not residente and (sucio or nombre not in self._en_disco):
+                    self._escribir(nombre, valor)
+                    entrada[2] = False
+    
+    def estadisticas(self):
+        """
+        Retorna los contadores de uso de memoria y disco
+        
+        Returns:
+            dict: Contadores y tamaños actuales
+        """
+        variables = len(self)
+        with self._candado:
+            return {
+                "variables": variables,
+                "variables_en_memoria": len(self._memoria),
+                "bytes_en_memoria": self._bytes,
+                "variables_en_disco": len(self._en_disco),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "escrituras": self.escrituras,
+            }
+    
+    def cerrar(self):
+        """
+        Cierra la base de datos
+        
+        Si es temporal se elimina; si no, antes se escriben las variables
+        modificadas que siguen en memoria.
+        """
+        if not self.temporal and self._cierre.alive:
+            self.volcar()
+        self._cierre()
+    
+    def _ajustar(self):
+        """
+        Desaloja variables hasta respetar los límites (con el candado tomado)
+        
+        Cada variable se escribe en el disco antes de sacarla de la memoria.
+        Una variable que no puede serializarse queda residente: no vuelve a
+        intentarse desalojarla hasta que se le asigne otro valor.
+        
+        Raises:
+            ErrorSemantico: Si alguna variable no pudo serializarse (los
+                            demás desalojos se completan igual)
+        """
+        memoria = self._memoria
+        error = None
+        # La variable más reciente siempre se conserva
+        for nombre in list(memoria)[:-1]:
+            if len(memoria) <= self.max_variables and self._bytes <= self.max_bytes:
+                break
+            entrada = memoria[nombre]
+            valor, tamano, sucio, residente = entrada
+            if residente:
+                continue
+            if sucio or nombre not in self._en_disco:
+                try:
+                    self._escribir(nombre, valor)
+                except ErrorSemantico as e:
+                    entrada[3] = True
+                    error = error or e
+                    continue
+            del memoria[nombre]
+            self._bytes -= tamano
+            self.desalojos += 1
+        if error is not None:
+            raise error
+    
+    def _escribir(self, nombre, valor):
+        """
+        Guarda una variable en el disco (con el candado tomado)
+        
+        Raises:
+            ErrorSemantico: Si el valor no puede serializarse
+        """
+        try:
+            datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError, TypeError, AttributeError) as e:
+            raise ErrorSemantico(
+                f"No se pudo guardar la variable '{nombre}' en el disco "
+                f"(se conserva en memoria): {e}"
+            ) from None
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO variables (nombre, valor) VALUES (?, ?)", (nombre, datos)
+        )
+        self._en_disco.add(nombre)
+        self.escrituras += 1
+    
+    def _cargar(self, nombre, valor, sucio):
+        """Agrega una variable a la parte en memoria y aplica los límites (con el candado tomado)"""
+        tamano = estimar_tamano(valor)
+        self._memoria[nombre] = [valor, tamano, sucio, False]
+        self._bytes += tamano
+        if len(self._memoria) > self.max_variables or self._bytes > self.max_bytes:
+            self._ajustar()
+
+
+def _cerrar(conexion, ruta_temporal):
+    """Cierra la conexión y elimina el archivo temporal (si lo hay)"""
+    conexion.close()
+    if ruta_temporal is not None:
+        try:
+            os.remove(ruta_temporal)
+        except OSError:
+            pass
@@ -0,0 +1,22 @@
+"""
+Excepciones compartidas por los módulos del intérprete
+
+Se definen en un módulo propio para que el evaluador y los módulos
+auxiliares (operadores, funciones, etc.) puedan usarlas sin importarse
+mutuamente.
+"""
+
+
+class ErrorSemantico(Exception):
+    """Excepción para errores semánticos durante la evaluación"""
+    pass
+
+
+class ErrorPresupuesto(ErrorSemantico):
+    """Excepción para una evaluación que agotó su presupuesto (ver Presupuesto)"""
+    pass
+
+
+class ErrorCancelado(ErrorPresupuesto):
+    """Excepción para una evaluación cancelada (ver Presupuesto.cancelar)"""
+    pass
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Evaluación de una fórmula sobre archivos más grandes que la memoria
+
+Las columnas del archivo de entrada son las variables de la fórmula. La
+entrada se lee por bloques de tamaño fijo en un hilo lector (que adelanta
+la lectura del bloque siguiente mientras se evalúa el actual) y los
+resultados se escriben a medida que se calculan, por lo que la memoria
+usada depende solo del tamaño de bloque.
+
+- CSV: cada fila se evalúa por separado (ver EvaluacionLote) y la salida
+  tiene las columnas "resultado" y "error".
+- .npy: cada columna se abre como mapa de memoria y cada bloque se evalúa
+  de una sola vez como arreglo de NumPy (ver Vectores). La salida puede
+  ser .npy o CSV.
+
+Desde la línea de comandos:
+
+    python EvaluacionFlujo.py "sqrt(x * x + y * y)" --csv datos.csv -o salida.csv
+    python EvaluacionFlujo.py "x * 2 + y" --npy x=x.npy --npy y=y.npy -o salida.npy
+"""
+
+import argparse
+import csv
+import os
+import queue
+import sys
+import threading
+from EvaluacionLote import ExpresionCompilada
+from Evaluador import ErrorSemantico
+from Funciones import FuncionBuiltIn
+import Vectores
+
+
+# Filas por bloque
+TAM_BLOQUE = 65536
+
+# Bloques leídos por adelantado (limita la memoria usada por el hilo lector)
+BLOQUES_ADELANTADOS = 2
+
+# Marca de fin de la cola del hilo lector
+_FIN = object()
+
+
+def evaluar_csv(expresion, entrada, salida, tam_bloque=TAM_BLOQUE, semilla=None):
+    """
+    Evalúa una expresión sobre cada fila de un archivo CSV
+    
+    La primera fila del CSV contiene los nombres de las columnas. Los
+    valores se convierten a int o float cuando es posible; las celdas
+    vacías son null.
+    
+    Args:
+        expresion: str - Código fuente de la expresión
+        entrada: str - Ruta del CSV de entrada
+        salida: str - Ruta del CSV de salida (columnas resultado, error)
+        tam_bloque: int - Filas por bloque
+        semilla: int - Semilla de rand()
+    
+    Returns:
+        dict: {"filas": filas evaluadas, "errores": filas con error}
+    """
+    compilada = ExpresionCompilada(expresion, semilla=semilla)
+    filas = errores = 0
+    
+    with open(entrada, newline="", encoding="utf-8") as archivo_entrada, \
+            open(salida, "w", newline="", encoding="utf-8") as archivo_salida:
+        escritor = csv.writer(archivo_salida)
+        escritor.writerow(["resultado", "error"])
+        
+        bloques = leer_en_segundo_plano(bloques_csv(archivo_entrada, tam_bloque))
+        for indice, bloque in enumerate(bloques):
+            resultados = compilada.evaluar_bloque(indice, bloque)
+            escritor.writerows(
+                (_formatear(resultado.valor), "") if resultado.ok else ("", resultado.error)
+                for resultado in resultados
+            )
+            filas += len(resultados)
+            errores += sum(1 for resultado in resultados if not resultado.ok)
+    
+    return {"filas": filas, "errores": errores}
+
+
+def evaluar_npy(expresion, columnas, salida, tam_bloque=TAM_BLOQUE, politica="nan", semilla=None):
+    """
+    Evalúa una expresión sobre columnas guardadas en archivos .npy
+    
+    Cada archivo se abre como mapa de memoria, así que solo el bloque que
+    se está evaluando se carga en memoria.
+    
+    rand() produce un valor distinto por elemento, tomado del mismo flujo
+    por bloque que la evaluación CSV (con una sola llamada a rand() los
+    resultados coinciden con los de evaluar_csv). Si un bloque produce un
+    tipo que el .npy de salida no puede representar sin pérdida (p. ej. NaN
+    en una salida entera), la salida se reescribe con el tipo común.
+    
+    Args:
+        expresion: str - Código fuente de la expresión
+        columnas: dict - Nombre de variable -> ruta del .npy (unidimensional)
+        salida: str - Ruta de salida (.npy, o CSV con la columna resultado)
+        tam_bloque: int - Elementos por bloque
+        politica: str - Política de errores elemento a elemento (ver Vectores)
+        semilla: int - Semilla de rand()
+    
+    Returns:
+        dict: {"filas": elementos evaluados, "errores": elementos cuyo
+              resultado es NaN (con la política "nan")}
+    
+    Raises:
+        ImportError: Si NumPy no está instalado
+        ValueError: Si las columnas no son unidimensionales o difieren en longitud
+        ErrorSemantico: Si un bloque produce un error con la política estricta
+    """
+    if not Vectores.DISPONIBLE:
+        raise ImportError("La lectura de archivos .npy requiere NumPy (pip install numpy)")
+    numpy = Vectores.numpy
+    
+    mapas = {nombre: numpy.load(ruta, mmap_mode="r") for nombre, ruta in columnas.items()}
+    longitudes = set()
+    for nombre, mapa in mapas.items():
+        if mapa.ndim != 1:
+            raise ValueError(f"La columna '{nombre}' no es unidimensional")
+        longitudes.add(len(mapa))
+    if len(longitudes) != 1:
+        raise ValueError("Las columnas tienen longitudes distintas")
+    total = longitudes.pop()
+    
+    compilada = ExpresionCompilada(expresion, semilla=semilla)
+    evaluador = compilada.evaluador
+    Vectores.habilitar_vectores(evaluador, politica)
+    rand = None
+    if evaluador.funciones.get("rand") is not None and evaluador.funciones["rand"].aridad == 0:
+        rand = evaluador.funciones["rand"] = _RandPorElemento()
+    
+    def bloques():
+        for inicio in range(0, total, tam_bloque):
+            # La copia hace la lectura del disco dentro del hilo lector
+            yield {nombre: numpy.array(mapa[inicio:inicio + tam_bloque]) for nombre, mapa in mapas.items()}
+    
+    escribir_npy = salida.endswith(".npy")
+    destino = None
+    archivo_csv = None
+    errores = 0
+    try:
+        if not escribir_npy:
+            archivo_csv = open(salida, "w", newline="", encoding="utf-8")
+            escritor = csv.writer(archivo_csv)
+            escritor.writerow(["resultado"])
+        
+        inicio = 0
+        for indice, bloque in enumerate(leer_en_segundo_plano(bloques())):
+            largo = len(next(iter(bloque.values())))
+            evaluador.aleatorio = compilada.flujo.derivar(indice)
+            evaluador.entorno = bloque
+            if rand is not None:
+                rand.largo = largo
+            resultado = numpy.broadcast_to(evaluador.evaluar(compilada.ast)[0], (largo,))
+            if resultado.dtype.kind in "fc":
+                errores += int(numpy.count_nonzero(numpy.isnan(resultado)))
+            
+            if escribir_npy:
+                if destino is None:
+                    destino = numpy.lib.format.open_memmap(
+                        salida, mode="w+", dtype=resultado.dtype, shape=(total,)
+                    )
+                elif not numpy.can_cast(resultado.dtype, destino.dtype, casting="safe"):
+                    tipo = numpy.result_type(destino.dtype, resultado.dtype)
+                    # El mapa debe cerrarse antes de reemplazar el archivo
+                    # (en Windows un archivo mapeado no puede reemplazarse)
+                    destino.flush()
+                    destino = None
+                    destino = _ampliar_npy(salida, tipo, inicio, tam_bloque)
+                destino[inicio:inicio + largo] = resultado
+            else:
+                escritor.writerows((_formatear(valor),) for valor in resultado.tolist())
+            inicio += largo
+        
+        if escribir_npy and destino is None:
+            numpy.save(salida, numpy.empty(0))
+    finally:
+        if destino is not None:
+            destino.flush()
+            del destino
+        if archivo_csv is not None:
+            archivo_csv.close()
+    
+    return {"filas": total, "errores": errores}
+
+
+class _RandPorElemento(FuncionBuiltIn):
+    """rand() para evaluar bloques como arreglos: un valor por elemento"""
+    
+    def __init__(self):
+        super().__init__("rand", 0)
+        self.largo = 1  # Elementos del bloque en curso
+    
+    def llamar(self, evaluador, argumentos):
+        return self.llamar0(evaluador)
+    
+    def llamar0(self, evaluador):
+        siguiente = evaluador.aleatorio.siguiente
+        numpy = Vectores.numpy
+        return numpy.fromiter((siguiente() for _ in range(self.largo)), dtype=numpy.float64, count=self.largo)
+
+
+def _ampliar_npy(salida, dtype, escritos, tam_bloque):
+    """
+    Reescribe un .npy de salida con un tipo más amplio
+    
+    El llamador debe haber cerrado su mapa del archivo (descartando todas
+    sus referencias), porque el archivo se reemplaza.
+    
+    Args:
+        salida: str - Ruta de la salida
+        dtype: numpy.dtype - Tipo nuevo de la salida
+        escritos: int - Elementos ya escritos
+        tam_bloque: int - Elementos que se copian por vez
+    
+    Returns:
+        memmap: Salida nueva, con los elementos ya escritos convertidos
+    """
+    numpy = Vectores.numpy
+    temporal = salida + ".tmp"
+    anterior = numpy.load(salida, mmap_mode="r")
+    nuevo = numpy.lib.format.open_memmap(temporal, mode="w+", dtype=dtype, shape=anterior.shape)
+    for inicio in range(0, escritos, tam_bloque):
+        fin = min(escritos, inicio + tam_bloque)
+        nuevo[inicio:fin] = anterior[inicio:fin]
+    nuevo.flush()
+    # Estas son las únicas referencias: al descartarlas se cierran los mapas
+    del nuevo, anterior
+    os.replace(temporal, salida)
+    return numpy.load(salida, mmap_mode="r+")
+
+
+def bloques_csv(archivo, tam_bloque):
+    """
+    Lee un CSV por bloques de columnas
+    
+    Args:
+        archivo: file - Archivo abierto en modo texto
+        tam_bloque: int - Filas por bloque
+    
+    Returns:
+        iterator: Bloques nombre -> lista de valores
+    """
+    lector = csv.reader(archivo)
+    nombres = next(lector, None)
+    if not nombres:
+        return
+    nombres = [nombre.strip() for nombre in nombres]
+    
+    bloque = [[] for _ in nombres]
+    for fila in lector:
+        if not fila:
+            continue
+        if len(fila) != len(nombres):
+            raise ValueError(
+                f"La fila {lector.line_num} tiene {len(fila)} valores, se esperaban {len(nombres)}"
+            )
+        for columna, texto in zip(bloque, fila):
+            columna.append(_convertir(texto))
+        if len(bloque[0]) >= tam_bloque:
+            yield dict(zip(nombres, bloque))
+            bloque = [[] for _ in nombres]
+    
+    if bloque[0]:
+        yield dict(zip(nombres, bloque))
+
+
+def leer_en_segundo_plano(bloques, adelantados=BLOQUES_ADELANTADOS):
+    """
+    Consume un iterador de bloques en un hilo lector
+    
+    El hilo lee hasta 'adelantados' bloques por delante del consumidor, de
+    modo que la lectura del disco se solapa con la evaluación. Si la
+    lectura falla, la excepción se relanza en el consumidor.
+    
+    Args:
+        bloques: iterator - Bloques a leer
+        adelantados: int - Tamaño máximo de la cola
+    
+    Returns:
+        iterator: Los mismos bloques, en orden
+    """
+    cola = queue.Queue(maxsize=adelantados)
+    detener = threading.Event()
+    
+    def poner(elemento):
+        # Espera lugar en la cola, salvo que el consumidor se haya detenido
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def leer():
+        try:
+            for bloque in bloques:
+                if not poner(bloque):
+                    return
+            poner(_FIN)
+        except BaseException as e:
+            poner(e)
+    
+    lector = threading.Thread(target=leer, name="lector-bloques", daemon=True)
+    lector.start()
+    try:
+        while True:
+            bloque = cola.get()
+            if bloque is _FIN:
+                return
+            if isinstance(bloque, BaseException):
+                raise bloque
+            yield bloque
+    finally:
+        # Si el consumidor se detiene antes del final, el lector termina
+        detener.set()
+        lector.join()
+
+
+def _convertir(texto):
+    """Convierte una celda de CSV al valor del lenguaje"""
+    if texto == "":
+        return None
+    try:
+        return int(texto)
+    except ValueError:
+        pass
+    try:
+        return float(texto)
+    except ValueError:
+        return texto
+
+
+def _formatear(valor):
+    """Formatea un resultado para el CSV de salida"""
+    if valor is None:
+        return "null"
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    return valor
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Args:
+        argumentos: list - Argumentos (por defecto sys.argv[1:])
+    
+    Returns:
+        int: Código de salida
+    """
+    analizador = argparse.ArgumentParser(
+        description="Evalúa una fórmula sobre las columnas de un CSV o de archivos .npy",
+    )
+    analizador.add_argument("expresion", help="Fórmula a evaluar; las columnas son sus variables")
+    entrada = analizador.add_mutually_exclusive_group(required=True)
+    entrada.add_argument("--csv", help="CSV de entrada (la primera fila tiene los nombres)")
+    entrada.add_argument("--npy", action="append", metavar="NOMBRE=RUTA",
+                         help="Columna .npy (puede repetirse)")
+    analizador.add_argument("-o", "--salida", required=True, help="Archivo de salida (.csv o .npy)")
+    analizador.add_argument("--bloque", type=int, default=TAM_BLOQUE, help="Filas por bloque")
+    analizador.add_argument("--politica", choices=Vectores.POLITICAS, default="nan",
+                            help="Errores elemento a elemento con .npy")
+    analizador.add_argument("--semilla", type=int, help="Semilla de rand()")
+    opciones = analizador.parse_args(argumentos)
+    
+    try:
+        if opciones.csv:
+            resumen = evaluar_csv(opciones.expresion, opciones.csv, opciones.salida,
+                                  opciones.bloque, opciones.semilla)
+        else:
+            columnas = {}
+            for especificacion in opciones.npy:
+                nombre, separador, ruta = especificacion.partition("=")
+                if not separador:
+                    analizador.error(f"Columna inválida '{especificacion}', se esperaba NOMBRE=RUTA")
+                columnas[nombre] = ruta
+            resumen = evaluar_npy(opciones.expresion, columnas, opciones.salida,
+                                  opciones.bloque, opciones.politica, opciones.semilla)
+    except ErrorSemantico as ex:
+        print(f"ERROR SEMÁNTICO: {ex}", file=sys.stderr)
+        return 1
+    except Exception as ex:
+        print(f"ERROR: {ex}", file=sys.stderr)
+        return 1
+    
+    print(f"{resumen['filas']} filas evaluadas, {resumen['errores']} con error", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Evaluación por lotes: una expresión compilada sobre muchos entornos
+
+Analiza y resuelve una expresión una sola vez y la evalúa con distintos
+valores de sus variables:
+
+    expresion = ExpresionCompilada("sqrt(x * x + y * y)")
+    expresion.evaluar({"x": 3, "y": 4})            # 5.0
+    
+    # Filas (secuencia de diccionarios)
+    expresion.evaluar_lote([{"x": 3, "y": 4}, {"x": 1, "y": 0}])
+    
+    # Columnas (nombre -> lista de valores)
+    expresion.evaluar_lote({"x": [3, 1], "y": [4, 0]}, procesos=4)
+
+Cada fila produce un ResultadoFila con su valor o con el mensaje de su
+error semántico; un error en una fila no detiene el lote. Las filas se
+procesan por bloques, opcionalmente repartidos en un grupo de procesos.
+"""
+
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+from Funciones import REGISTRO
+from Cuerda import aplanar
+
+
+# Filas por bloque (unidad de trabajo de cada proceso)
+TAM_BLOQUE = 1024
+
+# Expresiones compiladas que conserva cada proceso de trabajo
+MAX_COMPILADAS_PROCESO = 16
+
+
+class ResultadoFila:
+    """Resultado de evaluar una fila: un valor o un error"""
+    
+    __slots__ = ("valor", "error")
+    
+    def __init__(self, valor=None, error=None):
+        """
+        Constructor
+        
+        Args:
+            valor: object - Resultado de la expresión
+            error: str - Mensaje del error semántico, o None si no hubo error
+        """
+        self.valor = valor
+        self.error = error
+    
+    @property
+    def ok(self):
+        """True si la fila se evaluó sin errores"""
+        return self.error is None
+    
+    def __eq__(self, otro):
+        if not isinstance(otro, ResultadoFila):
+            return NotImplemented
+        return self.valor == otro.valor and self.error == otro.error
+    
+    def __repr__(self):
+        if self.error is not None:
+            return f"ResultadoFila(error={self.error!r})"
+        return f"ResultadoFila({self.valor!r})"
+
+
+class ExpresionCompilada:
+    """
+    Expresión analizada y resuelta una sola vez, evaluable sobre muchos
+    entornos.
+    
+    Cada fila se evalúa en un entorno nuevo con sus variables, de modo que
+    las asignaciones de una fila no afectan a las demás. Para que rand()
+    sea reproducible sin importar cuántos procesos se usen, cada bloque
+    recibe un flujo derivado de la semilla de la expresión y del número de
+    bloque.
+    """
+    
+    def __init__(self, expresion, registro=REGISTRO, semilla=None):
+        """
+        Constructor
+        
+        Args:
+            expresion: str - Código fuente de la expresión
+            registro: RegistroFunciones - Funciones disponibles
+            semilla: int - Semilla de rand(); si es None se elige una al azar
+        
+        Raises:
+            Exception: Si la expresión tiene errores léxicos o sintácticos
+            ErrorSemantico: Si llama a funciones inexistentes o con otra aridad
+        """
+        self.expresion = expresion
+        self.registro = registro
+        self.evaluador = Evaluador(registro=registro, semilla=semilla)
+        self.semilla = self.evaluador.aleatorio.semilla
+        self.flujo = self.evaluador.aleatorio  # Flujo base de rand() (se deriva por bloque)
+        ast = Parser(Scanner(expresion).scan()).parse()
+        self.ast = self.evaluador.compilar(ast)
+    
+    def evaluar(self, variables=None):
+        """
+        Evalúa la expresión con un conjunto de variables
+        
+        Args:
+            variables: dict - Valores de las variables (nombre -> valor)
+        
+        Returns:
+            object: Resultado de la expresión
+        
+        Raises:
+            ErrorSemantico: Si ocurre un error durante la evaluación
+        """
+        evaluador = self.evaluador
+        evaluador.entorno = dict(variables) if variables else {}
+        return aplanar(evaluador.evaluar(self.ast)[0])
+    
+    def evaluar_lote(self, datos, tam_bloque=TAM_BLOQUE, procesos=None):
+        """
+        Evalúa la expresión sobre muchas filas
+        
+        Args:
+            datos: iterable | Mapping - Secuencia de diccionarios (una fila
+                   cada uno) o diccionario de columnas (nombre -> lista)
+            tam_bloque: int - Filas por bloque
+            procesos: int - Procesos de trabajo; None evalúa en este proceso
+        
+        Returns:
+            list: Un ResultadoFila por fila, en el mismo orden
+        
+        Raises:
+            ValueError: Si las columnas tienen longitudes distintas, o si se
+                        piden procesos con un registro distinto de REGISTRO
+        """
+        if tam_bloque < 1:
+            raise ValueError("tam_bloque debe ser al menos 1")
+        bloques = dividir_en_bloques(datos, tam_bloque)
+        
+        if procesos is not None and procesos > 1:
+            # Los procesos de trabajo vuelven a compilar la expresión con el
+            # registro global (un registro propio no puede enviarse)
+            if self.registro is not REGISTRO:
+                raise ValueError("La evaluación con procesos solo admite el registro global de funciones")
+            bloques = list(bloques)
+            if len(bloques) > 1:
+                with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                    partes = ejecutor.map(
+                        _evaluar_bloque_en_proceso,
+                        repeat(self.expresion), repeat(self.semilla),
+                        range(len(bloques)), bloques,
+                    )
+                    return [resultado for parte in partes for resultado in parte]
+        
+        resultados = []
+        for indice, bloque in enumerate(bloques):
+            resultados.extend(self.evaluar_bloque(indice, bloque))
+        return resultados
+    
+    def evaluar_bloque(self, indice, bloque):
+        """
+        Evalúa un bloque de filas
+        
+        Args:
+            indice: int - Número de bloque (determina el flujo de rand())
+            bloque: list | dict - Filas, o columnas con la misma longitud
+        
+        Returns:
+            list: Un ResultadoFila por fila
+        """
+        evaluador = self.evaluador
+        ast = self.ast
+        evaluador.aleatorio = self.flujo.derivar(indice)
+        
+        resultados = []
+        for fila in filas_de_bloque(bloque):
+            evaluador.entorno = fila
+            try:
+                resultados.append(ResultadoFila(aplanar(evaluador.evaluar(ast)[0])))
+            except ErrorSemantico as e:
+                resultados.append(ResultadoFila(error=str(e)))
+        return resultados
+
+
+def dividir_en_bloques(datos, tam_bloque):
+    """
+    Divide los datos de entrada en bloques
+    
+    Los datos por columnas se dividen en columnas más cortas (que se envían
+    a otros procesos sin crear un diccionario por fila); las filas se leen
+    de forma perezosa, por lo que pueden venir de un generador.
+    
+    Args:
+        datos: iterable | Mapping - Filas o columnas
+        tam_bloque: int - Filas por bloque
+    
+    Returns:
+        iterator: Bloques (list de filas o dict de columnas)
+    
+    Raises:
+        ValueError: Si las columnas tienen longitudes distintas
+    """
+    if isinstance(datos, Mapping):
+        columnas = {nombre: list(valores) for nombre, valores in datos.items()}
+        longitudes = {len(valores) for valores in columnas.values()}
+        if len(longitudes) > 1:
+            raise ValueError("Las columnas tienen longitudes distintas")
+        total = longitudes.pop() if longitudes else 0
+        return (
+            {nombre: valores[inicio:inicio + tam_bloque] for nombre, valores in columnas.items()}
+            for inicio in range(0, total, tam_bloque)
+        )
+    
+    filas = iter(datos)
+    return iter(lambda: list(islice(filas, tam_bloque)), [])
+
+
+def filas_de_bloque(bloque):
+    """
+    Genera un entorno nuevo (dict) por cada fila de un bloque
+    
+    Args:
+        bloque: list | dict - Filas, o columnas con la misma longitud
+    
+    Returns:
+        iterator: Diccionarios nombre -> valor
+    """
+    if isinstance(bloque, Mapping):
+        nombres = list(bloque)
+        return (dict(zip(nombres, valores)) for valores in zip(*bloque.values()))
+    return (dict(fila) for fila in bloque)
+
+
+# Expresiones ya compiladas en este proceso: (expresion, semilla) -> ExpresionCompilada
+_compiladas = {}
+
+
+def _evaluar_bloque_en_proceso(expresion, semilla, indice, bloque):
+    """Evalúa un bloque dentro de un proceso de trabajo"""
+    clave = (expresion, semilla)
+    compilada = _compiladas.get(clave)
+    if compilada is None:
+        if len(_compiladas) >= MAX_COMPILADAS_PROCESO:
+            _compiladas.clear()
+        compilada = _compiladas[clave] = ExpresionCompilada(expresion, semilla=semilla)
+    return compilada.evaluar_bloque(indice, bloque)
@@ -5,128 +5,102 @@ Este módulo implementa el patrón Visitor para recorrer y evaluar el ASA.
 Ejecuta las operaciones representadas en el ASA y maneja errores semánticos.
 """
 
-import math
-import random
 from TipoToken import TipoToken
 from ASA import *
+from Errores import ErrorSemantico
+from Operadores import TablaOperadores, nombre_tipo
+from Cuerda import Cuerda, aplanar
+from Resolutor import Resolutor
+from Memoizacion import CacheFunciones
+from Funciones import FuncionBuiltIn, FuncionTipada, Firma, TablaFunciones, REGISTRO
+from FuncionesUsuario import FuncionUsuario
 
 
-class ErrorSemantico(Exception):
-    """Excepción para errores semánticos durante la evaluación"""
-    pass
+# Número máximo de sitios de llamada resueltos que se mantienen en caché
+MAX_SITIOS = 4096
 
+# Nombres que antes se definían en este módulo y ahora viven en Matematicas,
+# que se importa solo cuando se solicitan (ver __getattr__)
+_NOMBRES_MATEMATICAS = ("FuncionRand", "FuncionSin", "FuncionCos", "FuncionSqrt",
+                        "FuncionPow", "potencia_entera", "MAX_BITS_POTENCIA")
 
-class FuncionBuiltIn:
-    """Clase base para funciones built-in del lenguaje"""
+
+def __getattr__(nombre):
+    """Importa bajo demanda los nombres trasladados a Matematicas"""
+    if nombre in _NOMBRES_MATEMATICAS:
+        import Matematicas
+        return getattr(Matematicas, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class Evaluador:
+    """
+    Evaluador del ASA usando el patrón Visitor.
+    Recorre el árbol y ejecuta las operaciones.
+    """
     
-    def __init__(self, nombre, aridad):
+    # Las funciones asíncronas solo pueden llamarse desde EvaluadorAsincrono
+    admite_asincronas = False
+    
+    # Presupuesto de la evaluación en curso (lo instala Presupuesto.evaluar)
+    presupuesto = None
+    
+    # Política de los valores vectoriales, o None si no están habilitados
+    # (la fija Vectores.habilitar_vectores)
+    politica_vectores = None
+    
+    def __init__(self, registro=REGISTRO, semilla=None, entorno=None):
         """
-        Constructor
+        Constructor - inicializa la tabla de símbolos
         
         Args:
-            nombre: str - Nombre de la función
-            aridad: int - Número de argumentos que acepta
+            registro: RegistroFunciones - Registro del que se cargan bajo
+                      demanda las funciones disponibles
+            semilla: int - Semilla del flujo aleatorio de rand(); si es None
+                     se elige una al azar (consultable en aleatorio.semilla)
+            entorno: MutableMapping - Tabla de símbolos inicial, por ejemplo
+                     un Entorno.EntornoPersistente; por defecto un dict vacío
         """
-        self.nombre = nombre
-        self.aridad = aridad
+        self.entorno = {} if entorno is None else entorno  # Tabla de símbolos para variables
+        self.operadores = TablaOperadores()  # Semántica de los operadores
+        self.funciones = TablaFunciones(registro=registro)  # Tabla de símbolos para funciones
+        self.cache_funciones = CacheFunciones()  # Resultados de funciones puras
+        self._sitios = {}  # Caché de sitios de llamada: Llamada -> (funcion, aridad, memoizar)
+        self._version_sitios = self.funciones.version
+        self._version_memoizacion = self.cache_funciones.version
+        self.semilla = semilla
+        self._aleatorio = None  # FlujoAleatorio, creado al primer uso
+    
+    @property
+    def aleatorio(self):
+        """FlujoAleatorio del evaluador (se crea la primera vez que se usa)"""
+        if self._aleatorio is None:
+            from Aleatorio import FlujoAleatorio
+            self._aleatorio = FlujoAleatorio(self.semilla)
+        return self._aleatorio
     
-    def llamar(self, evaluador, argumentos):
+    @aleatorio.setter
+    def aleatorio(self, flujo):
+        self._aleatorio = flujo
+    
+    def compilar(self, nodo):
         """
-        Ejecuta la función
+        Resuelve estáticamente un ASA antes de evaluarlo.
+        
+        Valida la existencia y la aridad de las funciones llamadas y deja
+        cada sitio de llamada resuelto en caché.
         
         Args:
-            evaluador: Evaluador - Evaluador que realiza la llamada
-            argumentos: list - Lista de argumentos evaluados
+            nodo: Nodo - Raíz del ASA
             
         Returns:
-            object: Resultado de la función
+            Nodo: El mismo nodo, listo para evaluarse
+            
+        Raises:
+            ErrorSemantico: Si alguna llamada es inválida
         """
-        raise NotImplementedError()
-
-
-class FuncionRand(FuncionBuiltIn):
-    """Función rand() - genera número aleatorio entre 0 y 1"""
-    
-    def __init__(self):
-        super().__init__("rand", 0)
-    
-    def llamar(self, evaluador, argumentos):
-        return random.random()
-
-
-class FuncionSin(FuncionBuiltIn):
-    """Función sin(angulo) - seno en radianes"""
-    
-    def __init__(self):
-        super().__init__("sin", 1)
-    
-    def llamar(self, evaluador, argumentos):
-        angulo = argumentos[0]
-        if not isinstance(angulo, (int, float)):
-            raise ErrorSemantico(f"sin() requiere un argumento numérico, se recibió: {type(angulo).__name__}")
-        return math.sin(angulo)
-
-
-class FuncionCos(FuncionBuiltIn):
-    """Función cos(angulo) - coseno en radianes"""
-    
-    def __init__(self):
-        super().__init__("cos", 1)
-    
-    def llamar(self, evaluador, argumentos):
-        angulo = argumentos[0]
-        if not isinstance(angulo, (int, float)):
-            raise ErrorSemantico(f"cos() requiere un argumento numérico, se recibió: {type(angulo).__name__}")
-        return math.cos(angulo)
-
-
-class FuncionSqrt(FuncionBuiltIn):
-    """Función sqrt(valor) - raíz cuadrada"""
-    
-    def __init__(self):
-        super().__init__("sqrt", 1)
-    
-    def llamar(self, evaluador, argumentos):
-        valor = argumentos[0]
-        if not isinstance(valor, (int, float)):
-            raise ErrorSemantico(f"sqrt() requiere un argumento numérico, se recibió: {type(valor).__name__}")
-        if valor < 0:
-            raise ErrorSemantico(f"sqrt() no puede calcular la raíz cuadrada de un número negativo: {valor}")
-        return math.sqrt(valor)
-
-
-class FuncionPow(FuncionBuiltIn):
-    """Función pow(base, exponente) - potencia"""
-    
-    def __init__(self):
-        super().__init__("pow", 2)
-    
-    def llamar(self, evaluador, argumentos):
-        base = argumentos[0]
-        exponente = argumentos[1]
-        if not isinstance(base, (int, float)):
-            raise ErrorSemantico(f"pow() requiere argumentos numéricos, el primer argumento es: {type(base).__name__}")
-        if not isinstance(exponente, (int, float)):
-            raise ErrorSemantico(f"pow() requiere argumentos numéricos, el segundo argumento es: {type(exponente).__name__}")
-        return math.pow(base, exponente)
-
-
-class Evaluador:
-    """
-    Evaluador del ASA usando el patrón Visitor.
-    Recorre el árbol y ejecuta las operaciones.
-    """
-    
-    def __init__(self):
-        """Constructor - inicializa la tabla de símbolos"""
-        self.entorno = {}  # Tabla de símbolos para variables
-        self.funciones = {  # Tabla de símbolos para funciones
-            "rand": FuncionRand(),
-            "sin": FuncionSin(),
-            "cos": FuncionCos(),
-            "sqrt": FuncionSqrt(),
-            "pow": FuncionPow()
-        }
+        Resolutor(self).resolver(nodo)
+        return nodo
     
     def evaluar(self, nodo):
         """
@@ -140,6 +114,22 @@ class Evaluador:
         """
         return nodo.accept(self)
     
+    def iniciar_diario(self):
+        """
+        Empieza a recordar las definiciones que cambian, además de las
+        variables (lo usa Presupuesto para deshacer una evaluación abortada)
+        """
+        self.funciones.iniciar_diario()
+    
+    def terminar_diario(self, deshacer=False):
+        """
+        Deja de recordar las definiciones que cambian
+        
+        Args:
+            deshacer: bool - Si se restauran las definiciones anteriores
+        """
+        self.funciones.terminar_diario(deshacer)
+    
     def visit_sentencia(self, sentencia):
         """
         Visita un nodo Sentencia
@@ -181,61 +171,14 @@ class Evaluador:
         """
         izquierda = self.evaluar(binaria.izquierda)
         derecha = self.evaluar(binaria.derecha)
-        operador = binaria.operador.tipo
-        
-        # Operaciones aritméticas
-        if operador == TipoToken.PLUS:
-            if isinstance(izquierda, (int, float)) and isinstance(derecha, (int, float)):
-                return izquierda + derecha
-            elif isinstance(izquierda, str) and isinstance(derecha, str):
-                return izquierda + derecha
-            else:
-                raise ErrorSemantico(
-                    f"Incompatibilidad de operandos para '+': "
-                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
-                )
-        
-        elif operador == TipoToken.MINUS:
-            if isinstance(izquierda, (int, float)) and isinstance(derecha, (int, float)):
-                return izquierda - derecha
-            else:
-                raise ErrorSemantico(
-                    f"Incompatibilidad de operandos para '-': "
-                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
-                )
-        
-        elif operador == TipoToken.STAR:
-            if isinstance(izquierda, (int, float)) and isinstance(derecha, (int, float)):
-                return izquierda * derecha
-            else:
-                raise ErrorSemantico(
-                    f"Incompatibilidad de operandos para '*': "
-                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
-                )
-        
-        elif operador == TipoToken.SLASH:
-            if isinstance(izquierda, (int, float)) and isinstance(derecha, (int, float)):
-                if derecha == 0:
-                    raise ErrorSemantico("División por cero")
-                return izquierda / derecha
-            else:
-                raise ErrorSemantico(
-                    f"Incompatibilidad de operandos para '/': "
-                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
-                )
-        
-        elif operador == TipoToken.MOD:
-            if isinstance(izquierda, (int, float)) and isinstance(derecha, (int, float)):
-                if derecha == 0:
-                    raise ErrorSemantico("Módulo por cero")
-                return izquierda % derecha
-            else:
-                raise ErrorSemantico(
-                    f"Incompatibilidad de operandos para '%': "
-                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
-                )
-        
-        return None
+        try:
+            return self.operadores.binaria(binaria.operador.tipo, izquierda, derecha)
+        except OverflowError:
+            # Un entero demasiado grande no puede promoverse a float
+            raise ErrorSemantico(
+                f"Desbordamiento numérico en '{binaria.operador.lexema}': "
+                f"{type(izquierda).__name__} y {type(derecha).__name__}"
+            )
     
     def visit_unaria(self, unaria):
         """
@@ -251,18 +194,7 @@ class Evaluador:
             ErrorSemantico: Si el operando no es numérico
         """
         expresion = self.evaluar(unaria.expresion)
-        operador = unaria.operador.tipo
-        
-        if operador == TipoToken.MINUS:
-            if isinstance(expresion, (int, float)):
-                return -expresion
-            else:
-                raise ErrorSemantico(
-                    f"El operador unario '-' requiere un operando numérico, "
-                    f"se recibió: {type(expresion).__name__}"
-                )
-        
-        return None
+        return self.operadores.unaria(unaria.operador.tipo, expresion)
     
     def visit_agrupacion(self, agrupacion):
         """
@@ -289,11 +221,11 @@ class Evaluador:
         Raises:
             ErrorSemantico: Si la variable no está definida
         """
-        nombre = variable.nombre.lexema
-        if nombre in self.entorno:
-            return self.entorno[nombre]
-        else:
-            raise ErrorSemantico(f"Variable no definida: '{nombre}'")
+        # Una sola búsqueda (importa con entornos cuya consulta no es trivial)
+        try:
+            return self.entorno[variable.nombre.lexema]
+        except KeyError:
+            raise ErrorSemantico(f"Variable no definida: '{variable.nombre.lexema}'") from None
     
     def visit_asignacion(self, asignacion):
         """
@@ -310,6 +242,25 @@ class Evaluador:
         self.entorno[nombre] = valor
         return valor
     
+    def visit_definicion_funcion(self, definicion):
+        """
+        Visita un nodo DefinicionFuncion (definición de función del usuario)
+        
+        Args:
+            definicion: DefinicionFuncion - Nodo de definición
+            
+        Returns:
+            FuncionUsuario: La función definida
+        """
+        funcion = FuncionUsuario(
+            definicion.nombre.lexema,
+            [parametro.lexema for parametro in definicion.parametros],
+            definicion.cuerpo,
+            self.funciones,
+        )
+        self.funciones[funcion.nombre] = funcion
+        return funcion
+    
     def visit_llamada(self, llamada):
         """
         Visita un nodo Llamada (llamada a función)
@@ -323,6 +274,60 @@ class Evaluador:
         Raises:
             ErrorSemantico: Si hay errores en la llamada
         """
+        if (self._version_sitios != self.funciones.version
+                or self._version_memoizacion != self.cache_funciones.version):
+            self._sincronizar_sitios()
+        
+        sitio = self._sitios.get(llamada)
+        if sitio is None:
+            sitio = self.resolver_llamada(llamada)
+        funcion, aridad, memoizar = sitio
+        argumentos = llamada.argumentos
+        
+        # Ruta rápida para aridades fijas (sin construir la lista de argumentos)
+        # Las funciones siempre reciben las cadenas como str
+        try:
+            if aridad == 1:
+                a = self.evaluar(argumentos[0])
+                if type(a) is Cuerda:
+                    a = a.aplanar()
+                if memoizar:
+                    return self.cache_funciones.llamar1(self, funcion, a)
+                return funcion.llamar1(self, a)
+            if aridad == 2:
+                a = self.evaluar(argumentos[0])
+                if type(a) is Cuerda:
+                    a = a.aplanar()
+                b = self.evaluar(argumentos[1])
+                if type(b) is Cuerda:
+                    b = b.aplanar()
+                if memoizar:
+                    return self.cache_funciones.llamar2(self, funcion, a, b)
+                return funcion.llamar2(self, a, b)
+            if aridad == 0:
+                return funcion.llamar0(self)
+            valores = [aplanar(self.evaluar(arg)) for arg in argumentos]
+            if memoizar:
+                return self.cache_funciones.llamar(self, funcion, valores)
+            return funcion.llamar(self, valores)
+        except ErrorSemantico:
+            raise
+        except Exception as e:
+            raise ErrorSemantico(f"Error al ejecutar '{funcion.nombre}': {str(e)}")
+    
+    def resolver_llamada(self, llamada):
+        """
+        Resuelve la función de un sitio de llamada y la guarda en caché
+        
+        Args:
+            llamada: Llamada - Nodo de llamada
+            
+        Returns:
+            tuple: (funcion, aridad, memoizar) del sitio
+            
+        Raises:
+            ErrorSemantico: Si el callee no es una función o la aridad no coincide
+        """
         # Verificar que callee sea una variable
         if not isinstance(llamada.callee, Variable):
             # Si no es una variable, evaluar y verificar si es un número u otro literal
@@ -334,7 +339,7 @@ class Evaluador:
                 )
             else:
                 raise ErrorSemantico(
-                    f"Solo se pueden llamar funciones, no valores de tipo {type(callee_valor).__name__}"
+                    f"Solo se pueden llamar funciones, no valores de tipo {nombre_tipo(callee_valor)}"
                 )
         
         # Obtener el nombre de la función
@@ -346,22 +351,54 @@ class Evaluador:
         
         funcion = self.funciones[nombre_funcion]
         
-        # Evaluar los argumentos
-        argumentos = []
-        for arg in llamada.argumentos:
-            argumentos.append(self.evaluar(arg))
+        if funcion.asincrona and not self.admite_asincronas:
+            raise ErrorSemantico(
+                f"La función '{nombre_funcion}' es asíncrona y solo puede usarse "
+                f"en el modo de evaluación asíncrono"
+            )
         
         # Verificar la aridad
-        if len(argumentos) != funcion.aridad:
+        if len(llamada.argumentos) != funcion.aridad:
             raise ErrorSemantico(
                 f"La función '{nombre_funcion}' espera {funcion.aridad} argumento(s), "
-                f"pero se recibieron {len(argumentos)}"
+                f"pero se recibieron {len(llamada.argumentos)}"
             )
         
-        # Llamar a la función
-        try:
-            return funcion.llamar(self, argumentos)
-        except ErrorSemantico:
-            raise
-        except Exception as e:
-            raise ErrorSemantico(f"Error al ejecutar '{nombre_funcion}': {str(e)}")
+        if (self._version_sitios != self.funciones.version
+                or self._version_memoizacion != self.cache_funciones.version):
+            self._sincronizar_sitios()
+        elif len(self._sitios) >= MAX_SITIOS:
+            # Evita que la caché retenga indefinidamente los ASA de sesiones largas
+            self._sitios.clear()
+        
+        memoizar = self.cache_funciones.memoizable(funcion) and not funcion.asincrona
+        sitio = (funcion, funcion.aridad, memoizar)
+        self._sitios[llamada] = sitio
+        return sitio
+    
+    def sitio_llamada(self, llamada):
+        """
+        Obtiene el sitio resuelto de una llamada, resolviéndolo si hace falta
+        
+        Args:
+            llamada: Llamada - Nodo de llamada
+            
+        Returns:
+            tuple: (funcion, aridad, memoizar) del sitio
+        """
+        if (self._version_sitios != self.funciones.version
+                or self._version_memoizacion != self.cache_funciones.version):
+            self._sincronizar_sitios()
+        sitio = self._sitios.get(llamada)
+        if sitio is None:
+            sitio = self.resolver_llamada(llamada)
+        return sitio
+    
+    def _sincronizar_sitios(self):
+        """Descarta lo que dependía de una versión anterior de la tabla de funciones o de la caché"""
+        self._sitios.clear()
+        self._version_sitios = self.funciones.version
+        self._version_memoizacion = self.cache_funciones.version
+        # El resultado de una función del usuario depende de las funciones
+        # que llama, que pueden haberse redefinido
+        self.cache_funciones.descartar(lambda funcion: isinstance(funcion, FuncionUsuario))
@@ -0,0 +1,225 @@
+"""
+Evaluación asíncrona del ASA
+
+EvaluadorAsincrono permite usar funciones built-in asíncronas (cuyo
+llamar() o calcular() es una corrutina), por ejemplo consultas a un
+servicio o lecturas de archivos. Las llamadas independientes dentro de
+una misma expresión, como f(a) + g(b), se esperan de forma concurrente, y
+un lote de sentencias se ejecuta en un único ciclo de eventos:
+
+    evaluador = EvaluadorAsincrono()
+    resultados = evaluador.evaluar_lote([ast1, ast2, ast3])
+
+Los subárboles que no llaman a funciones asíncronas se evalúan con el
+evaluador síncrono, sin costo adicional.
+
+Las funciones del usuario se ejecutan de forma síncrona, así que su
+cuerpo no puede llamar a funciones asíncronas; definir una que lo haga es
+un error semántico.
+"""
+
+import asyncio
+from ASA import *
+from Evaluador import Evaluador, ErrorSemantico, MAX_SITIOS
+from Cuerda import aplanar
+
+
+class EvaluadorAsincrono(Evaluador):
+    """
+    Evaluador que admite funciones asíncronas.
+    
+    Dos subexpresiones se evalúan concurrentemente solo si ambas esperan
+    alguna función asíncrona, ninguna asigna variables y a lo sumo una
+    llama a funciones síncronas impuras (como rand()), de modo que el
+    resultado es el mismo que el de la evaluación secuencial: los valores
+    de rand() se sortean en el orden del código aunque las esperas
+    terminen en otro orden.
+    """
+    
+    admite_asincronas = True
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._analisis = {}  # Nodo -> (espera, asigna, impura)
+        self._version_analisis = self.funciones.version
+    
+    def evaluar_lote(self, nodos):
+        """
+        Evalúa varias sentencias en orden dentro de un solo ciclo de eventos
+        
+        Args:
+            nodos: list - Nodos del ASA (normalmente Sentencia)
+        
+        Returns:
+            list: Resultado de cada nodo, en el mismo orden
+        
+        Raises:
+            ErrorSemantico: En el primer error; las sentencias anteriores
+                            ya quedaron aplicadas al entorno
+        """
+        return asyncio.run(self.evaluar_lote_async(nodos))
+    
+    async def evaluar_lote_async(self, nodos):
+        """Versión corrutina de evaluar_lote()"""
+        resultados = []
+        for nodo in nodos:
+            resultados.append(await self.evaluar_async(nodo))
+        return resultados
+    
+    async def evaluar_async(self, nodo):
+        """
+        Evalúa un nodo esperando las funciones asíncronas que contenga
+        
+        Args:
+            nodo: Nodo - Nodo del ASA
+        
+        Returns:
+            object: Resultado de la evaluación
+        """
+        if not self._analizar(nodo)[0]:
+            return self.evaluar(nodo)
+        
+        if isinstance(nodo, Sentencia):
+            valor = await self.evaluar_async(nodo.expresion)
+            return (valor, not nodo.tiene_semicolon)
+        
+        if isinstance(nodo, Binaria):
+            izquierda, derecha = await self._evaluar_varios([nodo.izquierda, nodo.derecha])
+            try:
+                return self.operadores.binaria(nodo.operador.tipo, izquierda, derecha)
+            except OverflowError:
+                raise ErrorSemantico(
+                    f"Desbordamiento numérico en '{nodo.operador.lexema}': "
+                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
+                )
+        
+        if isinstance(nodo, Unaria):
+            valor = await self.evaluar_async(nodo.expresion)
+            return self.operadores.unaria(nodo.operador.tipo, valor)
+        
+        if isinstance(nodo, Agrupacion):
+            return await self.evaluar_async(nodo.expresion)
+        
+        if isinstance(nodo, Asignacion):
+            valor = await self.evaluar_async(nodo.valor)
+            self.entorno[nodo.nombre.lexema] = valor
+            return valor
+        
+        return await self._llamar_async(nodo)
+    
+    def visit_definicion_funcion(self, definicion):
+        """
+        Visita un nodo DefinicionFuncion, rechazando las llamadas asíncronas
+        
+        Args:
+            definicion: DefinicionFuncion - Nodo de definición
+        
+        Returns:
+            FuncionUsuario: La función definida
+        
+        Raises:
+            ErrorSemantico: Si el cuerpo llama a una función asíncrona
+        """
+        if self._analizar(definicion.cuerpo)[0]:
+            raise ErrorSemantico(
+                f"La función '{definicion.nombre.lexema}' no puede llamar a funciones "
+                f"asíncronas: las funciones del usuario se ejecutan de forma síncrona"
+            )
+        return super().visit_definicion_funcion(definicion)
+    
+    async def _llamar_async(self, llamada):
+        """Evalúa una Llamada cuyo subárbol contiene funciones asíncronas"""
+        funcion = self.sitio_llamada(llamada)[0]
+        
+        valores = [aplanar(valor) for valor in await self._evaluar_varios(llamada.argumentos)]
+        try:
+            resultado = funcion.llamar(self, valores)
+            if funcion.asincrona:
+                resultado = await resultado
+            return resultado
+        except ErrorSemantico:
+            raise
+        except Exception as e:
+            raise ErrorSemantico(f"Error al ejecutar '{funcion.nombre}': {str(e)}")
+    
+    async def _evaluar_varios(self, nodos):
+        """
+        Evalúa una lista de subexpresiones, concurrentemente si es seguro
+        
+        Args:
+            nodos: list - Subexpresiones en orden de evaluación
+        
+        Returns:
+            list: Valores en el mismo orden
+        """
+        analisis = [self._analizar(nodo) for nodo in nodos]
+        esperan = sum(1 for espera, _, _ in analisis if espera)
+        asignan = any(asigna for _, asigna, _ in analisis)
+        # Si dos ramas llaman a funciones impuras, el orden de esas llamadas
+        # dependería de cuál espera termina primero
+        impuras = sum(1 for _, _, impura in analisis if impura)
+        
+        if esperan < 2 or asignan or impuras > 1:
+            return [await self.evaluar_async(nodo) for nodo in nodos]
+        
+        tareas = [asyncio.ensure_future(self.evaluar_async(nodo)) for nodo in nodos]
+        try:
+            return await asyncio.gather(*tareas)
+        except BaseException:
+            for tarea in tareas:
+                tarea.cancel()
+            raise
+    
+    def _analizar(self, nodo):
+        """
+        Determina si un subárbol espera funciones asíncronas, si asigna y
+        si llama a funciones síncronas impuras
+        
+        Args:
+            nodo: Nodo - Raíz del subárbol
+        
+        Returns:
+            tuple: (espera, asigna, impura)
+        """
+        if self._version_analisis != self.funciones.version:
+            self._analisis.clear()
+            self._version_analisis = self.funciones.version
+        elif len(self._analisis) >= MAX_SITIOS:
+            self._analisis.clear()
+        
+        resultado = self._analisis.get(nodo)
+        if resultado is not None:
+            return resultado
+        
+        espera = impura = False
+        asigna = isinstance(nodo, Asignacion)
+        if isinstance(nodo, Llamada):
+            callee = nodo.callee
+            funcion = None
+            if isinstance(callee, Variable):
+                funcion = self.funciones.get(callee.nombre.lexema)
+            if funcion is None:
+                impura = True
+            elif funcion.asincrona:
+                espera = True
+            else:
+                impura = not funcion.pura
+            hijos = nodo.argumentos
+        elif isinstance(nodo, Binaria):
+            hijos = (nodo.izquierda, nodo.derecha)
+        elif isinstance(nodo, (Unaria, Agrupacion, Sentencia)):
+            hijos = (nodo.expresion,)
+        elif isinstance(nodo, Asignacion):
+            hijos = (nodo.valor,)
+        else:
+            hijos = ()
+        
+        for hijo in hijos:
+            espera_hijo, asigna_hijo, impura_hijo = self._analizar(hijo)
+            espera = espera or espera_hijo
+            asigna = asigna or asigna_hijo
+            impura = impura or impura_hijo
+        
+        resultado = (espera, asigna, impura)
+        self._analisis[nodo] = resultado
+        return resultado
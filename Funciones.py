@@ -0,0 +1,493 @@
+"""
+Funciones built-in: contrato, firmas tipadas y registro perezoso
+
+Este módulo define:
+- FuncionBuiltIn: contrato base que cumplen todas las funciones.
+- Firma / FuncionTipada: funciones que declaran los tipos de sus
+  argumentos, su pureza y su costo. La validación de argumentos se genera
+  una sola vez a partir de la firma.
+- RegistroFunciones: asocia nombres con la clase que implementa cada
+  función ("modulo:Clase"). El módulo se importa y la función se
+  instancia solo la primera vez que se hace referencia a ella.
+- TablaFunciones: tabla de símbolos de funciones de cada evaluador.
+
+Para agregar funciones desde un módulo externo (plugin):
+
+    REGISTRO.registrar("media", "mis_funciones:FuncionMedia")
+
+o bien, si el módulo define un diccionario FUNCIONES con la forma
+{"nombre": Clase}:
+
+    REGISTRO.cargar_plugin("mis_funciones")
+"""
+
+import importlib
+import inspect
+import threading
+from Errores import ErrorSemantico
+from Operadores import nombre_tipo
+
+
+class FuncionBuiltIn:
+    """
+    Clase base para funciones built-in del lenguaje.
+    
+    Además de llamar(), que recibe la lista de argumentos, expone
+    llamar0/llamar1/llamar2 para invocar funciones de aridad fija sin
+    construir la lista. Las subclases pueden sobrescribir la variante que
+    corresponda a su aridad; por defecto todas delegan en llamar().
+    
+    Si llamar() se define con 'async def' la función es asíncrona
+    (atributo 'asincrona') y solo puede usarse desde EvaluadorAsincrono.
+    """
+    
+    def __init__(self, nombre, aridad, pura=False, costo=1):
+        """
+        Constructor
+        
+        Args:
+            nombre: str - Nombre de la función
+            aridad: int - Número de argumentos que acepta
+            pura: bool - True si el resultado depende solo de los argumentos
+                         y no tiene efectos secundarios (puede memorizarse)
+            costo: int - Costo relativo estimado de una llamada (1 equivale
+                         aproximadamente a una consulta en la caché)
+        """
+        self.nombre = nombre
+        self.aridad = aridad
+        self.pura = pura
+        self.costo = costo
+        self.asincrona = inspect.iscoroutinefunction(self.llamar)
+    
+    def llamar(self, evaluador, argumentos):
+        """
+        Ejecuta la función
+        
+        Args:
+            evaluador: Evaluador - Evaluador que realiza la llamada
+            argumentos: list - Lista de argumentos evaluados
+        
+        Returns:
+            object: Resultado de la función
+        """
+        raise NotImplementedError()
+    
+    def llamar0(self, evaluador):
+        """Ejecuta la función sin argumentos"""
+        return self.llamar(evaluador, [])
+    
+    def llamar1(self, evaluador, a):
+        """Ejecuta la función con un argumento"""
+        return self.llamar(evaluador, [a])
+    
+    def llamar2(self, evaluador, a, b):
+        """Ejecuta la función con dos argumentos"""
+        return self.llamar(evaluador, [a, b])
+
+
+class TipoArgumento:
+    """Tipo aceptado por un argumento de una firma"""
+    
+    def __init__(self, descripcion, descripcion_plural, tipos):
+        """
+        Constructor
+        
+        Args:
+            descripcion: str - Descripción en singular ("numérico")
+            descripcion_plural: str - Descripción en plural ("numéricos")
+            tipos: tuple - Tipos de Python aceptados
+        """
+        self.descripcion = descripcion
+        self.descripcion_plural = descripcion_plural
+        self.tipos = tipos
+
+
+NUMERO = TipoArgumento("numérico", "numéricos", (int, float))
+CADENA = TipoArgumento("de texto", "de texto", (str,))
+CUALQUIERA = TipoArgumento("", "", (object,))
+
+# Ordinales usados en los mensajes de error de funciones con varios argumentos
+ORDINALES = ("primer", "segundo", "tercer", "cuarto", "quinto",
+             "sexto", "séptimo", "octavo", "noveno", "décimo")
+
+
+class Firma:
+    """Firma de una función: tipos de argumentos, pureza y costo"""
+    
+    def __init__(self, *tipos, pura=False, costo=1, usa_evaluador=False):
+        """
+        Constructor
+        
+        Args:
+            *tipos: TipoArgumento - Tipo de cada argumento (define la aridad)
+            pura: bool - Si la función es pura
+            costo: int - Costo relativo de una llamada
+            usa_evaluador: bool - Si calcular() recibe el evaluador como
+                                  primer argumento
+        """
+        self.tipos = tipos
+        self.aridad = len(tipos)
+        self.pura = pura
+        self.costo = costo
+        self.usa_evaluador = usa_evaluador
+    
+    def error_argumento(self, nombre, posicion, valor):
+        """
+        Construye el error semántico para un argumento de tipo incorrecto
+        
+        Args:
+            nombre: str - Nombre de la función
+            posicion: int - Índice del argumento
+            valor: object - Valor recibido
+        
+        Returns:
+            ErrorSemantico: Error a lanzar
+        """
+        tipo = self.tipos[posicion]
+        if self.aridad == 1:
+            return ErrorSemantico(
+                f"{nombre}() requiere un argumento {tipo.descripcion}, "
+                f"se recibió: {nombre_tipo(valor)}"
+            )
+        ordinal = ORDINALES[posicion] if posicion < len(ORDINALES) else f"{posicion + 1}º"
+        return ErrorSemantico(
+            f"{nombre}() requiere argumentos {tipo.descripcion_plural}, "
+            f"el {ordinal} argumento es: {nombre_tipo(valor)}"
+        )
+
+
+class FuncionTipada(FuncionBuiltIn):
+    """
+    Función built-in descrita por una Firma.
+    
+    Las subclases definen el atributo de clase 'firma' y el método
+    calcular(*argumentos), que recibe los argumentos ya validados. Los
+    métodos llamar0/llamar1/llamar2/llamar se generan al construir la
+    instancia, con la validación de tipos de la firma ya especializada.
+    Si calcular() es una corrutina, la función es asíncrona.
+    """
+    
+    firma = Firma()
+    
+    def __init__(self, nombre):
+        """
+        Constructor
+        
+        Args:
+            nombre: str - Nombre de la función
+        """
+        firma = self.firma
+        super().__init__(nombre, firma.aridad, pura=firma.pura, costo=firma.costo)
+        self.asincrona = inspect.iscoroutinefunction(self.calcular)
+        self._generar_invocadores()
+    
+    def calcular(self, *argumentos):
+        """
+        Calcula el resultado con argumentos ya validados
+        
+        Returns:
+            object: Resultado de la función
+        """
+        raise NotImplementedError()
+    
+    def _generar_invocadores(self):
+        """Genera las rutas de llamada especializadas según la firma"""
+        firma = self.firma
+        nombre = self.nombre
+        calcular = self.calcular
+        tipos = [tipo.tipos for tipo in firma.tipos]
+        error = firma.error_argumento
+        usa_evaluador = firma.usa_evaluador
+        
+        if firma.aridad == 0:
+            if usa_evaluador:
+                def llamar0(evaluador):
+                    return calcular(evaluador)
+            else:
+                def llamar0(evaluador):
+                    return calcular()
+            self.llamar0 = llamar0
+            self.llamar = lambda evaluador, argumentos: llamar0(evaluador)
+        
+        elif firma.aridad == 1:
+            tipo_a, = tipos
+            if usa_evaluador:
+                def llamar1(evaluador, a):
+                    if not isinstance(a, tipo_a):
+                        raise error(nombre, 0, a)
+                    return calcular(evaluador, a)
+            else:
+                def llamar1(evaluador, a):
+                    if not isinstance(a, tipo_a):
+                        raise error(nombre, 0, a)
+                    return calcular(a)
+            self.llamar1 = llamar1
+            self.llamar = lambda evaluador, argumentos: llamar1(evaluador, argumentos[0])
+        
+        elif firma.aridad == 2:
+            tipo_a, tipo_b = tipos
+            if usa_evaluador:
+                def llamar2(evaluador, a, b):
+                    if not isinstance(a, tipo_a):
+                        raise error(nombre, 0, a)
+                    if not isinstance(b, tipo_b):
+                        raise error(nombre, 1, b)
+                    return calcular(evaluador, a, b)
+            else:
+                def llamar2(evaluador, a, b):
+                    if not isinstance(a, tipo_a):
+                        raise error(nombre, 0, a)
+                    if not isinstance(b, tipo_b):
+                        raise error(nombre, 1, b)
+                    return calcular(a, b)
+            self.llamar2 = llamar2
+            self.llamar = lambda evaluador, argumentos: llamar2(evaluador, argumentos[0], argumentos[1])
+        
+        else:
+            def llamar(evaluador, argumentos):
+                for posicion, (valor, tipo) in enumerate(zip(argumentos, tipos)):
+                    if not isinstance(valor, tipo):
+                        raise error(nombre, posicion, valor)
+                if usa_evaluador:
+                    return calcular(evaluador, *argumentos)
+                return calcular(*argumentos)
+            self.llamar = llamar
+
+
+class RegistroFunciones:
+    """
+    Registro de funciones disponibles, cargadas bajo demanda.
+    
+    Cada entrada asocia un nombre con una clase o con una especificación
+    "modulo:Clase". La clase se importa e instancia la primera vez que se
+    solicita y la instancia se comparte entre todos los evaluadores que
+    usan el registro, por lo que las funciones no deben guardar estado
+    propio de un evaluador.
+    """
+    
+    def __init__(self):
+        """Constructor"""
+        self._especificaciones = {}  # nombre -> Clase | "modulo:Clase"
+        self._instancias = {}        # nombre -> FuncionBuiltIn
+        self._candado = threading.Lock()
+    
+    def registrar(self, nombre, especificacion):
+        """
+        Registra una función
+        
+        Args:
+            nombre: str - Nombre con el que se llama desde el lenguaje
+            especificacion: type | str - Clase o "modulo:Clase"
+        """
+        with self._candado:
+            self._especificaciones[nombre] = especificacion
+            self._instancias.pop(nombre, None)
+    
+    def cargar_plugin(self, nombre_modulo):
+        """
+        Registra todas las funciones de un módulo plugin
+        
+        El módulo debe definir FUNCIONES = {"nombre": Clase, ...}.
+        
+        Args:
+            nombre_modulo: str - Nombre importable del módulo
+        
+        Returns:
+            list: Nombres registrados
+        """
+        modulo = importlib.import_module(nombre_modulo)
+        funciones = getattr(modulo, "FUNCIONES", None)
+        if not isinstance(funciones, dict):
+            raise ValueError(f"El módulo '{nombre_modulo}' no define un diccionario FUNCIONES")
+        for nombre, clase in funciones.items():
+            self.registrar(nombre, clase)
+        return list(funciones)
+    
+    def __contains__(self, nombre):
+        return nombre in self._especificaciones
+    
+    def nombres(self):
+        """Retorna los nombres registrados"""
+        return list(self._especificaciones)
+    
+    def obtener(self, nombre):
+        """
+        Obtiene (cargándola si hace falta) la instancia de una función
+        
+        Args:
+            nombre: str - Nombre de la función
+        
+        Returns:
+            FuncionBuiltIn: Instancia compartida
+        
+        Raises:
+            KeyError: Si el nombre no está registrado
+        """
+        instancia = self._instancias.get(nombre)
+        if instancia is not None:
+            return instancia
+        
+        with self._candado:
+            instancia = self._instancias.get(nombre)
+            if instancia is None:
+                clase = self._especificaciones[nombre]
+                if isinstance(clase, str):
+                    nombre_modulo, _, nombre_clase = clase.partition(":")
+                    clase = getattr(importlib.import_module(nombre_modulo), nombre_clase)
+                instancia = clase()
+                self._instancias[nombre] = instancia
+        return instancia
+
+
+# Registro global con las funciones del lenguaje
+REGISTRO = RegistroFunciones()
+REGISTRO.registrar("rand", "Matematicas:FuncionRand")
+REGISTRO.registrar("sin", "Matematicas:FuncionSin")
+REGISTRO.registrar("cos", "Matematicas:FuncionCos")
+REGISTRO.registrar("sqrt", "Matematicas:FuncionSqrt")
+REGISTRO.registrar("pow", "Matematicas:FuncionPow")
+
+
+class TablaFunciones(dict):
+    """
+    Tabla de símbolos para funciones.
+    
+    Es un diccionario que incrementa su atributo 'version' cada vez que se
+    modifica, lo que permite a los sitios de llamada detectar cuándo deben
+    volver a resolver la función que tienen en caché.
+    
+    Los nombres que no están en la tabla se buscan en el registro y se
+    cargan la primera vez que se consultan; esa carga no cambia la versión
+    porque no altera el significado de ningún nombre.
+    
+    Entre iniciar_diario() y terminar_diario() la tabla recuerda el estado
+    anterior de cada nombre que cambia, para poder deshacer las
+    definiciones de una evaluación abortada (ver Presupuesto).
+    """
+    
+    def __init__(self, *args, registro=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.registro = registro
+        self._eliminadas = set()  # Nombres del registro eliminados de la tabla
+        self._diario = None  # nombre -> (función anterior o None, eliminada) mientras se anota
+    
+    def __missing__(self, nombre):
+        registro = self.registro
+        if registro is None or nombre in self._eliminadas or nombre not in registro:
+            raise KeyError(nombre)
+        funcion = registro.obtener(nombre)
+        super().__setitem__(nombre, funcion)
+        return funcion
+    
+    def __contains__(self, nombre):
+        if super().__contains__(nombre):
+            return True
+        registro = self.registro
+        return registro is not None and nombre not in self._eliminadas and nombre in registro
+    
+    def get(self, nombre, defecto=None):
+        try:
+            return self[nombre]
+        except KeyError:
+            return defecto
+    
+    def __setitem__(self, nombre, funcion):
+        if self._diario is not None:
+            self._anotar(nombre)
+        super().__setitem__(nombre, funcion)
+        self._eliminadas.discard(nombre)
+        self.version += 1
+    
+    def __delitem__(self, nombre):
+        if self._diario is not None:
+            self._anotar(nombre)
+        if super().__contains__(nombre):
+            super().__delitem__(nombre)
+        elif nombre not in self:
+            raise KeyError(nombre)
+        self._eliminadas.add(nombre)
+        self.version += 1
+    
+    def pop(self, nombre, *defecto):
+        # Se carga del registro si hace falta y se elimina como con del
+        try:
+            funcion = self[nombre]
+        except KeyError:
+            if defecto:
+                return defecto[0]
+            raise
+        del self[nombre]
+        return funcion
+    
+    def popitem(self):
+        if super().__len__():
+            nombre = next(reversed(super().keys()))
+        else:
+            pendientes = self.nombres()
+            if not pendientes:
+                raise KeyError("popitem(): la tabla de funciones está vacía")
+            nombre = pendientes[-1]
+        return nombre, self.pop(nombre)
+    
+    def setdefault(self, nombre, funcion=None):
+        if nombre in self:
+            return self[nombre]
+        self[nombre] = funcion
+        return funcion
+    
+    def update(self, *args, **kwargs):
+        nuevas = dict(*args, **kwargs)
+        if self._diario is not None:
+            for nombre in nuevas:
+                self._anotar(nombre)
+        super().update(nuevas)
+        self._eliminadas.difference_update(nuevas)
+        self.version += 1
+    
+    def clear(self):
+        if self._diario is not None:
+            for nombre in self.nombres():
+                self._anotar(nombre)
+        super().clear()
+        if self.registro is not None:
+            self._eliminadas.update(self.registro.nombres())
+        self.version += 1
+    
+    def nombres(self):
+        """Retorna todos los nombres disponibles, cargados o no"""
+        nombres = set(super().keys())
+        if self.registro is not None:
+            nombres.update(n for n in self.registro.nombres() if n not in self._eliminadas)
+        return sorted(nombres)
+    
+    def iniciar_diario(self):
+        """Empieza a recordar el estado anterior de los nombres que cambian"""
+        self._diario = {}
+    
+    def terminar_diario(self, deshacer=False):
+        """
+        Deja de recordar cambios
+        
+        Args:
+            deshacer: bool - Si se restauran los nombres que cambiaron
+                      desde iniciar_diario()
+        """
+        diario, self._diario = self._diario, None
+        if not deshacer or not diario:
+            return
+        for nombre, (funcion, eliminada) in diario.items():
+            if funcion is None:
+                super().pop(nombre, None)
+            else:
+                super().__setitem__(nombre, funcion)
+            if eliminada:
+                self._eliminadas.add(nombre)
+            else:
+                self._eliminadas.discard(nombre)
+        self.version += 1
+    
+    def _anotar(self, nombre):
+        """Guarda en el diario el estado de un nombre antes de su primer cambio"""
+        if nombre not in self._diario:
+            self._diario[nombre] = (dict.get(self, nombre), nombre in self._eliminadas)
@@ -0,0 +1,332 @@
+"""
+Funciones definidas por el usuario
+
+Una definición como
+
+    f(x, y) = x * y + 1
+
+crea una FuncionUsuario. Su cuerpo se traduce una sola vez a código
+postfijo y se ejecuta en una máquina de pila explícita, de modo que las
+llamadas anidadas (o recursivas) entre funciones del usuario no consumen
+la pila de Python: al superar MAX_PROFUNDIDAD se produce un ErrorSemantico
+en lugar de un RecursionError.
+
+Una función es pura si su cuerpo solo lee sus parámetros, no asigna
+variables y solo llama a funciones puras. Las funciones puras se memorizan
+en la caché del evaluador (ver Memoizacion) igual que las built-in.
+"""
+
+from ASA import *
+from Errores import ErrorSemantico
+from Cuerda import aplanar
+from Funciones import FuncionBuiltIn
+
+
+# Número máximo de llamadas anidadas entre funciones del usuario
+MAX_PROFUNDIDAD = 100000
+
+# Instrucciones de la máquina de pila: (código, argumento)
+CONSTANTE = 0   # valor del literal
+PARAMETRO = 1   # índice del parámetro
+GLOBAL = 2      # nombre de la variable del entorno
+BINARIA = 3     # token del operador
+UNARIA = 4      # token del operador
+ASIGNAR = 5     # nombre de la variable (el valor queda en la pila)
+LLAMAR = 6      # nodo Llamada
+DEFINIR = 7     # nodo DefinicionFuncion
+
+
+class FuncionUsuario(FuncionBuiltIn):
+    """
+    Función definida en el propio lenguaje.
+    
+    La pureza depende de las demás funciones de la tabla (que pueden
+    redefinirse), por lo que se calcula bajo demanda cada vez que cambia
+    la versión de la tabla.
+    """
+    
+    def __init__(self, nombre, parametros, cuerpo, tabla):
+        """
+        Constructor
+        
+        Args:
+            nombre: str - Nombre de la función
+            parametros: list - Nombres de los parámetros
+            cuerpo: Nodo - Expresión del cuerpo
+            tabla: TablaFunciones - Tabla donde se resuelven las llamadas
+        """
+        super().__init__(nombre, len(parametros))
+        self.parametros = parametros
+        self.cuerpo = cuerpo
+        self.codigo = compilar_cuerpo(cuerpo, parametros)
+        # Cada instrucción cuesta bastante más que una consulta en la caché
+        self.costo = len(self.codigo) + 1
+        self._tabla = tabla
+        self._version_pureza = None
+    
+    @property
+    def pura(self):
+        """True si el resultado depende solo de los argumentos"""
+        tabla = self._tabla
+        if self._version_pureza != tabla.version:
+            self._pureza = es_pura(self, tabla)
+            self._version_pureza = tabla.version
+        return self._pureza
+    
+    @pura.setter
+    def pura(self, valor):
+        # FuncionBuiltIn asigna pura=False al construirse; se ignora porque
+        # la pureza se deduce del cuerpo
+        self._version_pureza = None
+    
+    def llamar(self, evaluador, argumentos):
+        return ejecutar(evaluador, self, argumentos)
+    
+    def __str__(self):
+        return f"<función {self.nombre}({', '.join(self.parametros)})>"
+    
+    def __repr__(self):
+        return f"FuncionUsuario({self.nombre!r}, {self.parametros!r})"
+
+
+def compilar_cuerpo(cuerpo, parametros):
+    """
+    Traduce el cuerpo de una función a código postfijo
+    
+    Args:
+        cuerpo: Nodo - Expresión del cuerpo
+        parametros: list - Nombres de los parámetros
+    
+    Returns:
+        list: Instrucciones (código, argumento)
+    """
+    indices = {nombre: i for i, nombre in enumerate(parametros)}
+    codigo = []
+    # (nodo, emitir): emitir=True indica que los hijos ya se compilaron
+    pendientes = [(cuerpo, False)]
+    
+    while pendientes:
+        nodo, emitir = pendientes.pop()
+        
+        if emitir:
+            if isinstance(nodo, Binaria):
+                codigo.append((BINARIA, nodo.operador))
+            elif isinstance(nodo, Unaria):
+                codigo.append((UNARIA, nodo.operador))
+            elif isinstance(nodo, Asignacion):
+                codigo.append((ASIGNAR, nodo.nombre.lexema))
+            else:
+                codigo.append((LLAMAR, nodo))
+        elif isinstance(nodo, Literal):
+            codigo.append((CONSTANTE, nodo.valor))
+        elif isinstance(nodo, Variable):
+            nombre = nodo.nombre.lexema
+            if nombre in indices:
+                codigo.append((PARAMETRO, indices[nombre]))
+            else:
+                codigo.append((GLOBAL, nombre))
+        elif isinstance(nodo, Agrupacion):
+            pendientes.append((nodo.expresion, False))
+        elif isinstance(nodo, Binaria):
+            pendientes.append((nodo, True))
+            pendientes.append((nodo.derecha, False))
+            pendientes.append((nodo.izquierda, False))
+        elif isinstance(nodo, Unaria):
+            pendientes.append((nodo, True))
+            pendientes.append((nodo.expresion, False))
+        elif isinstance(nodo, Asignacion):
+            pendientes.append((nodo, True))
+            pendientes.append((nodo.valor, False))
+        elif isinstance(nodo, Llamada):
+            pendientes.append((nodo, True))
+            for argumento in reversed(nodo.argumentos):
+                pendientes.append((argumento, False))
+        elif isinstance(nodo, DefinicionFuncion):
+            codigo.append((DEFINIR, nodo))
+        else:
+            raise ErrorSemantico(f"Expresión no válida en el cuerpo de una función: {nodo}")
+    
+    return codigo
+
+
+def es_pura(funcion, tabla):
+    """
+    Determina si una función del usuario es pura
+    
+    Las llamadas recursivas (directas o mutuas) no impiden la pureza.
+    
+    Args:
+        funcion: FuncionUsuario - Función a analizar
+        tabla: TablaFunciones - Tabla donde se resuelven las llamadas
+    
+    Returns:
+        bool: True si solo lee parámetros, no asigna y llama a funciones puras
+    """
+    visitadas = {funcion}
+    pendientes = [funcion]
+    while pendientes:
+        for codigo, argumento in pendientes.pop().codigo:
+            if codigo in (GLOBAL, ASIGNAR, DEFINIR):
+                return False
+            if codigo != LLAMAR:
+                continue
+            if not isinstance(argumento.callee, Variable):
+                return False
+            llamada = tabla.get(argumento.callee.nombre.lexema)
+            if llamada is None:
+                return False
+            if isinstance(llamada, FuncionUsuario):
+                if llamada not in visitadas:
+                    visitadas.add(llamada)
+                    pendientes.append(llamada)
+            elif not llamada.pura:
+                return False
+    return True
+
+
+def variables_globales(funcion, tabla):
+    """
+    Retorna las variables del entorno que lee una función del usuario,
+    incluidas las que leen las funciones del usuario que llama
+    
+    Args:
+        funcion: FuncionUsuario - Función a analizar
+        tabla: TablaFunciones - Tabla donde se resuelven las llamadas
+    
+    Returns:
+        set: Nombres de variables globales leídas
+    """
+    globales = set()
+    visitadas = {funcion}
+    pendientes = [funcion]
+    while pendientes:
+        for codigo, argumento in pendientes.pop().codigo:
+            if codigo == GLOBAL:
+                globales.add(argumento)
+            elif codigo == LLAMAR and isinstance(argumento.callee, Variable):
+                llamada = tabla.get(argumento.callee.nombre.lexema)
+                if isinstance(llamada, FuncionUsuario) and llamada not in visitadas:
+                    visitadas.add(llamada)
+                    pendientes.append(llamada)
+    return globales
+
+
+def ejecutar(evaluador, funcion, argumentos):
+    """
+    Ejecuta una función del usuario en la máquina de pila
+    
+    Args:
+        evaluador: Evaluador - Evaluador que realiza la llamada
+        funcion: FuncionUsuario - Función a ejecutar
+        argumentos: list - Argumentos evaluados
+    
+    Returns:
+        object: Resultado de la función
+    
+    Raises:
+        ErrorSemantico: Si ocurre un error en el cuerpo o se supera MAX_PROFUNDIDAD
+        ErrorPresupuesto: Si la evaluación agota su presupuesto
+    """
+    operadores = evaluador.operadores
+    entorno = evaluador.entorno
+    cache = evaluador.cache_funciones
+    # Cada marco cobra todas sus instrucciones al entrar
+    presupuesto = evaluador.presupuesto
+    if presupuesto is not None:
+        presupuesto.cobrar(len(funcion.codigo))
+    
+    pila = []
+    marcos = []  # (funcion, codigo, pc, locales, clave) de cada llamador
+    codigo = funcion.codigo
+    locales = argumentos
+    clave = None  # Clave de caché del marco actual (None si no se memoriza)
+    pc = 0
+    
+    while True:
+        if pc == len(codigo):
+            # Retorno: el resultado queda en la cima de la pila
+            if clave is not None:
+                cache.guardar(clave, pila[-1])
+            if not marcos:
+                return pila.pop()
+            funcion, codigo, pc, locales, clave = marcos.pop()
+            continue
+        
+        instruccion, argumento = codigo[pc]
+        pc += 1
+        
+        if instruccion == PARAMETRO:
+            pila.append(locales[argumento])
+        elif instruccion == CONSTANTE:
+            pila.append(argumento)
+        elif instruccion == BINARIA:
+            derecha = pila.pop()
+            izquierda = pila[-1]
+            try:
+                pila[-1] = operadores.binaria(argumento.tipo, izquierda, derecha)
+            except OverflowError:
+                raise ErrorSemantico(
+                    f"Desbordamiento numérico en '{argumento.lexema}': "
+                    f"{type(izquierda).__name__} y {type(derecha).__name__}"
+                )
+        elif instruccion == UNARIA:
+            pila[-1] = operadores.unaria(argumento.tipo, pila[-1])
+        elif instruccion == GLOBAL:
+            try:
+                pila.append(entorno[argumento])
+            except KeyError:
+                raise ErrorSemantico(f"Variable no definida: '{argumento}'")
+        elif instruccion == ASIGNAR:
+            entorno[argumento] = pila[-1]
+        elif instruccion == LLAMAR:
+            llamada, aridad, memoizar = evaluador.sitio_llamada(argumento)
+            if aridad:
+                valores = [aplanar(valor) for valor in pila[-aridad:]]
+                del pila[-aridad:]
+            else:
+                valores = []
+            
+            clave_llamada = cache.clave(llamada, valores) if memoizar else None
+            if clave_llamada is not None:
+                try:
+                    resultado = cache.consultar(clave_llamada)
+                except KeyError:
+                    pass
+                else:
+                    # Un resultado nativo en caché se cobra como uno calculado
+                    if (presupuesto is not None and presupuesto.max_memoria is not None
+                            and not isinstance(llamada, FuncionUsuario)):
+                        presupuesto.cobrar_memoria(resultado)
+                    pila.append(resultado)
+                    continue
+            
+            if isinstance(llamada, FuncionUsuario):
+                if len(marcos) >= MAX_PROFUNDIDAD:
+                    raise ErrorSemantico(
+                        f"Se superó la profundidad máxima de {MAX_PROFUNDIDAD} llamadas "
+                        f"al ejecutar '{llamada.nombre}' (¿recursión infinita?)"
+                    )
+                if presupuesto is not None:
+                    presupuesto.cobrar(len(llamada.codigo))
+                marcos.append((funcion, codigo, pc, locales, clave))
+                funcion, codigo, pc, locales, clave = llamada, llamada.codigo, 0, valores, clave_llamada
+                continue
+            
+            if llamada.asincrona:
+                raise ErrorSemantico(
+                    f"La función '{llamada.nombre}' es asíncrona y no puede llamarse "
+                    f"desde la función '{funcion.nombre}'"
+                )
+            try:
+                resultado = llamada.llamar(evaluador, valores)
+            except ErrorSemantico:
+                raise
+            except Exception as e:
+                raise ErrorSemantico(f"Error al ejecutar '{llamada.nombre}': {str(e)}")
+            if presupuesto is not None and presupuesto.max_memoria is not None:
+                presupuesto.cobrar_memoria(resultado)
+            if clave_llamada is not None:
+                cache.guardar(clave_llamada, resultado)
+            pila.append(resultado)
+        else:
+            pila.append(evaluador.evaluar(argumento))
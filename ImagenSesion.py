@@ -0,0 +1,495 @@
+"""
+Imágenes de sesión: guardar y restaurar el estado del intérprete
+
+Una imagen contiene las variables del entorno, las funciones definidas
+por el usuario, las funciones nativas registradas fuera del registro
+global, el estado de rand(), si los valores vectoriales están habilitados
+(y con qué política) y la caché de ASA del intérprete:
+
+    guardar_sesion("sesion.img", evaluador, cache_ast)
+    ...
+    evaluador, cache_ast = cargar_sesion("sesion.img")
+
+Formato del archivo:
+
+    MAGICO | datos | cabecera | largo de la cabecera (8 bytes)
+
+Cada variable se guarda por separado (pickle comprimido con zlib) en la
+zona de datos; la cabecera, también comprimida, tiene el índice de las
+variables y el resto del estado. Al cargar solo se lee la cabecera: el
+entorno restaurado (EntornoDiferido) lee cada variable la primera vez que
+se consulta, por lo que restaurar una sesión grande no depende de su
+tamaño. La imagen se escribe en un archivo temporal que reemplaza al
+anterior de forma atómica (os.replace).
+
+Una función nativa agregada a la tabla se guarda como "modulo:Clase" y
+se vuelve a crear con Clase(), así que solo se guardan las que pueden
+crearse así (clases importables cuyo constructor no requiere argumentos);
+las demás se omiten y se informan en el resumen. Las cuerdas (Cuerda) se
+guardan como str; solo se omiten las variables con objetos externos que
+pickle no puede serializar (Sesion.guardar lo informa con
+ImagenIncompleta).
+"""
+
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from Cuerda import Cuerda
+from Evaluador import Evaluador
+from Funciones import REGISTRO, RegistroFunciones
+from FuncionesUsuario import FuncionUsuario
+
+
+# Identifica el formato (y su versión) al inicio del archivo
+MAGICO = b"IMGSES01"
+
+# Nivel de compresión de zlib (el 6 es el equilibrio por defecto)
+NIVEL_COMPRESION = 6
+
+
+class ErrorImagen(Exception):
+    """Excepción para imágenes de sesión inválidas o incompatibles"""
+    pass
+
+
+class ImagenIncompleta(ErrorImagen):
+    """
+    La imagen se guardó, pero sin algunas variables o funciones nativas.
+    
+    Attributes:
+        resumen: dict - Resumen de guardar_sesion()
+    """
+    
+    def __init__(self, ruta, resumen):
+        omitidas = resumen["omitidas"] + resumen["funciones_omitidas"]
+        super().__init__(f"La imagen '{ruta}' se guardó sin: {', '.join(omitidas)}")
+        self.resumen = resumen
+
+
+class LectorImagen:
+    """
+    Acceso a las variables de una imagen guardada.
+    
+    Mantiene el archivo abierto para leer las variables a medida que se
+    piden; si la imagen se reemplaza después, este lector sigue leyendo
+    la versión que abrió.
+    """
+    
+    def __init__(self, ruta):
+        """
+        Constructor: lee la cabecera de la imagen
+        
+        Args:
+            ruta: str - Archivo de la imagen
+        
+        Raises:
+            ErrorImagen: Si el archivo no es una imagen de sesión válida
+        """
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        try:
+            if self._archivo.read(len(MAGICO)) != MAGICO:
+                raise ErrorImagen(f"'{ruta}' no es una imagen de sesión compatible")
+            try:
+                self._archivo.seek(-8, os.SEEK_END)
+                fin = self._archivo.tell()
+                largo = int.from_bytes(self._archivo.read(8), "little")
+                self._archivo.seek(fin - largo)
+                self.cabecera = pickle.loads(zlib.decompress(self._archivo.read(largo)))
+            except Exception as e:
+                raise ErrorImagen(f"Cabecera dañada en '{ruta}': {e}") from None
+        except BaseException:
+            self._archivo.close()
+            raise
+        self.indice = self.cabecera["variables"]  # nombre -> (desplazamiento, largo)
+        self._candado = threading.Lock()
+    
+    def leer_bruto(self, nombre):
+        """
+        Lee los bytes comprimidos de una variable
+        
+        Args:
+            nombre: str - Nombre de la variable
+        
+        Returns:
+            bytes: Valor serializado y comprimido
+        
+        Raises:
+            KeyError: Si la variable no está en la imagen
+        """
+        desplazamiento, largo = self.indice[nombre]
+        with self._candado:
+            self._archivo.seek(len(MAGICO) + desplazamiento)
+            return self._archivo.read(largo)
+    
+    def leer(self, nombre):
+        """
+        Lee el valor de una variable
+        
+        Args:
+            nombre: str - Nombre de la variable
+        
+        Returns:
+            object: Valor de la variable
+        
+        Raises:
+            KeyError: Si la variable no está en la imagen
+        """
+        return pickle.loads(zlib.decompress(self.leer_bruto(nombre)))
+    
+    def cerrar(self):
+        """Cierra el archivo de la imagen"""
+        self._archivo.close()
+
+
+class EntornoDiferido(dict):
+    """
+    Entorno restaurado de una imagen que carga cada variable al primer uso.
+    
+    Es un diccionario con las variables ya cargadas o asignadas; las demás
+    se leen de la imagen la primera vez que se consultan (como
+    TablaFunciones con el registro), así que las lecturas posteriores
+    tienen el costo de un dict. Recorrer el entorno completo (items(),
+    values(), copy()...) carga todas las variables pendientes.
+    """
+    
+    def __init__(self, lector, pendientes):
+        """
+        Constructor
+        
+        Args:
+            lector: LectorImagen - Imagen de la que se leen las variables
+            pendientes: iterable - Nombres que aún no se han cargado
+        """
+        super().__init__()
+        self._lector = lector
+        self._pendientes = set(pendientes)
+    
+    @property
+    def pendientes(self):
+        """Cantidad de variables que todavía no se han leído de la imagen"""
+        return len(self._pendientes)
+    
+    def __missing__(self, nombre):
+        if nombre not in self._pendientes:
+            raise KeyError(nombre)
+        valor = self._lector.leer(nombre)
+        self._pendientes.discard(nombre)
+        super().__setitem__(nombre, valor)
+        return valor
+    
+    def __contains__(self, nombre):
+        return super().__contains__(nombre) or nombre in self._pendientes
+    
+    def get(self, nombre, defecto=None):
+        try:
+            return self[nombre]
+        except KeyError:
+            return defecto
+    
+    def __setitem__(self, nombre, valor):
+        self._pendientes.discard(nombre)
+        super().__setitem__(nombre, valor)
+    
+    def __delitem__(self, nombre):
+        if nombre in self._pendientes:
+            self._pendientes.discard(nombre)
+        else:
+            super().__delitem__(nombre)
+    
+    def pop(self, nombre, *defecto):
+        if nombre in self._pendientes:
+            self[nombre]
+        return super().pop(nombre, *defecto)
+    
+    def setdefault(self, nombre, valor=None):
+        if nombre in self:
+            return self[nombre]
+        self[nombre] = valor
+        return valor
+    
+    def update(self, *args, **kwargs):
+        for nombre, valor in dict(*args, **kwargs).items():
+            self[nombre] = valor
+    
+    def clear(self):
+        self._pendientes.clear()
+        super().clear()
+    
+    def __iter__(self):
+        yield from list(super().keys())
+        yield from list(self._pendientes)
+    
+    def __len__(self):
+        return super().__len__() + len(self._pendientes)
+    
+    def keys(self):
+        self.cargar_todo()
+        return super().keys()
+    
+    def values(self):
+        self.cargar_todo()
+        return super().values()
+    
+    def items(self):
+        self.cargar_todo()
+        return super().items()
+    
+    def popitem(self):
+        self.cargar_todo()
+        return super().popitem()
+    
+    def copy(self):
+        self.cargar_todo()
+        return dict(self.items())
+    
+    def __eq__(self, otro):
+        self.cargar_todo()
+        return super().__eq__(otro)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        self.cargar_todo()
+        return super().__repr__()
+    
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+    
+    def cargar_todo(self):
+        """Lee de la imagen todas las variables pendientes"""
+        for nombre in list(self._pendientes):
+            self[nombre]
+    
+    def _reabrir(self, lector):
+        """Pasa a leer las variables pendientes de otra imagen equivalente"""
+        anterior, self._lector = self._lector, lector
+        if anterior is not lector:
+            anterior.cerrar()
+
+
+def guardar_sesion(ruta, evaluador, cache_ast=None):
+    """
+    Guarda una imagen de la sesión de un evaluador
+    
+    Las variables de un EntornoDiferido que aún no se cargaron se copian
+    comprimidas, sin deserializarlas. Las cuerdas se aplanan antes de
+    serializarlas. Las variables cuyo valor no puede serializarse (objetos
+    externos al lenguaje) y las funciones nativas que no pueden volver a crearse
+    desde el registro se omiten (y se informan en el resumen).
+    
+    Args:
+        ruta: str - Archivo de la imagen (se reemplaza si existe)
+        evaluador: Evaluador - Evaluador cuya sesión se guarda
+        cache_ast: Mapping - Caché código fuente -> ASA del intérprete
+    
+    Returns:
+        dict: {"variables": guardadas, "funciones": definidas por el
+              usuario, "omitidas": variables no serializables,
+              "funciones_omitidas": funciones nativas no guardadas,
+              "bytes": tamaño}
+    """
+    entorno = evaluador.entorno
+    diferido = isinstance(entorno, EntornoDiferido)
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(
+        dir=directorio, prefix=os.path.basename(ruta) + ".", suffix=".tmp"
+    )
+    
+    try:
+        indice = {}
+        omitidas = []
+        with os.fdopen(descriptor, "wb") as imagen:
+            imagen.write(MAGICO)
+            desplazamiento = 0
+            
+            if diferido:
+                cargadas = list(dict.items(entorno))
+                for nombre in list(entorno._pendientes):
+                    bruto = entorno._lector.leer_bruto(nombre)
+                    imagen.write(bruto)
+                    indice[nombre] = (desplazamiento, len(bruto))
+                    desplazamiento += len(bruto)
+            else:
+                cargadas = list(entorno.items())
+            
+            for nombre, valor in cargadas:
+                if isinstance(valor, Cuerda):
+                    valor = valor.aplanar()
+                try:
+                    bruto = zlib.compress(pickle.dumps(valor, pickle.HIGHEST_PROTOCOL), NIVEL_COMPRESION)
+                except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+                    omitidas.append(nombre)
+                    continue
+                imagen.write(bruto)
+                indice[nombre] = (desplazamiento, len(bruto))
+                desplazamiento += len(bruto)
+            
+            cabecera, funciones_omitidas = _cabecera(evaluador, indice, cache_ast)
+            cabecera_bytes = zlib.compress(pickle.dumps(cabecera, pickle.HIGHEST_PROTOCOL), NIVEL_COMPRESION)
+            imagen.write(cabecera_bytes)
+            imagen.write(len(cabecera_bytes).to_bytes(8, "little"))
+            imagen.flush()
+            os.fsync(imagen.fileno())
+        
+        # En Windows no se puede reemplazar un archivo abierto
+        if diferido and os.path.abspath(entorno._lector.ruta) == os.path.abspath(ruta):
+            entorno._lector.cerrar()
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    
+    if diferido and entorno._pendientes:
+        entorno._reabrir(LectorImagen(ruta))
+    
+    return {
+        "variables": len(indice),
+        "funciones": len(cabecera["funciones"]),
+        "omitidas": omitidas,
+        "funciones_omitidas": funciones_omitidas,
+        "bytes": os.path.getsize(ruta),
+    }
+
+
+def cargar_sesion(ruta, clase=Evaluador):
+    """
+    Restaura una sesión guardada con guardar_sesion()
+    
+    Solo se lee la cabecera; las variables se cargan al consultarlas.
+    Las funciones nativas que no están en el registro global se
+    registran en un registro propio y se importan al primer uso. Si la
+    sesión tenía valores vectoriales, se vuelven a habilitar.
+    
+    Args:
+        ruta: str - Archivo de la imagen
+        clase: type - Clase del evaluador a crear
+    
+    Returns:
+        tuple: (evaluador, cache_ast) con cache_ast un OrderedDict
+               código fuente -> ASA
+    
+    Raises:
+        ErrorImagen: Si el archivo no es una imagen de sesión válida (o
+                     requiere NumPy y no está instalado)
+    """
+    lector = LectorImagen(ruta)
+    cabecera = lector.cabecera
+    
+    especificaciones = cabecera["registro"]
+    if especificaciones == _especificaciones(REGISTRO):
+        registro = REGISTRO
+    else:
+        registro = RegistroFunciones()
+        for nombre, especificacion in especificaciones.items():
+            registro.registrar(nombre, especificacion)
+    
+    entorno = EntornoDiferido(lector, lector.indice)
+    evaluador = clase(registro=registro, semilla=cabecera["semilla"], entorno=entorno)
+    if cabecera["aleatorio"] is not None:
+        evaluador.aleatorio = cabecera["aleatorio"]
+    
+    funciones = evaluador.funciones
+    for nombre in cabecera["eliminadas"]:
+        if nombre in funciones:
+            del funciones[nombre]
+    for nombre, parametros, cuerpo in cabecera["funciones"]:
+        funciones[nombre] = FuncionUsuario(nombre, parametros, cuerpo, funciones)
+    
+    politica = cabecera.get("vectores")
+    if politica is not None:
+        from Vectores import habilitar_vectores
+        try:
+            habilitar_vectores(evaluador, politica)
+        except ImportError as e:
+            lector.cerrar()
+            raise ErrorImagen(f"La imagen '{ruta}' usa valores vectoriales: {e}") from None
+    
+    cache = OrderedDict()
+    for fuente, ast in cabecera["cache_ast"]:
+        # Cada ASA se serializó por separado (las imágenes anteriores guardaban el ASA)
+        cache[fuente] = pickle.loads(ast) if isinstance(ast, bytes) else ast
+    return evaluador, cache
+
+
+def _cabecera(evaluador, indice, cache_ast):
+    """Reúne el estado de la sesión que no son variables; retorna (cabecera, funciones omitidas)"""
+    funciones = evaluador.funciones
+    registro = funciones.registro
+    especificaciones = _especificaciones(registro) if registro is not None else {}
+    
+    politica = evaluador.politica_vectores
+    definidas = []
+    omitidas = []
+    for nombre, funcion in dict.items(funciones):
+        if isinstance(funcion, FuncionUsuario):
+            definidas.append((nombre, funcion.parametros, funcion.cuerpo))
+        elif registro is None or nombre not in registro or registro.obtener(nombre) is not funcion:
+            # Función nativa agregada directamente a la tabla
+            if politica is not None and _es_vectorial(funcion):
+                continue  # habilitar_vectores() la vuelve a crear al cargar
+            if _construible(type(funcion)):
+                especificaciones[nombre] = _especificacion(type(funcion))
+            else:
+                omitidas.append(nombre)
+    
+    eliminadas = []
+    if registro is not None:
+        eliminadas = [nombre for nombre in registro.nombres() if nombre not in funciones]
+    
+    # Los ASA muy anidados pueden exceder el límite de recursión de pickle;
+    # cada uno se serializa una sola vez y la cabecera guarda los bytes
+    entradas = []
+    for fuente, ast in (cache_ast or {}).items():
+        try:
+            entradas.append((fuente, pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)))
+        except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+            continue
+    
+    return {
+        "variables": indice,
+        "funciones": definidas,
+        "registro": especificaciones,
+        "eliminadas": eliminadas,
+        "semilla": evaluador.aleatorio.semilla,
+        "aleatorio": evaluador.aleatorio,
+        "vectores": politica,
+        "cache_ast": entradas,
+    }, omitidas
+
+
+def _especificaciones(registro):
+    """Especificaciones "modulo:Clase" de todas las funciones de un registro"""
+    return {
+        nombre: especificacion if isinstance(especificacion, str) else _especificacion(especificacion)
+        for nombre, especificacion in registro._especificaciones.items()
+    }
+
+
+def _especificacion(clase):
+    """Especificación "modulo:Clase" de una clase de función"""
+    return f"{clase.__module__}:{clase.__qualname__}"
+
+
+def _construible(clase):
+    """True si el registro puede volver a crear la clase: importable y sin argumentos obligatorios"""
+    if clase.__module__ == "__main__" or "<locals>" in clase.__qualname__:
+        return False
+    try:
+        inspect.signature(clase).bind()
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _es_vectorial(funcion):
+    """True si la función es una de las que agrega Vectores.habilitar_vectores()"""
+    from Vectores import FuncionVectorial
+    return isinstance(funcion, FuncionVectorial)
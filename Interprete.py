@@ -11,94 +11,280 @@ Este programa implementa un intérprete interactivo que:
 4. Muestra los resultados
 
 Para salir: Ctrl+D (Linux/Mac) o Ctrl+Z seguido de Enter (Windows)
+
+Las sentencias se evalúan en un Planificador, así que el REPL sigue
+atendiendo el teclado mientras evalúa:
+
+- Ctrl+C cancela solo la sentencia en curso y deshace sus asignaciones.
+- Una sentencia terminada en "&" se evalúa en segundo plano, sobre una
+  copia de la sesión; al terminar se informa su resultado y sus
+  asignaciones y definiciones pasan a la sesión (salvo las variables y
+  funciones que se modificaron mientras tanto). Las sentencias normales tienen prioridad sobre ella.
+  
+    >>> total = h30(1) &
+    [1] total = h30(1)
+    >>> x = 2
+    ...
+    [1] Terminado: total = h30(1)
+
+Con --sesion RUTA la sesión (variables, funciones y caché de análisis) se
+restaura al iniciar, si el archivo existe, y se guarda al salir:
+
+    python Interprete.py --sesion trabajo.img
 """
 
+import argparse
+import io
+import itertools
+import os
 import sys
-from Scanner import Scanner
-from Parser import Parser
-from Evaluador import Evaluador, ErrorSemantico
+from FuncionesUsuario import FuncionUsuario
+from Planificador import Planificador
+from Sesion import Sesion
+
+# Marca de una variable que no existía al iniciar un trabajo
+_AUSENTE = object()
+
 
 class Interprete:
     """Clase principal del intérprete"""
     
-    existen_errores = False
-    evaluador = Evaluador()  # Evaluador compartido para mantener el entorno
+    sesion = Sesion()  # Sesión del REPL (evaluador, entorno y estado de error)
+    planificador = None  # Planificador de las evaluaciones (lo crea planificar())
+    trabajos = {}  # Número -> futuro de los trabajos en segundo plano
+    _numeros = itertools.count(1)
+    _en_prompt = False  # Si el REPL espera una línea del teclado
     
     @staticmethod
-    def main():
-        """Función principal que ejecuta el REPL"""
+    def main(argumentos=None):
+        """
+        Función principal que ejecuta el REPL
+        
+        Args:
+            argumentos: list - Argumentos de la línea de comandos (por
+                        defecto sys.argv[1:])
+        """
+        analizador = argparse.ArgumentParser(description="Intérprete de Lenguaje Estructurado")
+        analizador.add_argument("--sesion", metavar="RUTA",
+                                help="Imagen de sesión que se restaura al iniciar y se guarda al salir")
+        opciones = analizador.parse_args(argumentos)
+        
         print("Intérprete de Lenguaje Estructurado")
         print("=" * 40)
         print("Ingrese expresiones para analizar.")
         print("Para salir: Ctrl+D (Linux/Mac) o Ctrl+Z + Enter (Windows)")
+        print("Ctrl+C cancela la evaluación en curso; 'línea &' la evalúa en segundo plano")
         print("=" * 40)
         print()
         
-        while True:
-            try:
-                # Mostrar el prompt
-                linea = input(">>> ")
-                
-                # Si la línea está vacía, continuar
-                if not linea.strip():
-                    continue
-                
-                # Ejecutar la línea
-                Interprete.ejecutar(linea)
-                
-                # Resetear el flag de errores
-                Interprete.existen_errores = False
+        if opciones.sesion and os.path.exists(opciones.sesion):
+            Interprete.restaurar_sesion(opciones.sesion)
+        
+        Interprete.planificar()
+        try:
+            while True:
+                try:
+                    # Mostrar el prompt
+                    Interprete._en_prompt = True
+                    linea = input(">>> ")
+                    Interprete._en_prompt = False
+                    
+                    # Si la línea está vacía, continuar
+                    if not linea.strip():
+                        continue
+                    
+                    # Ejecutar la línea (en segundo plano si termina en "&")
+                    if linea.rstrip().endswith("&"):
+                        Interprete.en_segundo_plano(linea.rstrip()[:-1])
+                    else:
+                        Interprete.ejecutar(linea)
+                    
+                    # Resetear el flag de errores
+                    Interprete.sesion.existen_errores = False
                 
-            except EOFError:
-                # El usuario presionó Ctrl+D (o Ctrl+Z en Windows)
-                print("\n\n¡Hasta luego!")
-                break
-            except KeyboardInterrupt:
-                # El usuario presionó Ctrl+C
-                print("\n\n¡Hasta luego!")
-                break
+                except EOFError:
+                    # El usuario presionó Ctrl+D (o Ctrl+Z en Windows)
+                    print("\n\n¡Hasta luego!")
+                    break
+                except KeyboardInterrupt:
+                    # Ctrl+C sin evaluación en curso: se descarta la línea
+                    Interprete._en_prompt = False
+                    print("\n(Ctrl+C cancela la evaluación en curso; para salir use Ctrl+D)")
+        finally:
+            Interprete.cancelar_trabajos()
+            Interprete.planificador.cerrar()
+            Interprete.planificador = None
+        
+        if opciones.sesion:
+            Interprete.guardar_sesion(opciones.sesion)
+    
+    @staticmethod
+    def guardar_sesion(ruta):
+        """
+        Guarda la sesión actual en una imagen (ver ImagenSesion)
+        
+        Args:
+            ruta: str - Archivo de la imagen
+        """
+        from ImagenSesion import ImagenIncompleta
+        try:
+            resumen = Interprete.sesion.guardar(ruta)
+        except ImagenIncompleta as ex:
+            resumen = ex.resumen
+        except Exception as ex:
+            print(f"\nERROR:\n  No se pudo guardar la sesión: {ex}\n", file=sys.stderr)
+            return
+        print(f"Sesión guardada en {ruta}: {resumen['variables']} variables, "
+              f"{resumen['funciones']} funciones")
+        if resumen["omitidas"]:
+            print(f"  Variables no guardadas: {', '.join(resumen['omitidas'])}", file=sys.stderr)
+        if resumen["funciones_omitidas"]:
+            print(f"  Funciones nativas no guardadas (su clase no puede crearse sin "
+                  f"argumentos desde un módulo): {', '.join(resumen['funciones_omitidas'])}",
+                  file=sys.stderr)
+    
+    @staticmethod
+    def restaurar_sesion(ruta):
+        """
+        Reemplaza la sesión actual por la guardada en una imagen
+        
+        Args:
+            ruta: str - Archivo de la imagen
+        """
+        try:
+            Interprete.sesion = Sesion.restaurar(ruta, Interprete.sesion.cache_ast)
+        except Exception as ex:
+            print(f"\nERROR:\n  No se pudo restaurar la sesión: {ex}\n", file=sys.stderr)
+            return
+        print(f"Sesión restaurada desde {ruta}: {len(Interprete.sesion.entorno)} variables")
+        print()
+    
+    @staticmethod
+    def planificar():
+        """
+        Crea el planificador de las evaluaciones del REPL, si no existe
+        
+        Returns:
+            Planificador: Planificador con un trabajador; la sesión del REPL
+                          tiene prioridad sobre los trabajos en segundo plano
+        """
+        if Interprete.planificador is None:
+            Interprete.planificador = Planificador(trabajadores=1)
+        Interprete.planificador.registrar(Interprete.sesion, prioridad=0)
+        return Interprete.planificador
     
     @staticmethod
     def ejecutar(source):
         """
         Ejecuta el análisis léxico, sintáctico y semántico de una cadena
         
+        Con el planificador del REPL, Ctrl+C (KeyboardInterrupt) mientras
+        se espera cancela la evaluación y deshace sus asignaciones.
+        
         Args:
             source: str - Cadena de entrada a analizar
         """
-        try:
-            # Fase 1: Análisis Léxico (Scanner)
-            scanner = Scanner(source)
-            tokens = scanner.scan()
-            
-            # Fase 2: Análisis Sintáctico (Parser)
-            parser = Parser(tokens)
-            ast = parser.parse()
-            
-            # Fase 3: Evaluación del ASA
-            resultado, debe_imprimir = Interprete.evaluador.evaluar(ast)
-            
-            # Imprimir el resultado si no hay punto y coma
-            if debe_imprimir:
-                if resultado is None:
-                    print("null")
-                elif isinstance(resultado, bool):
-                    print("true" if resultado else "false")
+        planificador = Interprete.planificador
+        if planificador is None:
+            Interprete.sesion.ejecutar(source)
+            return
+        
+        futuro = planificador.ejecutar(Interprete.sesion, Interprete.sesion.ejecutar, source)
+        while True:
+            try:
+                futuro.result()
+                return
+            except KeyboardInterrupt:
+                if planificador.cancelar(futuro):
+                    print("\nCancelando...", file=sys.stderr)
+    
+    @staticmethod
+    def en_segundo_plano(source):
+        """
+        Evalúa una cadena en segundo plano sobre una copia de la sesión
+        
+        Al terminar se informa el resultado y, si no hubo errores, sus
+        asignaciones y definiciones pasan a la sesión, excepto las
+        variables y funciones que la sesión modificó mientras tanto.
+        
+        Args:
+            source: str - Cadena de entrada (sin el "&")
+        
+        Returns:
+            int: Número del trabajo
+        """
+        planificador = Interprete.planificar()
+        numero = next(Interprete._numeros)
+        copia = Interprete.sesion.bifurcar(salida=io.StringIO())
+        # Estado al iniciar: variables, funciones de la copia y de la sesión
+        iniciales = (dict(copia.entorno), dict(dict.items(copia.evaluador.funciones)),
+                     dict(dict.items(Interprete.sesion.evaluador.funciones)))
+        planificador.registrar(copia, prioridad=1)
+        futuro = planificador.ejecutar(copia, copia.ejecutar, source)
+        Interprete.trabajos[numero] = futuro
+        print(f"[{numero}] {source.strip()}")
+        
+        def terminado(futuro):
+            # Los cambios se aplican en el turno de la sesión, nunca durante otra evaluación
+            try:
+                planificador.ejecutar(Interprete.sesion, Interprete._terminar,
+                                      numero, source, copia, iniciales, futuro)
+            except RuntimeError:
+                pass  # El REPL ya terminó
+        
+        futuro.add_done_callback(terminado)
+        return numero
+    
+    @staticmethod
+    def cancelar_trabajos():
+        """Cancela los trabajos en segundo plano que no terminaron"""
+        for futuro in list(Interprete.trabajos.values()):
+            Interprete.planificador.cancelar(futuro)
+        Interprete.trabajos.clear()
+    
+    @staticmethod
+    def _terminar(numero, source, copia, iniciales, futuro):
+        """Informa el resultado de un trabajo en segundo plano y aplica sus cambios"""
+        Interprete.trabajos.pop(numero, None)
+        texto = ""
+        conservadas = []
+        if futuro.cancelled():
+            estado = "Cancelado"
+        elif futuro.exception() is not None:
+            estado = "Terminado con errores"
+            texto = str(futuro.exception())
+        elif not futuro.result():
+            estado = "Terminado con errores"
+        else:
+            estado = "Terminado"
+            variables, funciones_copia, funciones_sesion = iniciales
+            entorno = Interprete.sesion.entorno
+            for nombre, valor in copia.entorno.items():
+                anterior = variables.get(nombre, _AUSENTE)
+                if valor is anterior:
+                    continue
+                if entorno.get(nombre, _AUSENTE) is not anterior:
+                    conservadas.append(nombre)
                 else:
-                    print(resultado)
-            
-        except ErrorSemantico as ex:
-            # Mostrar error semántico
-            print(f"\nERROR SEMÁNTICO:")
-            print(f"  {str(ex)}")
-            print()
-            Interprete.existen_errores = True
-        except Exception as ex:
-            # Mostrar el error
-            print(f"\nERROR:")
-            print(f"  {str(ex)}")
-            print()
-            Interprete.existen_errores = True
+                    entorno[nombre] = valor
+            tabla = Interprete.sesion.evaluador.funciones
+            for nombre, funcion in dict.items(copia.evaluador.funciones):
+                if not isinstance(funcion, FuncionUsuario) or funciones_copia.get(nombre) is funcion:
+                    continue
+                actual = dict.get(tabla, nombre)
+                if actual is not funciones_sesion.get(nombre) and isinstance(actual, FuncionUsuario):
+                    conservadas.append(f"{nombre}()")
+                else:
+                    tabla[nombre] = FuncionUsuario(nombre, funcion.parametros, funcion.cuerpo, tabla)
+        
+        print(f"\n[{numero}] {estado}: {source.strip()}")
+        texto = texto or copia.salida.getvalue().strip("\n")
+        if texto:
+            print(texto)
+        if conservadas:
+            print(f"  Modificadas mientras tanto (no se sobrescriben): {', '.join(conservadas)}")
+        if Interprete._en_prompt:
+            print(">>> ", end="", flush=True)
     
     @staticmethod
     def error(linea, mensaje):
@@ -122,7 +308,7 @@ class Interprete:
             mensaje: str - Mensaje de error
         """
         print(f"[línea {linea}] Error {posicion}: {mensaje}", file=sys.stderr)
-        Interprete.existen_errores = True
+        Interprete.sesion.existen_errores = True
 
 
 if __name__ == "__main__":
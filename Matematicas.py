@@ -0,0 +1,101 @@
+"""
+Funciones matemáticas del lenguaje: rand, sin, cos, sqrt y pow
+
+Este módulo se importa bajo demanda desde el registro de funciones
+(ver Funciones.REGISTRO) la primera vez que se usa alguna de ellas.
+"""
+
+import math
+from Errores import ErrorSemantico
+from Funciones import FuncionTipada, Firma, NUMERO
+
+
+# Tamaño máximo (en bits) de un resultado exacto de pow() con enteros
+MAX_BITS_POTENCIA = 1 << 20
+
+
+class FuncionRand(FuncionTipada):
+    """Función rand() - genera número aleatorio entre 0 y 1"""
+    
+    firma = Firma(usa_evaluador=True)
+    
+    def __init__(self):
+        super().__init__("rand")
+    
+    def calcular(self, evaluador):
+        # Cada evaluador tiene su propio flujo (reproducible con su semilla)
+        return evaluador.aleatorio.siguiente()
+
+
+class FuncionSin(FuncionTipada):
+    """Función sin(angulo) - seno en radianes"""
+    
+    firma = Firma(NUMERO, pura=True, costo=2)
+    calcular = staticmethod(math.sin)
+    
+    def __init__(self):
+        super().__init__("sin")
+
+
+class FuncionCos(FuncionTipada):
+    """Función cos(angulo) - coseno en radianes"""
+    
+    firma = Firma(NUMERO, pura=True, costo=2)
+    calcular = staticmethod(math.cos)
+    
+    def __init__(self):
+        super().__init__("cos")
+
+
+class FuncionSqrt(FuncionTipada):
+    """Función sqrt(valor) - raíz cuadrada"""
+    
+    firma = Firma(NUMERO, pura=True, costo=2)
+    
+    def __init__(self):
+        super().__init__("sqrt")
+    
+    def calcular(self, valor):
+        if valor < 0:
+            raise ErrorSemantico(f"sqrt() no puede calcular la raíz cuadrada de un número negativo: {valor}")
+        return math.sqrt(valor)
+
+
+class FuncionPow(FuncionTipada):
+    """Función pow(base, exponente) - potencia"""
+    
+    firma = Firma(NUMERO, NUMERO, pura=True, costo=2)
+    
+    def __init__(self):
+        super().__init__("pow")
+    
+    def calcular(self, base, exponente):
+        if type(base) is int and type(exponente) is int and exponente >= 0:
+            return potencia_entera(base, exponente)
+        return math.pow(base, exponente)
+
+
+def potencia_entera(base, exponente):
+    """
+    Calcula base**exponente de forma exacta para enteros
+    
+    Usa la exponenciación binaria de los enteros de Python, que requiere
+    O(log exponente) multiplicaciones.
+    
+    Args:
+        base: int - Base
+        exponente: int - Exponente no negativo
+    
+    Returns:
+        int: Potencia exacta
+    
+    Raises:
+        ErrorSemantico: Si el resultado excede MAX_BITS_POTENCIA
+    """
+    if base in (-1, 0, 1):
+        return base ** exponente
+    # log2 da el tamaño casi exacto; bit_length() - 1 lo subestima hasta en
+    # un factor log2(3) para las bases que no son potencias de dos
+    if exponente * math.log2(abs(base)) > MAX_BITS_POTENCIA:
+        raise ErrorSemantico(f"pow() produce un entero demasiado grande: {base}^{exponente}")
+    return base ** exponente
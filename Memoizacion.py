@@ -0,0 +1,252 @@
+"""
+Memoización de funciones puras
+
+Las funciones que declaran pura=True se memorizan en una caché LRU
+acotada, indexada por la función y los valores (y tipos) de sus
+argumentos. La capacidad es global para todas las funciones y cada una
+lleva sus propios contadores de aciertos, fallos y desalojos.
+"""
+
+from collections import OrderedDict
+
+
+# Capacidad por defecto de la caché (entradas, sumando todas las funciones)
+CAPACIDAD_POR_DEFECTO = 4096
+
+# Costo mínimo declarado para que una función pura se memorice. Un costo
+# de 1 equivale aproximadamente a una consulta en la caché: las funciones
+# con costo 1 no se memorizan por defecto. sin/cos/sqrt/pow declaran
+# costo 2 porque suelen llamarse con pocas entradas distintas (p. ej.
+# lecturas cuantizadas de sensores) y pow() exacto con enteros grandes es
+# costoso.
+COSTO_MINIMO_POR_DEFECTO = 2
+
+
+class EstadisticasFuncion:
+    """Contadores de uso de la caché para una función"""
+    
+    __slots__ = ("aciertos", "fallos", "desalojos")
+    
+    def __init__(self):
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
+    def como_dict(self):
+        """Retorna los contadores como diccionario"""
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+        }
+
+
+class CacheFunciones:
+    """
+    Caché LRU de resultados de funciones puras.
+    
+    Las claves incluyen el tipo de cada argumento para que 2 y 2.0 no
+    compartan entrada. Los argumentos no hashables y el cero flotante
+    (cuyo signo no distingue la igualdad) se evalúan sin caché.
+    
+    Cambiar capacidad o costo_minimo incrementa 'version', con lo que los
+    evaluadores vuelven a decidir qué sitios de llamada se memorizan.
+    """
+    
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO, costo_minimo=COSTO_MINIMO_POR_DEFECTO):
+        """
+        Constructor
+        
+        Args:
+            capacidad: int - Número máximo de resultados guardados
+            costo_minimo: int - Costo mínimo para memorizar una función
+        """
+        self.version = 0
+        self._capacidad = capacidad
+        self._costo_minimo = costo_minimo
+        self._entradas = OrderedDict()
+        self._estadisticas = {}  # nombre -> EstadisticasFuncion
+    
+    @property
+    def capacidad(self):
+        """Número máximo de resultados guardados"""
+        return self._capacidad
+    
+    @capacidad.setter
+    def capacidad(self, capacidad):
+        self._capacidad = capacidad
+        self.version += 1
+    
+    @property
+    def costo_minimo(self):
+        """Costo mínimo para memorizar una función"""
+        return self._costo_minimo
+    
+    @costo_minimo.setter
+    def costo_minimo(self, costo_minimo):
+        self._costo_minimo = costo_minimo
+        self.version += 1
+    
+    def memoizable(self, funcion):
+        """
+        Indica si los resultados de una función pueden memorizarse
+        
+        Args:
+            funcion: FuncionBuiltIn - Función a consultar
+        
+        Returns:
+            bool: True si es pura y su costo justifica la caché
+        """
+        return funcion.pura and funcion.costo >= self.costo_minimo and self.capacidad > 0
+    
+    def llamar1(self, evaluador, funcion, a):
+        """Llama a una función de un argumento a través de la caché"""
+        if type(a) is float and not a:
+            return funcion.llamar1(evaluador, a)
+        clave = (funcion, type(a), a)
+        try:
+            valor = self._entradas[clave]
+        except KeyError:
+            self._contadores(funcion).fallos += 1
+            valor = funcion.llamar1(evaluador, a)
+            self._guardar(funcion, clave, valor)
+            return valor
+        except TypeError:
+            return funcion.llamar1(evaluador, a)
+        self._entradas.move_to_end(clave)
+        self._contadores(funcion).aciertos += 1
+        return valor
+    
+    def llamar2(self, evaluador, funcion, a, b):
+        """Llama a una función de dos argumentos a través de la caché"""
+        if (type(a) is float and not a) or (type(b) is float and not b):
+            return funcion.llamar2(evaluador, a, b)
+        clave = (funcion, type(a), a, type(b), b)
+        try:
+            valor = self._entradas[clave]
+        except KeyError:
+            self._contadores(funcion).fallos += 1
+            valor = funcion.llamar2(evaluador, a, b)
+            self._guardar(funcion, clave, valor)
+            return valor
+        except TypeError:
+            return funcion.llamar2(evaluador, a, b)
+        self._entradas.move_to_end(clave)
+        self._contadores(funcion).aciertos += 1
+        return valor
+    
+    def llamar(self, evaluador, funcion, argumentos):
+        """Llama a una función de aridad arbitraria a través de la caché"""
+        clave = [funcion]
+        for argumento in argumentos:
+            if type(argumento) is float and not argumento:
+                return funcion.llamar(evaluador, argumentos)
+            clave.append(type(argumento))
+            clave.append(argumento)
+        clave = tuple(clave)
+        try:
+            valor = self._entradas[clave]
+        except KeyError:
+            self._contadores(funcion).fallos += 1
+            valor = funcion.llamar(evaluador, argumentos)
+            self._guardar(funcion, clave, valor)
+            return valor
+        except TypeError:
+            return funcion.llamar(evaluador, argumentos)
+        self._entradas.move_to_end(clave)
+        self._contadores(funcion).aciertos += 1
+        return valor
+    
+    def clave(self, funcion, argumentos):
+        """
+        Construye la clave de caché de una llamada
+        
+        Args:
+            funcion: FuncionBuiltIn - Función llamada
+            argumentos: list - Argumentos evaluados
+        
+        Returns:
+            tuple: Clave de la llamada, o None si no puede memorizarse
+        """
+        clave = [funcion]
+        for argumento in argumentos:
+            if type(argumento) is float and not argumento:
+                return None
+            clave.append(type(argumento))
+            clave.append(argumento)
+        clave = tuple(clave)
+        try:
+            hash(clave)
+        except TypeError:
+            return None
+        return clave
+    
+    def consultar(self, clave):
+        """
+        Busca un resultado guardado
+        
+        Args:
+            clave: tuple - Clave obtenida con clave()
+        
+        Returns:
+            object: Resultado guardado
+        
+        Raises:
+            KeyError: Si no hay resultado (se cuenta como fallo)
+        """
+        try:
+            valor = self._entradas[clave]
+        except KeyError:
+            self._contadores(clave[0]).fallos += 1
+            raise
+        self._entradas.move_to_end(clave)
+        self._contadores(clave[0]).aciertos += 1
+        return valor
+    
+    def guardar(self, clave, valor):
+        """Guarda el resultado de una llamada cuya clave se obtuvo con clave()"""
+        self._guardar(clave[0], clave, valor)
+    
+    def descartar(self, predicado):
+        """
+        Elimina los resultados de las funciones que cumplen un predicado
+        
+        Args:
+            predicado: callable - Recibe la función y retorna True si sus
+                       resultados deben descartarse
+        """
+        for clave in [clave for clave in self._entradas if predicado(clave[0])]:
+            del self._entradas[clave]
+    
+    def estadisticas(self):
+        """
+        Retorna los contadores de cada función memorizada
+        
+        Returns:
+            dict: nombre -> {"aciertos", "fallos", "desalojos"}
+        """
+        return {nombre: contadores.como_dict() for nombre, contadores in self._estadisticas.items()}
+    
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores"""
+        self._entradas.clear()
+        self._estadisticas.clear()
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def _contadores(self, funcion):
+        """Obtiene (creándolos si hace falta) los contadores de una función"""
+        contadores = self._estadisticas.get(funcion.nombre)
+        if contadores is None:
+            contadores = self._estadisticas[funcion.nombre] = EstadisticasFuncion()
+        return contadores
+    
+    def _guardar(self, funcion, clave, valor):
+        """Guarda un resultado nuevo, desalojando el menos usado si hace falta"""
+        if self.capacidad <= 0:
+            return
+        self._entradas[clave] = valor
+        while len(self._entradas) > self.capacidad:
+            desalojada, _ = self._entradas.popitem(last=False)
+            self._contadores(desalojada[0]).desalojos += 1
@@ -0,0 +1,280 @@
+"""
+Variables numéricas en memoria compartida entre procesos
+
+El proceso dueño publica arreglos numéricos en bloques de
+multiprocessing.shared_memory; los procesos de trabajo reciben solo un
+descriptor pequeño (nombre del bloque, tipo y forma) y adjuntan el bloque
+como un arreglo de NumPy de solo lectura, sin copiar ni deserializar los
+datos:
+
+    with MemoriaCompartida() as memoria:
+        memoria.publicar("tabla", tabla)          # se copia una sola vez
+        descriptores = memoria.descriptores()
+        with ProcessPoolExecutor(initializer=adjuntar_en_proceso,
+                                 initargs=(descriptores,)) as grupo:
+            ...
+    
+    # En cada proceso de trabajo
+    evaluador = Evaluador()
+    adjuntar(evaluador, descriptores)   # entorno["tabla"] -> vista compartida
+
+visit_variable retorna la vista tal cual, así que leer la variable no
+copia nada; las operaciones crean arreglos nuevos (ver Vectores). Los
+números sueltos viajan dentro del descriptor.
+
+El dueño es responsable de los bloques: cerrar() (o salir del with, o que
+el objeto se recolecte) los elimina del sistema. Los procesos de trabajo
+conservan sus adjuntos mientras viven.
+"""
+
+import weakref
+from multiprocessing import shared_memory
+from Operadores import NUMEROS
+import Vectores
+
+
+# Tipos de NumPy admitidos: bool, enteros, naturales y reales
+TIPOS_ADMITIDOS = "biuf"
+
+
+class DescriptorCompartido:
+    """
+    Referencia serializable a una variable publicada
+    
+    Los arreglos se describen por su bloque de memoria, tipo y forma; los
+    números se guardan directamente en 'valor' (bloque es None).
+    """
+    
+    __slots__ = ("bloque", "tipo", "forma", "valor")
+    
+    def __init__(self, bloque=None, tipo=None, forma=None, valor=None):
+        """
+        Constructor
+        
+        Args:
+            bloque: str - Nombre del bloque de memoria compartida
+            tipo: str - Tipo de NumPy de los elementos (p. ej. "<f8")
+            forma: tuple - Forma del arreglo
+            valor: int | float - Valor de una variable numérica escalar
+        """
+        self.bloque = bloque
+        self.tipo = tipo
+        self.forma = forma
+        self.valor = valor
+    
+    def __getstate__(self):
+        return (self.bloque, self.tipo, self.forma, self.valor)
+    
+    def __setstate__(self, estado):
+        self.bloque, self.tipo, self.forma, self.valor = estado
+    
+    def __repr__(self):
+        if self.bloque is None:
+            return f"DescriptorCompartido(valor={self.valor!r})"
+        return f"DescriptorCompartido({self.bloque!r}, {self.tipo!r}, {self.forma!r})"
+
+
+class MemoriaCompartida:
+    """
+    Dueño de los bloques de memoria compartida de un conjunto de variables.
+    """
+    
+    def __init__(self):
+        """
+        Constructor
+        
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        if not Vectores.DISPONIBLE:
+            raise ImportError("La memoria compartida requiere NumPy (pip install numpy)")
+        self._bloques = {}       # nombre de variable -> SharedMemory
+        self._descriptores = {}  # nombre de variable -> DescriptorCompartido
+        self._cierre = weakref.finalize(self, _liberar_bloques, self._bloques)
+    
+    def publicar(self, nombre, valor):
+        """
+        Publica una variable numérica
+        
+        Si la variable ya estaba publicada, su bloque anterior se libera.
+        
+        Args:
+            nombre: str - Nombre de la variable
+            valor: int | float | array - Número o arreglo numérico (las
+                   secuencias se convierten con numpy.asarray)
+        
+        Returns:
+            DescriptorCompartido: Descriptor de la variable
+        
+        Raises:
+            TypeError: Si el valor no es numérico
+        """
+        if isinstance(valor, NUMEROS):
+            self.liberar(nombre)
+            descriptor = self._descriptores[nombre] = DescriptorCompartido(valor=valor)
+            return descriptor
+        
+        numpy = Vectores.numpy
+        arreglo = numpy.asarray(valor)
+        if arreglo.dtype.kind not in TIPOS_ADMITIDOS:
+            raise TypeError(f"La variable '{nombre}' no es numérica (tipo {arreglo.dtype})")
+        
+        self.liberar(nombre)
+        # Un bloque no puede tener tamaño 0
+        bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+        self._bloques[nombre] = bloque
+        # El dueño no conserva vistas del bloque, para poder cerrarlo siempre
+        numpy.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+        descriptor = DescriptorCompartido(bloque.name, arreglo.dtype.str, arreglo.shape)
+        self._descriptores[nombre] = descriptor
+        return descriptor
+    
+    def publicar_entorno(self, entorno, nombres=None):
+        """
+        Publica las variables numéricas de un entorno
+        
+        Args:
+            entorno: Mapping - Variables (p. ej. Evaluador.entorno)
+            nombres: iterable - Variables a publicar; por defecto todas las
+                     numéricas (las demás se ignoran)
+        
+        Returns:
+            list: Nombres publicados
+        """
+        publicados = []
+        for nombre in (entorno if nombres is None else nombres):
+            valor = entorno[nombre]
+            if not (isinstance(valor, NUMEROS) or _es_arreglo_numerico(valor)):
+                if nombres is not None:
+                    raise TypeError(f"La variable '{nombre}' no es numérica")
+                continue
+            self.publicar(nombre, valor)
+            publicados.append(nombre)
+        return publicados
+    
+    def descriptores(self):
+        """
+        Retorna los descriptores de las variables publicadas
+        
+        Returns:
+            dict: Nombre -> DescriptorCompartido (se envía a los procesos)
+        """
+        return dict(self._descriptores)
+    
+    def liberar(self, nombre):
+        """
+        Deja de publicar una variable y elimina su bloque
+        
+        Los procesos que ya lo adjuntaron conservan su vista hasta terminar.
+        
+        Args:
+            nombre: str - Nombre de la variable
+        """
+        self._descriptores.pop(nombre, None)
+        bloque = self._bloques.pop(nombre, None)
+        if bloque is not None:
+            _liberar_bloque(bloque)
+    
+    def cerrar(self):
+        """Elimina todos los bloques publicados"""
+        self._descriptores.clear()
+        self._cierre()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.cerrar()
+    
+    def __len__(self):
+        return len(self._descriptores)
+
+
+# Bloques adjuntados en este proceso: nombre del bloque -> (SharedMemory, vista)
+_adjuntos = {}
+
+
+def adjuntar(destino, descriptores):
+    """
+    Agrega las variables publicadas a un evaluador o a un entorno
+    
+    Cada bloque se adjunta una sola vez por proceso. Si el destino es un
+    evaluador, también se habilitan en él los valores vectoriales.
+    
+    Args:
+        destino: Evaluador | MutableMapping - Evaluador o entorno destino
+        descriptores: dict - Nombre -> DescriptorCompartido
+    
+    Returns:
+        dict: Nombre -> valor agregado
+    
+    Raises:
+        ImportError: Si NumPy no está instalado
+        FileNotFoundError: Si el dueño ya liberó algún bloque
+    """
+    valores = {nombre: _adjuntar(descriptor) for nombre, descriptor in descriptores.items()}
+    entorno = getattr(destino, "entorno", None)
+    if entorno is None:
+        entorno = destino
+    else:
+        Vectores.habilitar_vectores(destino)
+    entorno.update(valores)
+    return valores
+
+
+# Descriptores recibidos por adjuntar_en_proceso()
+VARIABLES_PROCESO = {}
+
+
+def adjuntar_en_proceso(descriptores):
+    """
+    Inicializador de un proceso de trabajo: adjunta todos los bloques
+    
+    Las vistas quedan en VARIABLES_PROCESO para los trabajos del proceso.
+    
+    Args:
+        descriptores: dict - Nombre -> DescriptorCompartido
+    """
+    VARIABLES_PROCESO.update(adjuntar({}, descriptores))
+
+
+def _adjuntar(descriptor):
+    """Retorna el valor de un descriptor, adjuntando su bloque si hace falta"""
+    if descriptor.bloque is None:
+        return descriptor.valor
+    if not Vectores.DISPONIBLE:
+        raise ImportError("La memoria compartida requiere NumPy (pip install numpy)")
+    
+    adjunto = _adjuntos.get(descriptor.bloque)
+    if adjunto is None:
+        try:
+            # El dueño elimina el bloque; este proceso no debe hacerlo al terminar
+            bloque = shared_memory.SharedMemory(name=descriptor.bloque, track=False)
+        except TypeError:  # Python < 3.13
+            bloque = shared_memory.SharedMemory(name=descriptor.bloque)
+        vista = Vectores.numpy.ndarray(descriptor.forma, dtype=descriptor.tipo, buffer=bloque.buf)
+        vista.flags.writeable = False
+        adjunto = _adjuntos[descriptor.bloque] = (bloque, vista)
+    return adjunto[1]
+
+
+def _es_arreglo_numerico(valor):
+    """True si el valor es un arreglo de NumPy numérico"""
+    return (Vectores.DISPONIBLE and isinstance(valor, Vectores.numpy.ndarray)
+            and valor.dtype.kind in TIPOS_ADMITIDOS)
+
+
+def _liberar_bloque(bloque):
+    """Elimina un bloque del sistema"""
+    bloque.close()
+    try:
+        bloque.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _liberar_bloques(bloques):
+    """Elimina todos los bloques de un dueño"""
+    for bloque in bloques.values():
+        _liberar_bloque(bloque)
+    bloques.clear()
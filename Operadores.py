@@ -0,0 +1,278 @@
+"""
+Tabla de despacho de operadores
+
+Este módulo centraliza la semántica de los operadores binarios y unarios.
+Cada operación se registra con la clave (operador, tipo izquierdo, tipo
+derecho) y se resuelve con una única búsqueda en un diccionario. El
+resultado de la resolución se guarda en caché por par de tipos, por lo que
+el costo de evaluar una operación no depende de cuántos tipos estén
+registrados.
+
+Ejemplo de extensión para un tipo propio:
+
+    evaluador.operadores.registrar_binario(TipoToken.PLUS, Vector, Vector,
+                                           lambda a, b: a.sumar(b))
+"""
+
+import operator
+from TipoToken import TipoToken
+from Errores import ErrorSemantico
+from Cuerda import Cuerda, concatenar
+
+
+# Símbolo de cada operador, usado en los mensajes de error
+SIMBOLOS = {
+    TipoToken.PLUS: "+",
+    TipoToken.MINUS: "-",
+    TipoToken.STAR: "*",
+    TipoToken.SLASH: "/",
+    TipoToken.MOD: "%",
+}
+
+# Tipos numéricos del lenguaje.
+#
+# Reglas de promoción:
+#   int  (+, -, *, %) int   -> int (exacto, sin límite de tamaño)
+#   int  /            int   -> float (la división siempre es real)
+#   int  (op)         float -> float (y viceversa)
+NUMEROS = (int, float)
+
+
+def nombre_tipo(valor):
+    """
+    Retorna el nombre del tipo de un valor tal como se muestra al usuario
+    
+    Args:
+        valor: object - Valor del lenguaje
+    
+    Returns:
+        str: Nombre del tipo
+    """
+    # Las cuerdas son una representación interna de str
+    if type(valor) is Cuerda:
+        return "str"
+    return type(valor).__name__
+
+
+def _dividir(izquierda, derecha):
+    """División con verificación de divisor cero"""
+    if derecha == 0:
+        raise ErrorSemantico("División por cero")
+    return izquierda / derecha
+
+
+def _modulo(izquierda, derecha):
+    """Módulo con verificación de divisor cero"""
+    if derecha == 0:
+        raise ErrorSemantico("Módulo por cero")
+    return izquierda % derecha
+
+
+def _incompatibles(operador):
+    """
+    Crea el manejador de respaldo para un operador binario sin registro
+    
+    Args:
+        operador: TipoToken - Operador binario
+    
+    Returns:
+        callable: Manejador que lanza el error semántico correspondiente
+    """
+    simbolo = SIMBOLOS.get(operador)
+    
+    def manejador(izquierda, derecha):
+        if simbolo is None:
+            return None
+        raise ErrorSemantico(
+            f"Incompatibilidad de operandos para '{simbolo}': "
+            f"{nombre_tipo(izquierda)} y {nombre_tipo(derecha)}"
+        )
+    
+    return manejador
+
+
+def _no_numerico(operador):
+    """
+    Crea el manejador de respaldo para un operador unario sin registro
+    
+    Args:
+        operador: TipoToken - Operador unario
+    
+    Returns:
+        callable: Manejador que lanza el error semántico correspondiente
+    """
+    simbolo = SIMBOLOS.get(operador)
+    
+    def manejador(operando):
+        if simbolo is None:
+            return None
+        raise ErrorSemantico(
+            f"El operador unario '{simbolo}' requiere un operando numérico, "
+            f"se recibió: {nombre_tipo(operando)}"
+        )
+    
+    return manejador
+
+
+class TablaOperadores:
+    """
+    Registro de manejadores de operadores indexado por tipos de operandos.
+    
+    Los manejadores registrados se buscan por la clase exacta de cada
+    operando y, si no existe, recorriendo su MRO (de modo que bool usa los
+    manejadores de int, igual que con isinstance). La resolución se
+    memoriza por combinación de tipos y la caché se invalida al registrar.
+    """
+    
+    def __init__(self, predeterminados=True):
+        """
+        Constructor
+        
+        Args:
+            predeterminados: bool - Si se registran las operaciones del lenguaje
+        """
+        self._binarios = {}  # (operador, tipo_izq, tipo_der) -> manejador
+        self._unarios = {}   # (operador, tipo) -> manejador
+        self._cache_binarios = {}
+        self._cache_unarios = {}
+        
+        if predeterminados:
+            registrar_predeterminados(self)
+    
+    def registrar_binario(self, operador, tipo_izquierdo, tipo_derecho, manejador):
+        """
+        Registra el manejador de un operador binario para un par de tipos
+        
+        Args:
+            operador: TipoToken - Operador (PLUS, MINUS, ...)
+            tipo_izquierdo: type - Tipo del operando izquierdo
+            tipo_derecho: type - Tipo del operando derecho
+            manejador: callable - Función (izquierda, derecha) -> resultado
+        """
+        self._binarios[(operador, tipo_izquierdo, tipo_derecho)] = manejador
+        self._cache_binarios.clear()
+    
+    def registrar_unario(self, operador, tipo, manejador):
+        """
+        Registra el manejador de un operador unario para un tipo
+        
+        Args:
+            operador: TipoToken - Operador (MINUS)
+            tipo: type - Tipo del operando
+            manejador: callable - Función (operando) -> resultado
+        """
+        self._unarios[(operador, tipo)] = manejador
+        self._cache_unarios.clear()
+    
+    def copiar(self):
+        """
+        Crea una tabla independiente con los mismos manejadores
+        
+        Returns:
+            TablaOperadores: Copia (registrar en ella no afecta a esta)
+        """
+        copia = TablaOperadores(predeterminados=False)
+        copia._binarios.update(self._binarios)
+        copia._unarios.update(self._unarios)
+        return copia
+    
+    def binaria(self, operador, izquierda, derecha):
+        """
+        Aplica un operador binario
+        
+        Args:
+            operador: TipoToken - Operador
+            izquierda: object - Operando izquierdo
+            derecha: object - Operando derecho
+        
+        Returns:
+            object: Resultado de la operación
+        
+        Raises:
+            ErrorSemantico: Si los tipos no son compatibles
+        """
+        try:
+            manejador = self._cache_binarios[(operador, type(izquierda), type(derecha))]
+        except KeyError:
+            manejador = self._resolver_binario(operador, type(izquierda), type(derecha))
+        return manejador(izquierda, derecha)
+    
+    def unaria(self, operador, operando):
+        """
+        Aplica un operador unario
+        
+        Args:
+            operador: TipoToken - Operador
+            operando: object - Operando
+        
+        Returns:
+            object: Resultado de la operación
+        
+        Raises:
+            ErrorSemantico: Si el tipo no es compatible
+        """
+        try:
+            manejador = self._cache_unarios[(operador, type(operando))]
+        except KeyError:
+            manejador = self._resolver_unario(operador, type(operando))
+        return manejador(operando)
+    
+    def _resolver_binario(self, operador, tipo_izquierdo, tipo_derecho):
+        """Busca el manejador binario más específico y lo guarda en caché"""
+        manejador = None
+        for izquierdo in tipo_izquierdo.__mro__:
+            for derecho in tipo_derecho.__mro__:
+                manejador = self._binarios.get((operador, izquierdo, derecho))
+                if manejador is not None:
+                    break
+            if manejador is not None:
+                break
+        
+        if manejador is None:
+            manejador = _incompatibles(operador)
+        
+        self._cache_binarios[(operador, tipo_izquierdo, tipo_derecho)] = manejador
+        return manejador
+    
+    def _resolver_unario(self, operador, tipo):
+        """Busca el manejador unario más específico y lo guarda en caché"""
+        manejador = None
+        for base in tipo.__mro__:
+            manejador = self._unarios.get((operador, base))
+            if manejador is not None:
+                break
+        
+        if manejador is None:
+            manejador = _no_numerico(operador)
+        
+        self._cache_unarios[(operador, tipo)] = manejador
+        return manejador
+
+
+def registrar_predeterminados(tabla):
+    """
+    Registra la semántica estándar de los operadores del lenguaje
+    
+    Args:
+        tabla: TablaOperadores - Tabla a poblar
+    """
+    aritmeticos = {
+        TipoToken.PLUS: operator.add,
+        TipoToken.MINUS: operator.sub,
+        TipoToken.STAR: operator.mul,
+        TipoToken.SLASH: _dividir,
+        TipoToken.MOD: _modulo,
+    }
+    
+    for operador, manejador in aritmeticos.items():
+        for izquierdo in NUMEROS:
+            for derecho in NUMEROS:
+                tabla.registrar_binario(operador, izquierdo, derecho, manejador)
+    
+    # Concatenación de cadenas (str y Cuerda son intercambiables)
+    for izquierdo in (str, Cuerda):
+        for derecho in (str, Cuerda):
+            tabla.registrar_binario(TipoToken.PLUS, izquierdo, derecho, concatenar)
+    
+    for tipo in NUMEROS:
+        tabla.registrar_unario(TipoToken.MINUS, tipo, operator.neg)
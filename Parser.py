@@ -23,6 +23,10 @@ class Parser:
     PRIMARY -> null | number | string | id | ( EXPRESSION )
     ARGUMENTS -> EXPRESSION ARGUMENTS' | Ɛ
     ARGUMENTS' -> , EXPRESSION ARGUMENTS' | Ɛ
+    
+    Si en ASSIGNMENT el TERM es una llamada cuyos argumentos son
+    identificadores, id ( id, ... ) = EXPRESSION, se trata de la
+    definición de una función del usuario.
     """
     
     def __init__(self, tokens):
@@ -86,12 +90,39 @@ class Parser:
         """ASSIGNMENT_OPC -> = EXPRESSION | Ɛ"""
         if self.match(TipoToken.EQUAL):
             valor = self.expression()
+            # f(x, y) = cuerpo define una función
+            if isinstance(izquierda, Llamada):
+                return self.function_definition(izquierda, valor)
             # Validar que el lado izquierdo sea una variable
             if not isinstance(izquierda, Variable):
                 self.error("Objetivo de asignación inválido. Solo se pueden asignar variables.")
             return Asignacion(izquierda.nombre, valor)
         return izquierda
     
+    def function_definition(self, llamada, cuerpo):
+        """
+        Construye la definición de función id ( id, ... ) = EXPRESSION
+        
+        Args:
+            llamada: Llamada - Lado izquierdo, con los parámetros como argumentos
+            cuerpo: Nodo - Expresión del cuerpo
+            
+        Returns:
+            DefinicionFuncion: Nodo de definición
+        """
+        if not isinstance(llamada.callee, Variable):
+            self.error("Nombre de función inválido en la definición")
+        
+        parametros = []
+        for argumento in llamada.argumentos:
+            if not isinstance(argumento, Variable):
+                self.error("Los parámetros de una función deben ser identificadores")
+            if any(p.lexema == argumento.nombre.lexema for p in parametros):
+                self.error(f"Parámetro duplicado: '{argumento.nombre.lexema}'")
+            parametros.append(argumento.nombre)
+        
+        return DefinicionFuncion(llamada.callee.nombre, parametros, cuerpo)
+    
     def term(self):
         """TERM -> FACTOR TERM'"""
         expr = self.factor()
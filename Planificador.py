@@ -0,0 +1,497 @@
+"""
+Planificador de evaluaciones con reparto justo y cesión por porciones de tiempo
+
+Varias sesiones comparten unos pocos trabajadores. Cada evaluación corre
+en su propio hilo, pero solo `trabajadores` de ellas pueden avanzar a la
+vez. Las evaluaciones ceden su turno en los límites de paso del evaluador
+(los mismos puntos donde Presupuesto revisa sus límites) cuando llevan
+más de `porcion` segundos y hay otra sesión esperando, así que una
+fórmula pesada no retrasa a las consultas cortas:
+
+    planificador = Planificador(trabajadores=2, porcion=0.005)
+    planificador.registrar(interactiva, prioridad=0)
+    planificador.registrar(lote, peso=0.5, prioridad=1)
+    futuro = planificador.enviar(interactiva, "x * 2")
+    futuro.result()                          # (resultado, debe_imprimir)
+    planificador.metricas()                  # tiempos de espera en cola
+    planificador.cancelar(futuro)            # detiene y deshace la evaluación
+
+El turno siguiente es para la sesión con menor prioridad numérica y,
+entre las de igual prioridad, con menor tiempo virtual (tiempo de
+ejecución recibido dividido por su peso; reparto justo ponderado por
+tiempo de inicio). Las evaluaciones de una misma sesión se ejecutan en
+el orden en que se enviaron, una a la vez.
+
+Una operación nativa larga (por ejemplo un pow() enorme) no tiene
+límites de paso: no puede interrumpirse para ceder el turno ni para
+cancelarla.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from Presupuesto import Presupuesto
+
+
+# Segundos que una evaluación avanza antes de ceder su turno
+PORCION_POR_DEFECTO = 0.005
+
+# Tiempos de espera que se conservan para las métricas
+MAX_MUESTRAS = 10000
+
+# Segundos que un hilo libre espera otra evaluación antes de terminar
+# (cerrar() los despierta y espera a que terminen)
+ESPERA_HILO_LIBRE = 30.0
+
+
+class Turno(Presupuesto):
+    """
+    Presupuesto de una evaluación planificada: conserva los límites de la
+    sesión y, en cada revisión, cede el turno si se agotó la porción.
+    Siempre es cancelable (ver Planificador.cancelar).
+    """
+    
+    def __init__(self, planificador, tarea, limites=None):
+        """
+        Constructor
+        
+        Args:
+            planificador: Planificador - Planificador de la tarea
+            tarea: _Tarea - Tarea que se evalúa
+            limites: Presupuesto - Límites de la sesión (o None)
+        """
+        if limites is None:
+            super().__init__(cancelable=True)
+        else:
+            super().__init__(limites.max_pasos, limites.max_segundos, limites.max_memoria, cancelable=True)
+        self._planificador = planificador
+        self._tarea = tarea
+    
+    def _revisar(self):
+        super()._revisar()
+        planificador = self._planificador
+        listas = planificador._listas
+        if not listas:
+            return
+        tarea = self._tarea
+        try:
+            # Una sesión de mayor prioridad no espera a que se agote la porción
+            urgente = listas[0][0] < tarea.prioridad
+        except IndexError:  # Otro hilo vació la lista
+            return
+        if urgente or time.perf_counter() - tarea.inicio_porcion >= planificador.porcion:
+            suspendida = planificador._ceder(tarea)
+            if suspendida and self._limite is not None:
+                # El tiempo límite cuenta solo el tiempo en ejecución
+                self._limite += suspendida
+
+
+class Planificador:
+    """
+    Reparte unos pocos turnos de ejecución entre las evaluaciones de
+    muchas sesiones.
+    """
+    
+    def __init__(self, trabajadores=2, porcion=PORCION_POR_DEFECTO):
+        """
+        Constructor
+        
+        Args:
+            trabajadores: int - Evaluaciones que avanzan a la vez
+            porcion: float - Segundos de ejecución antes de ceder el turno
+        """
+        self.trabajadores = trabajadores
+        self.porcion = porcion
+        self._candado = threading.Lock()
+        self._estados = weakref.WeakKeyDictionary()  # Sesion -> _EstadoSesion
+        self._listas = []          # Montículo de sesiones que esperan turno
+        self._secuencia = itertools.count()
+        self._en_ejecucion = 0     # Tareas que tienen turno
+        self._tiempo_virtual = 0.0  # Tiempo virtual de la última sesión atendida
+        self._libres = []          # Hilos sin tarea (_Portador)
+        self._hilos = set()        # Hilos vivos de los portadores
+        self._cerrado = False
+        # Métricas
+        self.completadas = 0
+        self.cesiones = 0
+        self._esperas = deque(maxlen=MAX_MUESTRAS)    # Envío -> primer turno
+        self._latencias = deque(maxlen=MAX_MUESTRAS)  # Envío -> resultado
+    
+    def registrar(self, sesion, peso=1.0, prioridad=0):
+        """
+        Fija el peso y la prioridad de una sesión
+        
+        Args:
+            sesion: Sesion - Sesión
+            peso: float - Parte del tiempo que recibe frente a otras
+                  sesiones de la misma prioridad (2.0 recibe el doble que 1.0)
+            prioridad: int - Las sesiones con menor número se atienden antes
+        """
+        if peso <= 0:
+            raise ValueError("El peso debe ser positivo")
+        with self._candado:
+            estado = self._estado(sesion)
+            estado.peso = peso
+            estado.prioridad = prioridad
+    
+    def enviar(self, sesion, fuente):
+        """
+        Encola la evaluación de una línea en una sesión
+        
+        Args:
+            sesion: Sesion - Sesión
+            fuente: str - Código fuente
+        
+        Returns:
+            Future: Resultado de Sesion.evaluar(): (resultado, debe_imprimir)
+        """
+        return self.ejecutar(sesion, sesion.evaluar, fuente)
+    
+    def ejecutar(self, sesion, funcion, *argumentos):
+        """
+        Encola una función que evalúa en una sesión (p. ej. Sesion.ejecutar)
+        
+        Mientras se ejecuta, las evaluaciones de la sesión ceden su turno
+        en los límites de paso.
+        
+        Args:
+            sesion: Sesion - Sesión en la que evalúa la función
+            funcion: callable - Función a ejecutar
+            argumentos: tuple - Argumentos de la función
+        
+        Returns:
+            Future: Resultado de la función
+        
+        Raises:
+            RuntimeError: Si el planificador está cerrado
+        """
+        tarea = _Tarea(sesion, funcion, argumentos)
+        with self._candado:
+            if self._cerrado:
+                raise RuntimeError("El planificador está cerrado")
+            estado = self._estado(sesion)
+            estado.cola.append(tarea)
+            if estado.activa is None and len(estado.cola) == 1:
+                # La sesión vuelve a competir sin el crédito acumulado mientras estuvo inactiva
+                estado.tiempo_virtual = max(estado.tiempo_virtual, self._tiempo_virtual)
+                self._encolar(estado)
+            self._despachar()
+        return tarea.futuro
+    
+    def cancelar(self, futuro):
+        """
+        Cancela una tarea enviada al planificador
+        
+        Si no empezó, se descarta. Si está en curso, su evaluación se
+        detiene en la siguiente revisión con ErrorCancelado (que recibe el
+        futuro) y se deshacen sus asignaciones.
+        
+        Args:
+            futuro: Future - Futuro retornado por enviar() o ejecutar()
+        
+        Returns:
+            bool: False si la tarea ya había terminado
+        """
+        # Future.cancel() ejecuta las funciones de aviso del futuro, que
+        # pueden volver a llamar al planificador: no se llama con el candado
+        if futuro.cancel():
+            return True
+        with self._candado:
+            for estado in self._estados.values():
+                tarea = estado.activa
+                if tarea is not None and tarea.futuro is futuro:
+                    tarea.cancelada = True
+                    if tarea.turno is not None:
+                        tarea.turno.cancelar()
+                    return True
+        return False
+    
+    def metricas(self, sesion=None):
+        """
+        Métricas de espera y latencia
+        
+        Args:
+            sesion: Sesion - Si se indica, solo las de esa sesión
+        
+        Returns:
+            dict: Para el planificador: completadas, cesiones, en_cola y
+                  percentiles (p50, p99, máx.) de espera y latencia en ms.
+                  Para una sesión: completadas, en_cola, espera_ms (total
+                  hasta el primer turno) y ejecucion_ms (tiempo con turno).
+        """
+        with self._candado:
+            if sesion is not None:
+                estado = self._estado(sesion)
+                return {
+                    "completadas": estado.completadas,
+                    "en_cola": len(estado.cola),
+                    "espera_ms": estado.espera * 1e3,
+                    "ejecucion_ms": estado.ejecucion * 1e3,
+                }
+            esperas = sorted(self._esperas)
+            latencias = sorted(self._latencias)
+            en_cola = sum(len(estado.cola) for estado in self._estados.values())
+        return {
+            "completadas": self.completadas,
+            "cesiones": self.cesiones,
+            "en_cola": en_cola,
+            "espera_p50_ms": percentil(esperas, 50) * 1e3,
+            "espera_p99_ms": percentil(esperas, 99) * 1e3,
+            "espera_max_ms": (esperas[-1] if esperas else 0.0) * 1e3,
+            "latencia_p50_ms": percentil(latencias, 50) * 1e3,
+            "latencia_p99_ms": percentil(latencias, 99) * 1e3,
+            "latencia_max_ms": (latencias[-1] if latencias else 0.0) * 1e3,
+        }
+    
+    def cerrar(self, esperar=True):
+        """
+        Cancela las tareas que no empezaron y deja terminar las demás
+        
+        Los hilos libres terminan de inmediato; con esperar=True también
+        se espera a que terminen los hilos de las tareas iniciadas, de modo
+        que al volver no queda ningún hilo del planificador (ServidorFork
+        lo requiere para crear procesos con fork).
+        
+        Args:
+            esperar: bool - Si se espera a que terminen las tareas iniciadas
+        """
+        with self._candado:
+            self._cerrado = True
+            iniciadas = []
+            pendientes = []
+            for estado in self._estados.values():
+                pendientes.extend(tarea.futuro for tarea in estado.cola)
+                estado.cola.clear()
+                if estado.activa is not None:
+                    iniciadas.append(estado.activa.futuro)
+                    # Las suspendidas continúan sin volver a ceder
+                    estado.activa.reanudar.set()
+            self._listas.clear()
+            for portador in self._libres:
+                portador.asignar(None)
+            self._libres.clear()
+            hilos = list(self._hilos)
+        # Fuera del candado: las funciones de aviso de los futuros pueden usar el planificador
+        for futuro in pendientes:
+            futuro.cancel()
+        if esperar:
+            for futuro in iniciadas:
+                try:
+                    futuro.result()
+                except BaseException:
+                    pass
+            actual = threading.current_thread()
+            for hilo in hilos:
+                if hilo is not actual:
+                    hilo.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.cerrar()
+    
+    def _estado(self, sesion):
+        """Estado de planificación de una sesión (se crea la primera vez)"""
+        estado = self._estados.get(sesion)
+        if estado is None:
+            estado = self._estados[sesion] = _EstadoSesion()
+        return estado
+    
+    def _encolar(self, estado):
+        """Agrega una sesión a las que esperan turno"""
+        heapq.heappush(self._listas, (estado.prioridad, estado.tiempo_virtual, next(self._secuencia), estado))
+    
+    def _despachar(self):
+        """Entrega los turnos libres a las sesiones que esperan (con el candado tomado)"""
+        while self._en_ejecucion < self.trabajadores and self._listas:
+            _, tiempo_virtual, _, estado = heapq.heappop(self._listas)
+            self._tiempo_virtual = tiempo_virtual
+            self._en_ejecucion += 1
+            tarea = estado.activa
+            if tarea is not None:
+                # Continúa una tarea que había cedido su turno
+                tarea.reanudar.set()
+                continue
+            
+            tarea = estado.activa = estado.cola.popleft()
+            tarea.prioridad = estado.prioridad
+            if not tarea.futuro.set_running_or_notify_cancel():
+                self._en_ejecucion -= 1
+                estado.activa = None
+                if estado.cola:
+                    self._encolar(estado)
+                continue
+            espera = time.perf_counter() - tarea.enviada
+            estado.espera += espera
+            self._esperas.append(espera)
+            if self._libres:
+                self._libres.pop().asignar(tarea)
+            else:
+                hilo = threading.Thread(target=self._portar, args=(_Portador(), tarea),
+                                        name="planificador", daemon=True)
+                self._hilos.add(hilo)
+                hilo.start()
+    
+    def _ceder(self, tarea):
+        """
+        Cede el turno de una tarea y espera a que vuelva a tocarle
+        
+        Returns:
+            float: Segundos que estuvo suspendida (0.0 si no cedió)
+        """
+        with self._candado:
+            if not self._listas or self._cerrado:
+                tarea.inicio_porcion = time.perf_counter()
+                return 0.0
+            estado = self._estado(tarea.sesion)
+            self._cobrar(estado, tarea)
+            self._en_ejecucion -= 1
+            self.cesiones += 1
+            tarea.reanudar.clear()
+            self._encolar(estado)
+            self._despachar()
+        inicio = time.perf_counter()
+        tarea.reanudar.wait()
+        tarea.inicio_porcion = time.perf_counter()
+        return tarea.inicio_porcion - inicio
+    
+    def _cobrar(self, estado, tarea):
+        """Suma al tiempo virtual de la sesión la porción que acaba de usar"""
+        usado = time.perf_counter() - tarea.inicio_porcion
+        estado.ejecucion += usado
+        estado.tiempo_virtual += usado / estado.peso
+    
+    def _portar(self, portador, tarea):
+        """Ciclo de un hilo: ejecuta tareas hasta quedar libre demasiado tiempo"""
+        try:
+            self._portar_tareas(portador, tarea)
+        finally:
+            with self._candado:
+                self._hilos.discard(threading.current_thread())
+    
+    def _portar_tareas(self, portador, tarea):
+        """Ejecuta la tarea asignada y las siguientes que reciba el portador"""
+        while tarea is not None:
+            self._correr(tarea)
+            with self._candado:
+                if self._cerrado:
+                    return
+                self._libres.append(portador)
+            tarea = portador.esperar()
+            if tarea is _Portador.VENCIDO:
+                with self._candado:
+                    if portador in self._libres:
+                        self._libres.remove(portador)
+                        return
+                # Se le asignó una tarea justo al vencer
+                tarea = portador.esperar()
+    
+    def _correr(self, tarea):
+        """Ejecuta una tarea con el turno ya asignado"""
+        sesion = tarea.sesion
+        limites = sesion.presupuesto
+        sesion.presupuesto = tarea.turno = Turno(self, tarea, limites)
+        if tarea.cancelada:
+            tarea.turno.cancelar()
+        tarea.inicio_porcion = time.perf_counter()
+        try:
+            resultado = tarea.funcion(*tarea.argumentos)
+        except BaseException as ex:
+            tarea.futuro.set_exception(ex)
+        else:
+            tarea.futuro.set_result(resultado)
+        finally:
+            sesion.presupuesto = limites
+            with self._candado:
+                estado = self._estado(sesion)
+                self._cobrar(estado, tarea)
+                estado.activa = None
+                estado.completadas += 1
+                self.completadas += 1
+                self._latencias.append(time.perf_counter() - tarea.enviada)
+                self._en_ejecucion -= 1
+                if estado.cola and not self._cerrado:
+                    self._encolar(estado)
+                self._despachar()
+
+
+class _EstadoSesion:
+    """Cola y contabilidad de una sesión"""
+    
+    __slots__ = ("peso", "prioridad", "tiempo_virtual", "cola", "activa",
+                 "completadas", "espera", "ejecucion")
+    
+    def __init__(self):
+        self.peso = 1.0
+        self.prioridad = 0
+        self.tiempo_virtual = 0.0
+        self.cola = deque()   # Tareas que no empezaron
+        self.activa = None    # Tarea iniciada (con turno o suspendida)
+        self.completadas = 0
+        self.espera = 0.0     # Segundos en cola hasta el primer turno
+        self.ejecucion = 0.0  # Segundos con turno
+    
+    def __lt__(self, otro):
+        return False  # El montículo desempata por secuencia
+
+
+class _Tarea:
+    """Una función encolada en una sesión"""
+    
+    __slots__ = ("sesion", "funcion", "argumentos", "futuro", "enviada", "inicio_porcion",
+                 "prioridad", "reanudar", "turno", "cancelada")
+    
+    def __init__(self, sesion, funcion, argumentos):
+        self.sesion = sesion
+        self.funcion = funcion
+        self.argumentos = argumentos
+        self.futuro = Future()
+        self.enviada = time.perf_counter()
+        self.inicio_porcion = 0.0
+        self.prioridad = 0
+        self.reanudar = threading.Event()
+        self.turno = None       # Turno mientras se ejecuta
+        self.cancelada = False
+
+
+class _Portador:
+    """Hilo reutilizable que ejecuta tareas"""
+    
+    VENCIDO = object()
+    
+    def __init__(self):
+        self._evento = threading.Event()
+        self._tarea = None
+    
+    def asignar(self, tarea):
+        self._tarea = tarea
+        self._evento.set()
+    
+    def esperar(self):
+        """Retorna la tarea asignada, None para terminar o VENCIDO"""
+        if not self._evento.wait(ESPERA_HILO_LIBRE):
+            return _Portador.VENCIDO
+        self._evento.clear()
+        return self._tarea
+
+
+def percentil(ordenados, porcentaje):
+    """
+    Percentil de una lista ordenada (método del rango más cercano)
+    
+    Args:
+        ordenados: list - Valores en orden ascendente
+        porcentaje: float - Percentil entre 0 y 100
+    
+    Returns:
+        float: Valor del percentil (0.0 si la lista está vacía)
+    """
+    if not ordenados:
+        return 0.0
+    posicion = max(0, min(len(ordenados) - 1, -(-len(ordenados) * porcentaje // 100) - 1))
+    return ordenados[int(posicion)]
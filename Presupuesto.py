@@ -0,0 +1,342 @@
+"""
+Presupuestos de evaluación: pasos, tiempo y memoria
+
+Un Presupuesto limita lo que puede consumir cada evaluación:
+
+    presupuesto = Presupuesto(pasos=100000, segundos=0.5, memoria=64 << 20)
+    presupuesto.evaluar(evaluador, ast)   # o Sesion(presupuesto=presupuesto)
+
+- pasos: nodos del ASA visitados más instrucciones ejecutadas por las
+  funciones del usuario (cada marco cobra su código completo al entrar).
+- segundos: tiempo de reloj; se revisa cada REVISION pasos, así que una
+  operación nativa larga (p. ej. un pow() enorme) no se interrumpe.
+- memoria: bytes aproximados de los valores que producen los operadores y
+  las funciones nativas (enteros por sus bits, textos por su longitud
+  aunque sean una Cuerda, arreglos por nbytes). Es lo asignado durante la
+  evaluación, no lo vivo, y solo se mide si hay límite de memoria. Una
+  función nativa se cobra al terminar: un pow() enorme se calcula antes
+  de rechazarse.
+
+Al agotarse se lanza ErrorPresupuesto (subclase de ErrorSemantico) y se
+deshacen las asignaciones de variables y las definiciones de funciones
+(y, en el modo reactivo, las definiciones reactivas) que hizo la
+evaluación, de modo que la sesión queda como antes de empezarla. Un
+presupuesto creado con cancelable=True puede además cancelarse desde otro
+hilo con cancelar(): la evaluación se detiene en la siguiente revisión con
+ErrorCancelado y sus cambios también se deshacen. Sin presupuesto el evaluador no
+tiene ningún costo adicional: los contadores se instalan solo mientras
+dura Presupuesto.evaluar().
+"""
+
+import threading
+import time
+from collections.abc import MutableMapping
+from Errores import ErrorPresupuesto, ErrorCancelado
+from Cuerda import Cuerda
+from FuncionesUsuario import FuncionUsuario
+
+
+# Pasos entre dos revisiones del reloj
+REVISION = 256
+
+# Marca de una variable que no existía antes de la evaluación
+_AUSENTE = object()
+
+
+class Presupuesto:
+    """
+    Límites de una evaluación y lo consumido por la última.
+    
+    Un presupuesto no debe usarse en dos evaluaciones a la vez; cada
+    sesión tiene el suyo.
+    """
+    
+    def __init__(self, pasos=None, segundos=None, memoria=None, cancelable=False):
+        """
+        Constructor
+        
+        Args:
+            pasos: int - Pasos máximos (None: sin límite)
+            segundos: float - Tiempo máximo de reloj (None: sin límite)
+            memoria: int - Bytes máximos asignados por valores (None: sin límite)
+            cancelable: bool - Si la evaluación puede cancelarse y deshacerse
+                        aunque no tenga límites
+        """
+        self.max_pasos = pasos
+        self.max_segundos = segundos
+        self.max_memoria = memoria
+        self.cancelable = cancelable
+        # Consumo de la última evaluación
+        self.pasos = 0
+        self.segundos = 0.0
+        self.memoria = 0
+        self._tramo = 0      # Pasos del tramo actual entre revisiones
+        self._restantes = 0  # Pasos que faltan para la próxima revisión
+        self._limite = None  # Instante (perf_counter) en que vence el tiempo
+        self._inicio = 0.0
+        self._candado = threading.Lock()  # Protege las marcas de cancelación
+        self._en_curso = False
+        self._cancelado = False   # Cancelación de la evaluación en curso
+        self._pendiente = False   # Cancelación pedida antes de empezar
+    
+    def evaluar(self, evaluador, nodo):
+        """
+        Evalúa un nodo dentro del presupuesto
+        
+        Args:
+            evaluador: Evaluador - Evaluador que evalúa el nodo
+            nodo: Nodo - Nodo del ASA
+        
+        Returns:
+            object: Resultado de la evaluación
+        
+        Raises:
+            ErrorPresupuesto: Si se agota algún límite (las variables y las
+                              funciones definidas por la evaluación se
+                              restauran)
+            ErrorCancelado: Si se canceló la evaluación (ídem)
+            ErrorSemantico: Si ocurre otro error semántico
+        """
+        with self._candado:
+            # Una cancelación que llegó después de la última revisión de la
+            # evaluación anterior no se aplica a esta
+            self._cancelado, self._pendiente = self._pendiente, False
+            self._en_curso = True
+        self.pasos = 0
+        self.memoria = 0
+        self._inicio = time.perf_counter()
+        self._limite = None if self.max_segundos is None else self._inicio + self.max_segundos
+        self._nuevo_tramo()
+        
+        entorno = evaluador.entorno
+        operadores = evaluador.operadores
+        # Sin límites ni cancelación no hay nada que deshacer; sin límite de memoria no se mide
+        diario = None
+        if (self.cancelable or self.max_pasos is not None or self.max_segundos is not None
+                or self.max_memoria is not None):
+            diario = evaluador.entorno = DiarioEntorno(entorno)
+            evaluador.iniciar_diario()
+        if self.max_memoria is not None:
+            evaluador.operadores = OperadoresMedidos(operadores, self)
+            evaluador.visit_llamada = self._medidor_llamadas(evaluador)
+        evaluador.presupuesto = self
+        evaluador.evaluar = self._contador(evaluador)
+        abortada = False
+        try:
+            return nodo.accept(evaluador)
+        except ErrorPresupuesto:
+            abortada = True
+            if diario is not None:
+                diario.deshacer()
+            raise
+        finally:
+            del evaluador.evaluar
+            del evaluador.presupuesto
+            if self.max_memoria is not None:
+                del evaluador.visit_llamada
+            evaluador.operadores = operadores
+            evaluador.entorno = entorno
+            if diario is not None:
+                evaluador.terminar_diario(deshacer=abortada)
+            self.pasos += self._tramo - self._restantes
+            self.segundos = time.perf_counter() - self._inicio
+            with self._candado:
+                self._en_curso = False
+    
+    def cancelar(self):
+        """
+        Pide detener la evaluación en curso (puede llamarse desde otro hilo)
+        
+        La evaluación lanza ErrorCancelado en la siguiente revisión, es
+        decir, dentro de los próximos REVISION pasos; una operación nativa
+        larga termina antes. Si no hay evaluación en curso, se cancela la
+        siguiente.
+        """
+        with self._candado:
+            if self._en_curso:
+                self._cancelado = True
+            else:
+                self._pendiente = True
+    
+    def cobrar(self, pasos):
+        """
+        Descuenta pasos del presupuesto
+        
+        Args:
+            pasos: int - Pasos consumidos
+        
+        Raises:
+            ErrorPresupuesto: Si se superan los pasos o el tiempo
+        """
+        self._restantes -= pasos
+        if self._restantes < 0:
+            self._revisar()
+    
+    def cobrar_memoria(self, valor):
+        """
+        Descuenta del presupuesto el tamaño aproximado de un valor nuevo
+        
+        Args:
+            valor: object - Valor producido
+        
+        Raises:
+            ErrorPresupuesto: Si se supera la memoria
+        """
+        self.memoria += tamano(valor)
+        if self.max_memoria is not None and self.memoria > self.max_memoria:
+            raise ErrorPresupuesto(
+                f"Se superó el límite de memoria de {self.max_memoria} bytes "
+                f"(la evaluación asignó unos {self.memoria} bytes)"
+            )
+    
+    def _medidor_llamadas(self, evaluador):
+        """Crea el reemplazo de evaluador.visit_llamada que cobra la memoria de las funciones nativas"""
+        visit_llamada = evaluador.visit_llamada
+        cobrar = self.cobrar_memoria
+        
+        def medir(llamada):
+            resultado = visit_llamada(llamada)
+            sitio = evaluador._sitios.get(llamada)
+            # Lo que retorna una función del usuario ya se cobró en sus operaciones
+            if sitio is None or not isinstance(sitio[0], FuncionUsuario):
+                cobrar(resultado)
+            return resultado
+        return medir
+    
+    def _contador(self, evaluador):
+        """Crea el reemplazo de evaluador.evaluar que cobra un paso por nodo"""
+        def evaluar(nodo):
+            self._restantes -= 1
+            if self._restantes < 0:
+                self._revisar()
+            return nodo.accept(evaluador)
+        return evaluar
+    
+    def _revisar(self):
+        """Cierra el tramo actual y verifica los límites de pasos y de tiempo"""
+        self.pasos += self._tramo - self._restantes
+        self._tramo = self._restantes = 0
+        if self._cancelado:
+            raise ErrorCancelado("Evaluación cancelada (se deshicieron sus asignaciones)")
+        if self.max_pasos is not None and self.pasos > self.max_pasos:
+            raise ErrorPresupuesto(f"Se superó el límite de {self.max_pasos} pasos de evaluación")
+        if self._limite is not None and time.perf_counter() > self._limite:
+            raise ErrorPresupuesto(f"Se superó el tiempo límite de {self.max_segundos} s")
+        self._nuevo_tramo()
+    
+    def _nuevo_tramo(self):
+        """Fija cuántos pasos pueden darse antes de la próxima revisión"""
+        tramo = REVISION
+        if self.max_pasos is not None:
+            tramo = min(tramo, self.max_pasos - self.pasos)
+        self._tramo = self._restantes = tramo
+    
+    def __repr__(self):
+        return (f"Presupuesto(pasos={self.max_pasos!r}, segundos={self.max_segundos!r}, "
+                f"memoria={self.max_memoria!r}, cancelable={self.cancelable!r})")
+
+
+class OperadoresMedidos:
+    """
+    Envoltura de una TablaOperadores que cobra la memoria de cada resultado.
+    
+    La usan tanto el evaluador como la máquina de pila de las funciones
+    del usuario, porque ambos aplican los operadores a través de
+    evaluador.operadores.
+    """
+    
+    def __init__(self, operadores, presupuesto):
+        """
+        Constructor
+        
+        Args:
+            operadores: TablaOperadores - Tabla original
+            presupuesto: Presupuesto - Presupuesto al que se cobra
+        """
+        self._operadores = operadores
+        self._binaria = operadores.binaria
+        self._unaria = operadores.unaria
+        self._cobrar = presupuesto.cobrar_memoria
+    
+    def binaria(self, operador, izquierda, derecha):
+        resultado = self._binaria(operador, izquierda, derecha)
+        if type(resultado) is not float:  # Los reales no ocupan memoria adicional
+            self._cobrar(resultado)
+        return resultado
+    
+    def unaria(self, operador, operando):
+        resultado = self._unaria(operador, operando)
+        if type(resultado) is not float:
+            self._cobrar(resultado)
+        return resultado
+    
+    def __getattr__(self, nombre):
+        return getattr(self._operadores, nombre)
+
+
+class DiarioEntorno(MutableMapping):
+    """
+    Vista de un entorno que recuerda el valor anterior de cada variable
+    que se modifica, para poder deshacer los cambios.
+    """
+    
+    def __init__(self, base):
+        """
+        Constructor
+        
+        Args:
+            base: MutableMapping - Entorno real
+        """
+        self.base = base
+        self.anteriores = {}  # nombre -> valor antes del primer cambio (o _AUSENTE)
+    
+    def __getitem__(self, nombre):
+        return self.base[nombre]
+    
+    def __setitem__(self, nombre, valor):
+        if nombre not in self.anteriores:
+            self.anteriores[nombre] = self.base[nombre] if nombre in self.base else _AUSENTE
+        self.base[nombre] = valor
+    
+    def __delitem__(self, nombre):
+        if nombre not in self.anteriores:
+            self.anteriores[nombre] = self.base[nombre]
+        del self.base[nombre]
+    
+    def __contains__(self, nombre):
+        return nombre in self.base
+    
+    def __iter__(self):
+        return iter(self.base)
+    
+    def __len__(self):
+        return len(self.base)
+    
+    def deshacer(self):
+        """Restaura el valor anterior de todas las variables modificadas"""
+        base = self.base
+        for nombre, valor in self.anteriores.items():
+            if valor is _AUSENTE:
+                base.pop(nombre, None)
+            else:
+                base[nombre] = valor
+        self.anteriores.clear()
+
+
+def tamano(valor):
+    """
+    Tamaño aproximado en bytes de un valor del lenguaje
+    
+    Args:
+        valor: object - Valor
+    
+    Returns:
+        int: Bytes de su contenido (0 para números de tamaño fijo)
+    """
+    tipo = type(valor)
+    if tipo is int:
+        return valor.bit_length() >> 3
+    if tipo is str or tipo is Cuerda:
+        return len(valor)
+    nbytes = getattr(valor, "nbytes", None)  # Arreglos de NumPy
+    return nbytes if isinstance(nbytes, int) else 0
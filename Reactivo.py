@@ -0,0 +1,396 @@
+"""
+Evaluación reactiva
+
+En el modo reactivo cada asignación queda registrada como una definición
+junto con las variables que lee. Al reasignar una variable se recalculan
+solo las definiciones que dependen de ella (directa o indirectamente), en
+orden topológico:
+
+    evaluador = EvaluadorReactivo()
+    a = 2
+    b = a * 2          # b = 4
+    c = b + sqrt(a)    # c = 5.41...
+    a = 9              # recalcula b = 18 y luego c = 21.0
+
+El costo de una actualización depende de cuántas definiciones se ven
+afectadas, no del tamaño de la sesión. Las definiciones circulares
+(incluida a = a + 1) se rechazan con un error semántico.
+
+Una asignación anidada, como la de c en b = (c = a * 2) + 1, también
+forma parte del grafo: al recalcularse b cambia c, así que se recalculan
+las definiciones que leen c. Redefinir una función del usuario recalcula
+las definiciones que la llaman (directamente o a través de otras
+funciones), con las variables que lee su nueva definición.
+"""
+
+from ASA import *
+from Evaluador import Evaluador, ErrorSemantico
+from Errores import ErrorPresupuesto
+from FuncionesUsuario import FuncionUsuario, variables_globales, LLAMAR
+
+
+class Definicion:
+    """Expresión que define una variable, las variables que lee y las que asigna"""
+    
+    __slots__ = ("nombre", "valor", "lecturas", "escrituras", "llamadas")
+    
+    def __init__(self, nombre, valor, lecturas, escrituras=frozenset(), llamadas=frozenset()):
+        """
+        Constructor
+        
+        Args:
+            nombre: str - Variable definida
+            valor: Nodo - Expresión que la calcula
+            lecturas: frozenset - Variables que lee la expresión
+            escrituras: frozenset - Variables asignadas dentro de la expresión
+            llamadas: frozenset - Funciones que llama directamente la expresión
+        """
+        self.nombre = nombre
+        self.valor = valor
+        self.lecturas = lecturas
+        self.escrituras = escrituras
+        self.llamadas = llamadas
+
+
+class EvaluadorReactivo(Evaluador):
+    """
+    Evaluador que mantiene un grafo de dependencias entre variables.
+    
+    Las lecturas de cada definición se determinan estáticamente a partir
+    de su expresión, incluidas las variables globales que leen las
+    funciones del usuario que llama (según su definición actual).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.definiciones = {}   # nombre -> Definicion
+        self.dependientes = {}   # nombre -> {dependiente: None} (conjunto ordenado)
+        self.escritores = {}     # nombre -> {definición que lo asigna anidado: None}
+        self.ultimas_recalculadas = []  # Variables recalculadas en la última actualización
+        self._propagando = False
+        self._diario = None  # nombre -> Definicion anterior (o None) mientras se anota
+    
+    def visit_asignacion(self, asignacion):
+        """
+        Visita un nodo Asignacion: define la variable y actualiza sus dependientes
+        
+        Args:
+            asignacion: Asignacion - Nodo de asignación
+        
+        Returns:
+            object: Valor asignado
+        
+        Raises:
+            ErrorSemantico: Si la definición es circular o si falla el
+                            recálculo de alguna dependiente
+        """
+        if self._propagando:
+            # Asignación anidada dentro de una definición que se recalcula
+            return super().visit_asignacion(asignacion)
+        
+        nombre = asignacion.nombre.lexema
+        lecturas = self.lecturas(asignacion.valor)
+        escrituras, llamadas = self._escrituras_y_llamadas(asignacion.valor)
+        self._verificar_ciclo(nombre, lecturas, escrituras)
+        
+        valor = self.evaluar(asignacion.valor)
+        self._definir(nombre, asignacion.valor, lecturas, escrituras, llamadas)
+        self.entorno[nombre] = valor
+        self._propagar(nombre)
+        return valor
+    
+    def asignar(self, nombre, valor):
+        """
+        Asigna un valor constante a una variable y actualiza sus dependientes
+        
+        Args:
+            nombre: str - Nombre de la variable
+            valor: object - Nuevo valor
+        
+        Raises:
+            ErrorSemantico: Si falla el recálculo de alguna dependiente
+        """
+        self._definir(nombre, None, frozenset())
+        self.entorno[nombre] = valor
+        self._propagar(nombre)
+    
+    def visit_definicion_funcion(self, definicion):
+        """
+        Visita un nodo DefinicionFuncion y recalcula las definiciones que la llaman
+        
+        Args:
+            definicion: DefinicionFuncion - Nodo de definición
+        
+        Returns:
+            FuncionUsuario: La función definida
+        
+        Raises:
+            ErrorSemantico: Si la nueva definición crea una dependencia
+                            circular (se conserva la anterior) o si falla el
+                            recálculo de alguna definición
+        """
+        nombre = definicion.nombre.lexema
+        anterior = self.funciones.get(nombre)
+        funcion = super().visit_definicion_funcion(definicion)
+        
+        afectadas = [n for n, d in self.definiciones.items() if self._alcanza(d.llamadas, nombre)]
+        if not afectadas:
+            return funcion
+        
+        # Las variables que leen las llamadas dependen de la nueva definición
+        previas = {n: self.definiciones[n] for n in afectadas}
+        for n, previa in previas.items():
+            self._definir(n, previa.valor, self.lecturas(previa.valor), previa.escrituras, previa.llamadas)
+        try:
+            for n in afectadas:
+                self._verificar_ciclo(n, self.definiciones[n].lecturas, self.definiciones[n].escrituras)
+        except ErrorSemantico:
+            for n, previa in previas.items():
+                self._definir(n, previa.valor, previa.lecturas, previa.escrituras, previa.llamadas)
+            if anterior is None:
+                del self.funciones[nombre]
+            else:
+                self.funciones[nombre] = anterior
+            raise
+        
+        self._propagar(recalcular=afectadas)
+        return funcion
+    
+    def iniciar_diario(self):
+        """Recuerda también las definiciones reactivas que cambian"""
+        super().iniciar_diario()
+        self._diario = {}
+    
+    def terminar_diario(self, deshacer=False):
+        """
+        Deja de recordar las definiciones que cambian
+        
+        Args:
+            deshacer: bool - Si se restauran las funciones y las
+                      definiciones reactivas anteriores
+        """
+        diario, self._diario = self._diario, None
+        if deshacer and diario:
+            for nombre, anterior in diario.items():
+                if anterior is None:
+                    self._definir(nombre, None, frozenset())
+                else:
+                    self._definir(nombre, anterior.valor, anterior.lecturas,
+                                  anterior.escrituras, anterior.llamadas)
+        super().terminar_diario(deshacer)
+    
+    def lecturas(self, nodo):
+        """
+        Determina las variables que lee una expresión
+        
+        Args:
+            nodo: Nodo - Expresión
+        
+        Returns:
+            frozenset: Nombres de las variables leídas
+        """
+        lecturas = set()
+        pendientes = [nodo]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, Variable):
+                lecturas.add(nodo.nombre.lexema)
+            elif isinstance(nodo, Binaria):
+                pendientes.append(nodo.izquierda)
+                pendientes.append(nodo.derecha)
+            elif isinstance(nodo, (Unaria, Agrupacion)):
+                pendientes.append(nodo.expresion)
+            elif isinstance(nodo, Asignacion):
+                pendientes.append(nodo.valor)
+            elif isinstance(nodo, Llamada):
+                pendientes.extend(nodo.argumentos)
+                if isinstance(nodo.callee, Variable):
+                    funcion = self.funciones.get(nodo.callee.nombre.lexema)
+                    if isinstance(funcion, FuncionUsuario):
+                        lecturas.update(variables_globales(funcion, self.funciones))
+                else:
+                    pendientes.append(nodo.callee)
+        return frozenset(lecturas)
+    
+    def _escrituras_y_llamadas(self, nodo):
+        """Retorna las variables asignadas y las funciones llamadas dentro de una expresión"""
+        escrituras = set()
+        llamadas = set()
+        pendientes = [nodo]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, Binaria):
+                pendientes.append(nodo.izquierda)
+                pendientes.append(nodo.derecha)
+            elif isinstance(nodo, (Unaria, Agrupacion)):
+                pendientes.append(nodo.expresion)
+            elif isinstance(nodo, Asignacion):
+                escrituras.add(nodo.nombre.lexema)
+                pendientes.append(nodo.valor)
+            elif isinstance(nodo, Llamada):
+                pendientes.extend(nodo.argumentos)
+                if isinstance(nodo.callee, Variable):
+                    llamadas.add(nodo.callee.nombre.lexema)
+                else:
+                    pendientes.append(nodo.callee)
+        return frozenset(escrituras), frozenset(llamadas)
+    
+    def _alcanza(self, llamadas, nombre):
+        """True si alguna de las funciones llama (directa o indirectamente) a la función 'nombre'"""
+        visitadas = set()
+        pendientes = list(llamadas)
+        while pendientes:
+            actual = pendientes.pop()
+            if actual == nombre:
+                return True
+            if actual in visitadas:
+                continue
+            visitadas.add(actual)
+            funcion = dict.get(self.funciones, actual)
+            if isinstance(funcion, FuncionUsuario):
+                pendientes.extend(argumento.callee.nombre.lexema
+                                  for codigo, argumento in funcion.codigo
+                                  if codigo == LLAMAR and isinstance(argumento.callee, Variable))
+        return False
+    
+    def _verificar_ciclo(self, nombre, lecturas, escrituras=frozenset()):
+        """
+        Rechaza una definición que dependería (transitivamente) de sí misma
+        o de alguna variable que asigna
+        
+        Raises:
+            ErrorSemantico: Con el camino del ciclo
+        """
+        # Búsqueda en profundidad hacia las variables de las que depende,
+        # guardando desde dónde se llegó a cada una para reconstruir el ciclo.
+        # Una variable asignada de forma anidada depende de la definición que
+        # la asigna.
+        objetivos = escrituras | {nombre}
+        anteriores = {lectura: nombre for lectura in lecturas}
+        pendientes = list(lecturas)
+        while pendientes:
+            actual = pendientes.pop()
+            if actual in objetivos:
+                camino = [actual]
+                paso = anteriores[actual]
+                while paso != nombre:
+                    camino.append(paso)
+                    paso = anteriores[paso]
+                camino.append(nombre)
+                if actual != nombre:
+                    camino.append(actual)
+                raise ErrorSemantico(f"Dependencia circular: {' -> '.join(camino)}")
+            definicion = self.definiciones.get(actual)
+            siguientes = list(self.escritores.get(actual, ()))
+            if definicion is not None:
+                siguientes.extend(definicion.lecturas)
+            for siguiente in siguientes:
+                if siguiente not in anteriores:
+                    anteriores[siguiente] = actual
+                    pendientes.append(siguiente)
+    
+    def _definir(self, nombre, valor, lecturas, escrituras=frozenset(), llamadas=frozenset()):
+        """Reemplaza la definición de una variable en el grafo"""
+        anterior = self.definiciones.pop(nombre, None)
+        if self._diario is not None and nombre not in self._diario:
+            self._diario[nombre] = anterior
+        if anterior is not None:
+            for grafo, variables in ((self.dependientes, anterior.lecturas),
+                                     (self.escritores, anterior.escrituras)):
+                for variable in variables:
+                    nombres = grafo.get(variable)
+                    if nombres is not None:
+                        nombres.pop(nombre, None)
+                        if not nombres:
+                            del grafo[variable]
+        
+        # Una variable que no lee otras ni llama a funciones (que pueden
+        # redefinirse) no necesita recalcularse nunca
+        if lecturas or llamadas:
+            self.definiciones[nombre] = Definicion(nombre, valor, lecturas, escrituras, llamadas)
+            for lectura in lecturas:
+                self.dependientes.setdefault(lectura, {})[nombre] = None
+            for escritura in escrituras:
+                self.escritores.setdefault(escritura, {})[nombre] = None
+    
+    def _propagar(self, origen=None, recalcular=()):
+        """
+        Recalcula en orden topológico las definiciones afectadas por un cambio
+        
+        Args:
+            origen: str - Variable que cambió
+            recalcular: iterable - Definiciones que deben recalcularse
+                        aunque no cambie ninguna variable que leen
+        
+        Raises:
+            ErrorSemantico: Si alguna definición no pudo recalcularse (las
+                            que dependen de ella conservan su valor anterior)
+        """
+        self.ultimas_recalculadas = []
+        dependientes = self.dependientes
+        definiciones = self.definiciones
+        
+        # Definiciones alcanzables desde el origen (conjunto ordenado); una
+        # definición recalculada cambia también las variables que asigna
+        afectadas = dict.fromkeys(recalcular)
+        pendientes = [] if origen is None else [origen]
+        for nombre in afectadas:
+            pendientes.append(nombre)
+            pendientes.extend(definiciones[nombre].escrituras)
+        while pendientes:
+            for dependiente in dependientes.get(pendientes.pop(), ()):
+                if dependiente not in afectadas:
+                    afectadas[dependiente] = None
+                    pendientes.append(dependiente)
+                    pendientes.extend(definiciones[dependiente].escrituras)
+        if not afectadas:
+            return
+        
+        # Algoritmo de Kahn restringido al subgrafo afectado: cada definición
+        # espera a las afectadas que lee y a las que asignan lo que lee
+        sucesores = {nombre: [] for nombre in afectadas}
+        previas = {}
+        grados = {}
+        for nombre in afectadas:
+            anteriores = set()
+            for lectura in definiciones[nombre].lecturas:
+                if lectura in afectadas:
+                    anteriores.add(lectura)
+                anteriores.update(e for e in self.escritores.get(lectura, ()) if e in afectadas)
+            anteriores.discard(nombre)
+            previas[nombre] = anteriores
+            grados[nombre] = len(anteriores)
+            for anterior in anteriores:
+                sucesores[anterior].append(nombre)
+        listas = [nombre for nombre, grado in grados.items() if grado == 0]
+        listas.reverse()
+        fallidas = {}
+        
+        self._propagando = True
+        try:
+            while listas:
+                nombre = listas.pop()
+                causa = next((anterior for anterior in sorted(previas[nombre])
+                              if anterior in fallidas), None)
+                if causa is not None:
+                    fallidas[nombre] = f"depende de '{causa}'"
+                else:
+                    try:
+                        self.entorno[nombre] = self.evaluar(definiciones[nombre].valor)
+                        self.ultimas_recalculadas.append(nombre)
+                    except ErrorPresupuesto:
+                        # Aborta toda la evaluación (Presupuesto deshace sus cambios)
+                        raise
+                    except ErrorSemantico as e:
+                        fallidas[nombre] = str(e)
+                
+                for sucesor in sucesores[nombre]:
+                    grados[sucesor] -= 1
+                    if grados[sucesor] == 0:
+                        listas.append(sucesor)
+        finally:
+            self._propagando = False
+        
+        if fallidas:
+            detalle = ", ".join(f"{nombre} ({motivo})" for nombre, motivo in fallidas.items())
+            raise ErrorSemantico(f"No se pudieron recalcular: {detalle}")
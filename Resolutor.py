@@ -0,0 +1,70 @@
+"""
+Resolución estática del ASA
+
+Este módulo recorre el ASA antes de evaluarlo para detectar errores que no
+dependen de los valores (funciones inexistentes, aridad incorrecta) y para
+dejar resueltos en caché los sitios de llamada del evaluador.
+"""
+
+from ASA import *
+
+
+class Resolutor:
+    """
+    Recorre el ASA usando el patrón Visitor sin evaluar ninguna expresión.
+    """
+    
+    def __init__(self, evaluador):
+        """
+        Constructor
+        
+        Args:
+            evaluador: Evaluador - Evaluador cuyos sitios de llamada se resuelven
+        """
+        self.evaluador = evaluador
+    
+    def resolver(self, nodo):
+        """
+        Resuelve un nodo y todos sus descendientes
+        
+        Args:
+            nodo: Nodo - Nodo del ASA
+        
+        Raises:
+            ErrorSemantico: Si alguna llamada es inválida
+        """
+        nodo.accept(self)
+    
+    def visit_sentencia(self, sentencia):
+        self.resolver(sentencia.expresion)
+    
+    def visit_literal(self, literal):
+        pass
+    
+    def visit_binaria(self, binaria):
+        self.resolver(binaria.izquierda)
+        self.resolver(binaria.derecha)
+    
+    def visit_unaria(self, unaria):
+        self.resolver(unaria.expresion)
+    
+    def visit_agrupacion(self, agrupacion):
+        self.resolver(agrupacion.expresion)
+    
+    def visit_variable(self, variable):
+        pass
+    
+    def visit_asignacion(self, asignacion):
+        self.resolver(asignacion.valor)
+    
+    def visit_definicion_funcion(self, definicion):
+        # El cuerpo puede llamar a funciones que aún no existen (incluida la
+        # propia función), así que se resuelve al llamarla por primera vez
+        pass
+    
+    def visit_llamada(self, llamada):
+        # Los callee que no son variables solo pueden diagnosticarse al evaluar
+        if isinstance(llamada.callee, Variable):
+            self.evaluador.resolver_llamada(llamada)
+        for argumento in llamada.argumentos:
+            self.resolver(argumento)
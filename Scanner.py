@@ -122,7 +122,12 @@ class Scanner:
             while self.is_digit(self.peek()):
                 self.advance()
         
-        valor = float(self.source[self.inicio:self.actual])
+        # Los literales sin parte decimal se conservan como enteros exactos
+        texto = self.source[self.inicio:self.actual]
+        if '.' in texto:
+            valor = float(texto)
+        else:
+            valor = int(texto)
         self.add_token(TipoToken.NUMBER, valor)
     
     def identifier(self):
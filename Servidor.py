@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Servidor de evaluación con asyncio (TCP local o socket Unix)
+
+Protocolo: una solicitud JSON por línea y una respuesta JSON por línea,
+en el mismo orden:
+
+    -> {"id": 1, "codigo": "x = 10;"}
+    <- {"id": 1, "ok": true, "resultado": 10, "imprimir": false}
+    -> {"id": 2, "codigo": "x / 0"}
+    <- {"id": 2, "ok": false, "tipo": "semantico", "error": "División por cero"}
+
+Cada conexión tiene su propia Sesion (entorno, funciones y estado de
+error). Un cliente puede enviar varias solicitudes sin esperar las
+respuestas (pipelining); se evalúan en orden, una a la vez por conexión.
+Cuando una conexión tiene MAX_PENDIENTES solicitudes en espera, el
+servidor deja de leer de ella hasta que se desocupa (la presión se
+transmite al cliente por TCP).
+
+Las evaluaciones se ejecutan en un grupo de hilos para que el bucle de
+eventos siga atendiendo conexiones mientras tanto. Con un presupuesto
+(ver Presupuesto), una evaluación que lo agota responde con el tipo
+"presupuesto" y no deja asignaciones a medias en la sesión:
+
+    python Servidor.py --puerto 7878
+    python Servidor.py --unix /tmp/interprete.sock --max-pasos 100000 --max-segundos 0.5
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from Evaluador import ErrorSemantico
+from Errores import ErrorPresupuesto
+from Presupuesto import Presupuesto
+from Cuerda import Cuerda
+from Sesion import Sesion, formatear
+
+
+# Solicitudes leídas y aún no respondidas por conexión
+MAX_PENDIENTES = 64
+
+# Largo máximo de una línea de solicitud
+MAX_LINEA = 1 << 20
+
+# Hilos que ejecutan las evaluaciones
+HILOS_POR_DEFECTO = 4
+
+
+class Servidor:
+    """Servidor de evaluación: una Sesion por conexión"""
+    
+    def __init__(self, host="127.0.0.1", puerto=7878, ruta_unix=None,
+                 hilos=HILOS_POR_DEFECTO, max_pendientes=MAX_PENDIENTES, presupuesto=None):
+        """
+        Constructor
+        
+        Args:
+            host: str - Dirección TCP
+            puerto: int - Puerto TCP (0 elige uno libre)
+            ruta_unix: str - Socket Unix; si se indica, se usa en lugar de TCP
+            hilos: int - Hilos que ejecutan las evaluaciones
+            max_pendientes: int - Solicitudes en espera por conexión
+            presupuesto: Presupuesto - Límites de cada evaluación (cada
+                         conexión recibe una copia)
+        """
+        self.host = host
+        self.puerto = puerto
+        self.ruta_unix = ruta_unix
+        self.max_pendientes = max_pendientes
+        self.presupuesto = presupuesto
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="evaluador")
+        self._servidor = None
+        self._tareas = set()  # Tareas de las conexiones abiertas
+        self.conexiones = 0  # Conexiones abiertas
+        self.solicitudes = 0  # Solicitudes respondidas
+    
+    async def iniciar(self):
+        """
+        Empieza a aceptar conexiones
+        
+        Returns:
+            tuple | str: Dirección (host, puerto) o ruta del socket Unix
+        """
+        if self.ruta_unix:
+            self._servidor = await asyncio.start_unix_server(self._atender, self.ruta_unix, limit=MAX_LINEA)
+            return self.ruta_unix
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, limit=MAX_LINEA)
+        direccion = self._servidor.sockets[0].getsockname()
+        self.puerto = direccion[1]
+        return direccion[:2]
+    
+    async def servir(self):
+        """Atiende conexiones hasta que se cancela la tarea"""
+        if self._servidor is None:
+            await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+    
+    async def cerrar(self):
+        """Deja de aceptar conexiones, cierra las abiertas y libera el grupo de hilos"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        tareas = list(self._tareas)
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _atender(self, lector, escritor):
+        """Atiende una conexión: lee solicitudes y las encola para el evaluador"""
+        self._tareas.add(asyncio.current_task())
+        self.conexiones += 1
+        presupuesto = None if self.presupuesto is None else copy.copy(self.presupuesto)
+        sesion = Sesion(presupuesto=presupuesto)
+        cola = asyncio.Queue(maxsize=self.max_pendientes)
+        evaluador = asyncio.create_task(self._responder(sesion, cola, escritor, asyncio.current_task()))
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:
+                    # Línea más larga que MAX_LINEA: no hay forma de resincronizar
+                    await cola.put({"error": f"Solicitud mayor que {MAX_LINEA} bytes"})
+                    break
+                if not linea:
+                    break
+                if linea.strip():
+                    # Espera si la conexión ya tiene demasiadas solicitudes pendientes
+                    await cola.put(linea)
+            await cola.put(None)
+            await evaluador
+        except (ConnectionError, asyncio.CancelledError):
+            evaluador.cancel()
+        finally:
+            self._tareas.discard(asyncio.current_task())
+            self.conexiones -= 1
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                # La conexión ya está cerrada; la tarea termina de todos modos
+                pass
+    
+    async def _responder(self, sesion, cola, escritor, lectura):
+        """Evalúa en orden las solicitudes de una conexión y escribe las respuestas"""
+        bucle = asyncio.get_running_loop()
+        try:
+            while True:
+                solicitud = await cola.get()
+                if solicitud is None:
+                    return
+                if isinstance(solicitud, dict):
+                    respuesta = codificar({"id": None, "ok": False, "tipo": "protocolo", "error": solicitud["error"]})
+                else:
+                    respuesta = await bucle.run_in_executor(self._ejecutor, _procesar_linea, sesion, solicitud)
+                escritor.write(respuesta)
+                self.solicitudes += 1
+                await escritor.drain()
+        except ConnectionError:
+            # El cliente se fue: la lectura podría estar esperando lugar en la cola
+            lectura.cancel()
+
+
+def procesar(sesion, linea):
+    """
+    Procesa una línea del protocolo en una sesión
+    
+    Args:
+        sesion: Sesion - Sesión de la conexión
+        linea: bytes - Solicitud JSON
+    
+    Returns:
+        dict: Respuesta
+    """
+    try:
+        solicitud = json.loads(linea)
+        codigo = solicitud["codigo"]
+        if not isinstance(codigo, str):
+            raise TypeError
+    except (ValueError, TypeError, KeyError):
+        return {"id": None, "ok": False, "tipo": "protocolo",
+                "error": 'Se esperaba un objeto JSON con "codigo" (texto)'}
+    
+    identificador = solicitud.get("id")
+    try:
+        resultado, debe_imprimir = sesion.evaluar(codigo)
+    except ErrorPresupuesto as ex:
+        sesion.existen_errores = True
+        return {"id": identificador, "ok": False, "tipo": "presupuesto", "error": str(ex)}
+    except ErrorSemantico as ex:
+        sesion.existen_errores = True
+        return {"id": identificador, "ok": False, "tipo": "semantico", "error": str(ex)}
+    except Exception as ex:
+        sesion.existen_errores = True
+        return {"id": identificador, "ok": False, "tipo": "analisis", "error": str(ex)}
+    return {"id": identificador, "ok": True, "resultado": valor_json(resultado), "imprimir": debe_imprimir}
+
+
+def codificar(respuesta):
+    """
+    Serializa una respuesta como una línea del protocolo
+    
+    Args:
+        respuesta: dict - Respuesta
+    
+    Returns:
+        bytes: JSON terminado en salto de línea
+    """
+    try:
+        texto = json.dumps(respuesta, ensure_ascii=False)
+    except ValueError as ex:
+        # Por ejemplo, enteros con más dígitos de los que Python convierte a texto
+        texto = json.dumps({"id": respuesta.get("id"), "ok": False, "tipo": "semantico",
+                            "error": f"No se pudo serializar el resultado: {ex}"}, ensure_ascii=False)
+    return texto.encode("utf-8") + b"\n"
+
+
+def _procesar_linea(sesion, linea):
+    """Procesa y serializa una solicitud (se ejecuta en el grupo de hilos)"""
+    return codificar(procesar(sesion, linea))
+
+
+def valor_json(valor):
+    """
+    Convierte un resultado en un valor JSON
+    
+    Los números, textos, booleanos y null se envían tal cual; lo demás
+    (infinitos, NaN, arreglos...) como el texto que mostraría el REPL.
+    
+    Args:
+        valor: object - Resultado de una evaluación
+    
+    Returns:
+        object: Valor serializable con json
+    """
+    if valor is None or isinstance(valor, (bool, int, str)):
+        return valor
+    if type(valor) is Cuerda:
+        return str(valor)
+    if isinstance(valor, float) and math.isfinite(valor):
+        return valor
+    return formatear(valor)
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Args:
+        argumentos: list - Argumentos (por defecto sys.argv[1:])
+    
+    Returns:
+        int: Código de salida
+    """
+    analizador = argparse.ArgumentParser(description="Servidor de evaluación (una sesión por conexión)")
+    analizador.add_argument("--host", default="127.0.0.1", help="Dirección TCP")
+    analizador.add_argument("--puerto", type=int, default=7878, help="Puerto TCP")
+    analizador.add_argument("--unix", metavar="RUTA", help="Socket Unix en lugar de TCP")
+    analizador.add_argument("--hilos", type=int, default=HILOS_POR_DEFECTO,
+                            help="Hilos que ejecutan las evaluaciones")
+    analizador.add_argument("--pendientes", type=int, default=MAX_PENDIENTES,
+                            help="Solicitudes en espera por conexión")
+    analizador.add_argument("--max-pasos", type=int, help="Pasos máximos por evaluación")
+    analizador.add_argument("--max-segundos", type=float, help="Tiempo máximo por evaluación")
+    analizador.add_argument("--max-memoria", type=int, metavar="BYTES", help="Memoria máxima por evaluación")
+    opciones = analizador.parse_args(argumentos)
+    
+    presupuesto = None
+    if opciones.max_pasos or opciones.max_segundos or opciones.max_memoria:
+        presupuesto = Presupuesto(opciones.max_pasos, opciones.max_segundos, opciones.max_memoria)
+    servidor = Servidor(opciones.host, opciones.puerto, opciones.unix, opciones.hilos,
+                        opciones.pendientes, presupuesto)
+    
+    async def ejecutar():
+        direccion = await servidor.iniciar()
+        print(f"Escuchando en {direccion}", file=sys.stderr)
+        try:
+            await servidor.servir()
+        finally:
+            await servidor.cerrar()
+    
+    try:
+        asyncio.run(ejecutar())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Procesos de trabajo creados con fork a partir de un intérprete ya caliente
+
+Iniciar un proceso de Python por cada trabajo cuesta decenas de
+milisegundos (arranque del intérprete e importación de Scanner, Parser,
+Evaluador, math, random...). Aquí el proceso principal hace ese trabajo
+una sola vez (calentar()): importa los módulos, instancia las funciones
+del registro, analiza un código de calentamiento y llama a gc.freeze()
+para que el recolector de basura de los hijos no toque esos objetos (y
+sus páginas sigan compartidas tras el fork). Después:
+
+    # Un proceso por trabajo, creado con fork en el momento
+    resultado = ejecutar_en_fork("x = 2\\nx * 21")
+    
+    # Grupo de procesos creados de antemano que reciben trabajos por un pipe
+    with GrupoFork(procesos=4) as grupo:
+        resultados = grupo.mapear(codigos, tiempo_limite=5)
+
+Cada trabajo se ejecuta en una Sesion nueva (entorno vacío), línea por
+línea como en el REPL, y produce un diccionario con la salida, si hubo
+errores y el tiempo de ejecución (ver ejecutar_trabajo()).
+
+Requiere os.fork (Linux, macOS). El proceso principal no debe tener
+otros hilos en ejecución al crear los procesos.
+"""
+
+import gc
+import io
+import os
+import signal
+import time
+import traceback
+from multiprocessing.connection import Pipe, wait
+from Funciones import REGISTRO
+from Sesion import Sesion, CACHE_ASA
+
+
+# Código que se analiza y evalúa al calentar (deja en caché sus ASA)
+CODIGO_CALENTAMIENTO = (
+    "x = 1",
+    "y = x + 2 * 3 - 4 / 5 % 6",
+    'texto = "a" + "b"',
+    "sqrt(16) + sin(0) + cos(0) + pow(2, 10) + rand()",
+    "f(a) = a * 2",
+    "f(x)",
+)
+
+_caliente = False
+
+
+def calentar(codigo=CODIGO_CALENTAMIENTO):
+    """
+    Prepara este proceso para crear procesos de trabajo con fork
+    
+    Instancia todas las funciones del registro, evalúa el código de
+    calentamiento en una sesión descartable (lo que carga los módulos y
+    deja sus ASA en CACHE_ASA) y congela los objetos existentes con
+    gc.freeze(). Llamarla más de una vez no tiene efecto.
+    
+    Args:
+        codigo: iterable - Líneas de calentamiento
+    """
+    global _caliente
+    if _caliente:
+        return
+    for nombre in REGISTRO.nombres():
+        REGISTRO.obtener(nombre)
+    sesion = Sesion(salida=io.StringIO())
+    for linea in codigo:
+        sesion.ejecutar(linea)
+    gc.collect()
+    gc.freeze()
+    _caliente = True
+
+
+def ejecutar_trabajo(codigo):
+    """
+    Ejecuta un trabajo en una sesión nueva
+    
+    Args:
+        codigo: str - Líneas a ejecutar (como en el REPL)
+    
+    Returns:
+        dict: {"salida": texto impreso, "errores": bool, "error": último
+              mensaje de error o None, "segundos": duración}
+    """
+    inicio = time.perf_counter()
+    salida = io.StringIO()
+    sesion = Sesion(salida=salida)
+    for linea in codigo.splitlines():
+        if linea.strip():
+            sesion.ejecutar(linea)
+    return {
+        "salida": salida.getvalue(),
+        "errores": sesion.existen_errores,
+        "error": sesion.ultimo_error,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def ejecutar_en_fork(codigo):
+    """
+    Ejecuta un trabajo en un proceso hijo creado con fork
+    
+    Args:
+        codigo: str - Líneas a ejecutar
+    
+    Returns:
+        dict: Resultado de ejecutar_trabajo()
+    
+    Raises:
+        OSError: Si el sistema no tiene os.fork
+        RuntimeError: Si el proceso hijo terminó sin responder
+    """
+    _verificar_fork()
+    calentar()
+    lectura, escritura = Pipe(duplex=False)
+    pid = os.fork()
+    if pid == 0:
+        _en_hijo(lambda: escritura.send(ejecutar_trabajo(codigo)))
+    
+    escritura.close()
+    try:
+        return lectura.recv()
+    except EOFError:
+        raise RuntimeError("El proceso de trabajo terminó sin responder") from None
+    finally:
+        lectura.close()
+        os.waitpid(pid, 0)
+
+
+class GrupoFork:
+    """
+    Grupo de procesos de trabajo creados con fork desde este proceso.
+    
+    Cada proceso atiende un trabajo a la vez; mapear() entrega el
+    siguiente trabajo pendiente al primer proceso que se desocupa, así que
+    un trabajo lento no retrasa a los demás. Un proceso que excede el
+    tiempo límite o termina inesperadamente se reemplaza por otro.
+    """
+    
+    def __init__(self, procesos=None, funcion=None):
+        """
+        Constructor: calienta este proceso y crea los procesos de trabajo
+        
+        Args:
+            procesos: int - Cantidad de procesos (por defecto os.cpu_count())
+            funcion: callable - Función que ejecuta cada trabajo en los
+                     procesos (por defecto ejecutar_trabajo); recibe el
+                     trabajo y retorna un resultado serializable
+        
+        Raises:
+            OSError: Si el sistema no tiene os.fork
+        """
+        _verificar_fork()
+        calentar()
+        self.procesos = procesos or os.cpu_count() or 1
+        self.funcion = funcion or ejecutar_trabajo
+        self._trabajadores = {}  # conexión -> pid
+        for _ in range(self.procesos):
+            self._crear_trabajador()
+    
+    def ejecutar(self, codigo, tiempo_limite=None):
+        """
+        Ejecuta un trabajo en un proceso del grupo
+        
+        Args:
+            codigo: str - Líneas a ejecutar
+            tiempo_limite: float - Segundos máximos (None: sin límite)
+        
+        Returns:
+            dict: Resultado de la función del grupo
+        """
+        return self.mapear([codigo], tiempo_limite)[0]
+    
+    def mapear(self, codigos, tiempo_limite=None):
+        """
+        Ejecuta varios trabajos repartidos entre los procesos del grupo
+        
+        Args:
+            codigos: iterable - Código de cada trabajo
+            tiempo_limite: float - Segundos máximos por trabajo
+        
+        Returns:
+            list: Un resultado por trabajo, en el mismo orden. Un trabajo
+                  que excede el límite o cuyo proceso falla produce
+                  {"salida": "", "errores": True, "error": mensaje, ...}
+        """
+        resultados = dict(self.repartir(codigos, tiempo_limite))
+        return [resultados[indice] for indice in range(len(resultados))]
+    
+    def repartir(self, codigos, tiempo_limite=None):
+        """
+        Ejecuta varios trabajos y genera cada resultado apenas termina
+        
+        Los códigos se leen de forma perezosa, así que pueden venir de un
+        generador con muchos trabajos. Si se deja de iterar antes de que
+        terminen todos (o se cierra el iterador), los procesos con trabajos
+        en curso se reemplazan.
+        
+        Args:
+            codigos: iterable - Código de cada trabajo
+            tiempo_limite: float - Segundos máximos por trabajo
+        
+        Returns:
+            iterator: Pares (índice del trabajo, resultado), en el orden en
+                      que terminan
+        """
+        pendientes = enumerate(codigos)
+        libres = list(self._trabajadores)
+        ocupados = {}  # conexión -> (índice, instante de inicio)
+        
+        try:
+            while True:
+                while libres:
+                    siguiente = next(pendientes, None)
+                    if siguiente is None:
+                        break
+                    conexion = libres.pop()
+                    conexion.send(siguiente[1])
+                    ocupados[conexion] = (siguiente[0], time.perf_counter())
+                if not ocupados:
+                    return
+                
+                espera = None
+                if tiempo_limite is not None:
+                    primero = min(inicio for _, inicio in ocupados.values())
+                    espera = max(0.0, primero + tiempo_limite - time.perf_counter())
+                
+                for conexion in wait(list(ocupados), espera):
+                    indice, inicio = ocupados.pop(conexion)
+                    try:
+                        resultado = conexion.recv()
+                        libres.append(conexion)
+                    except EOFError:
+                        resultado = _fallido("El proceso de trabajo terminó inesperadamente",
+                                             time.perf_counter() - inicio)
+                        libres.append(self._reemplazar(conexion))
+                    yield indice, resultado
+                
+                if tiempo_limite is not None:
+                    ahora = time.perf_counter()
+                    for conexion, (indice, inicio) in list(ocupados.items()):
+                        if ahora - inicio >= tiempo_limite:
+                            del ocupados[conexion]
+                            libres.append(self._reemplazar(conexion))
+                            yield indice, _fallido(f"Tiempo límite excedido ({tiempo_limite} s)", ahora - inicio)
+        finally:
+            # Si se deja de iterar antes de terminar, los resultados de los
+            # trabajos en curso quedarían en sus conexiones y los recibiría
+            # la siguiente llamada: esos procesos se reemplazan
+            for conexion in ocupados:
+                self._reemplazar(conexion)
+    
+    def cerrar(self):
+        """Termina los procesos de trabajo"""
+        for conexion, pid in list(self._trabajadores.items()):
+            try:
+                conexion.send(None)
+            except OSError:
+                pass
+            conexion.close()
+            os.waitpid(pid, 0)
+        self._trabajadores.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.cerrar()
+    
+    def _crear_trabajador(self):
+        """Crea un proceso de trabajo y retorna su conexión"""
+        propia, del_hijo = Pipe()
+        pid = os.fork()
+        if pid == 0:
+            # El hijo no debe conservar las conexiones de sus hermanos
+            for otra in self._trabajadores:
+                otra.close()
+            propia.close()
+            _en_hijo(lambda: _atender(del_hijo, self.funcion))
+        
+        del_hijo.close()
+        self._trabajadores[propia] = pid
+        return propia
+    
+    def _reemplazar(self, conexion):
+        """Termina un proceso de trabajo y crea otro en su lugar"""
+        pid = self._trabajadores.pop(conexion)
+        conexion.close()
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        return self._crear_trabajador()
+
+
+def _atender(conexion, funcion):
+    """Ciclo de un proceso de trabajo: recibe trabajos hasta recibir None"""
+    while True:
+        try:
+            codigo = conexion.recv()
+        except EOFError:
+            return
+        if codigo is None:
+            return
+        conexion.send(funcion(codigo))
+
+
+def _en_hijo(funcion):
+    """Ejecuta una función en el proceso hijo y lo termina sin volver al padre"""
+    codigo_salida = 1
+    try:
+        funcion()
+        codigo_salida = 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(codigo_salida)
+
+
+def _fallido(mensaje, segundos):
+    """Resultado de un trabajo que no terminó"""
+    return {"salida": "", "errores": True, "error": mensaje, "segundos": segundos}
+
+
+def _verificar_fork():
+    """Lanza OSError si el sistema no permite fork"""
+    if not hasattr(os, "fork"):
+        raise OSError("Los procesos de trabajo con fork requieren os.fork (Linux, macOS)")
@@ -0,0 +1,317 @@
+"""
+Sesiones de evaluación aisladas
+
+Una Sesion tiene su propio evaluador (y por lo tanto su propio entorno,
+tabla de funciones, caché de resultados y flujo de rand()) y su propio
+estado de error, así que varias sesiones pueden evaluar al mismo tiempo
+desde hilos distintos sin interferir entre sí:
+
+    sesion = Sesion()
+    sesion.ejecutar("x = 10")       # imprime como el REPL
+    sesion.evaluar("x * 2")         # (20, True)
+
+Lo único que comparten las sesiones es la caché de ASA (CACHE_ASA): el
+ASA de una línea no se modifica al resolverlo ni al evaluarlo (cada
+evaluador guarda sus sitios de llamada aparte), de modo que una línea
+analizada por una sesión se reutiliza tal cual en las demás. Esa caché es
+el único punto con candado; las asignaciones de variables de cada sesión
+no pasan por ningún candado global.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+
+
+# Líneas distintas cuyo ASA se conserva para no volver a analizarlas
+MAX_CACHE_AST = 256
+
+
+class CacheASA:
+    """
+    Caché LRU código fuente -> ASA, segura para usarse desde varios hilos.
+    
+    El análisis de una línea nueva se hace fuera del candado; si dos hilos
+    analizan la misma línea a la vez, ambos ASA son equivalentes y se
+    conserva el primero que se guardó.
+    """
+    
+    def __init__(self, capacidad=MAX_CACHE_AST):
+        """
+        Constructor
+        
+        Args:
+            capacidad: int - Máximo de líneas distintas
+        """
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def analizar(self, fuente):
+        """
+        Retorna el ASA de una línea, analizándola si no está en la caché
+        
+        Args:
+            fuente: str - Código fuente
+        
+        Returns:
+            Nodo: ASA (compartido; no debe modificarse)
+        
+        Raises:
+            Exception: Si la línea tiene errores léxicos o sintácticos
+        """
+        with self._candado:
+            ast = self._entradas.get(fuente)
+            if ast is not None:
+                self._entradas.move_to_end(fuente)
+                self.aciertos += 1
+                return ast
+            self.fallos += 1
+        
+        ast = Parser(Scanner(fuente).scan()).parse()
+        return self.agregar(fuente, ast)
+    
+    def agregar(self, fuente, ast):
+        """
+        Guarda el ASA de una línea
+        
+        Args:
+            fuente: str - Código fuente
+            ast: Nodo - ASA de la línea
+        
+        Returns:
+            Nodo: ASA guardado (el existente si otro hilo se adelantó)
+        """
+        with self._candado:
+            existente = self._entradas.get(fuente)
+            if existente is not None:
+                return existente
+            self._entradas[fuente] = ast
+            if len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+            return ast
+    
+    def items(self):
+        """Retorna una copia de las entradas (fuente, ASA), de la más antigua a la más reciente"""
+        with self._candado:
+            return list(self._entradas.items())
+    
+    def limpiar(self):
+        """Elimina todas las entradas"""
+        with self._candado:
+            self._entradas.clear()
+    
+    def __contains__(self, fuente):
+        return fuente in self._entradas
+    
+    def __len__(self):
+        return len(self._entradas)
+
+
+# Caché de ASA que comparten todas las sesiones
+CACHE_ASA = CacheASA()
+
+
+class Sesion:
+    """
+    Sesión de evaluación con su propio evaluador y estado de error.
+    
+    Una sesión no debe usarse desde dos hilos a la vez; cada hilo (o
+    cliente) usa su propia sesión.
+    """
+    
+    def __init__(self, evaluador=None, cache_ast=None, salida=None, presupuesto=None):
+        """
+        Constructor
+        
+        Args:
+            evaluador: Evaluador - Evaluador de la sesión (por defecto uno nuevo)
+            cache_ast: CacheASA - Caché de análisis (por defecto CACHE_ASA)
+            salida: file - Destino de lo que imprime ejecutar() (por
+                    defecto sys.stdout)
+            presupuesto: Presupuesto - Límites de cada evaluación (por
+                         defecto ninguno)
+        """
+        self.evaluador = Evaluador() if evaluador is None else evaluador
+        self.cache_ast = CACHE_ASA if cache_ast is None else cache_ast
+        self.salida = salida
+        self.presupuesto = presupuesto
+        self.existen_errores = False
+        self.ultimo_error = None  # Mensaje del último error, o None
+        self._bifurcaciones = 0   # Copias creadas con bifurcar()
+    
+    @property
+    def entorno(self):
+        """Variables de la sesión"""
+        return self.evaluador.entorno
+    
+    def evaluar(self, fuente):
+        """
+        Analiza, resuelve y evalúa una línea
+        
+        Args:
+            fuente: str - Código fuente
+        
+        Returns:
+            tuple: (resultado, debe_imprimir)
+        
+        Raises:
+            ErrorSemantico: Si ocurre un error semántico
+            ErrorPresupuesto: Si la evaluación agota el presupuesto de la
+                              sesión (sus asignaciones se deshacen)
+            Exception: Si la línea tiene errores léxicos o sintácticos
+        """
+        # Fases 1 y 2: Análisis léxico y sintáctico (o ASA en caché)
+        ast = self.cache_ast.analizar(fuente)
+        
+        # Fase 3: Resolución estática (funciones y aridad)
+        evaluador = self.evaluador
+        evaluador.compilar(ast)
+        
+        # Fase 4: Evaluación del ASA
+        if self.presupuesto is not None:
+            return self.presupuesto.evaluar(evaluador, ast)
+        return evaluador.evaluar(ast)
+    
+    def ejecutar(self, fuente):
+        """
+        Ejecuta una línea e imprime su resultado o su error (como el REPL)
+        
+        Args:
+            fuente: str - Código fuente
+        
+        Returns:
+            bool: True si la línea se ejecutó sin errores
+        """
+        try:
+            resultado, debe_imprimir = self.evaluar(fuente)
+            
+            # Imprimir el resultado si no hay punto y coma
+            if debe_imprimir:
+                print(formatear(resultado), file=self.salida)
+            return True
+        
+        except ErrorSemantico as ex:
+            print("\nERROR SEMÁNTICO:", file=self.salida)
+            print(f"  {str(ex)}", file=self.salida)
+            print(file=self.salida)
+            self._registrar_error(ex)
+        except Exception as ex:
+            print("\nERROR:", file=self.salida)
+            print(f"  {str(ex)}", file=self.salida)
+            print(file=self.salida)
+            self._registrar_error(ex)
+        return False
+    
+    def bifurcar(self, salida=None):
+        """
+        Crea una sesión con una copia de las variables y funciones de esta
+        
+        La copia es superficial (los valores se comparten, pero asignar en
+        una sesión no afecta a la otra) y las funciones del usuario se
+        vuelven a crear sobre la tabla de la nueva sesión. El evaluador es
+        de la misma clase, con una copia de la tabla de operadores (p. ej.
+        con los operadores vectoriales) y un flujo de rand() derivado del
+        de esta sesión (reproducible: la n-ésima copia de una sesión con
+        semilla fija recibe siempre el mismo flujo). La copia usa la misma
+        caché de análisis y una copia del presupuesto.
+        
+        Args:
+            salida: file - Destino de lo que imprime ejecutar() en la copia
+        
+        Returns:
+            Sesion: Sesión nueva
+        """
+        from FuncionesUsuario import FuncionUsuario
+        original = self.evaluador
+        originales = original.funciones
+        evaluador = type(original)(registro=originales.registro, entorno=dict(self.entorno))
+        evaluador.operadores = original.operadores.copiar()
+        evaluador.politica_vectores = original.politica_vectores
+        self._bifurcaciones += 1
+        evaluador.aleatorio = original.aleatorio.derivar(self._bifurcaciones)
+        copia = Sesion(evaluador, self.cache_ast, salida, copy.copy(self.presupuesto))
+        funciones = evaluador.funciones
+        if originales.registro is not None:
+            # Funciones nativas que se eliminaron de esta sesión
+            for nombre in originales.registro.nombres():
+                if nombre not in originales:
+                    del funciones[nombre]
+        for nombre, funcion in dict.items(originales):
+            if isinstance(funcion, FuncionUsuario):
+                funcion = FuncionUsuario(nombre, funcion.parametros, funcion.cuerpo, funciones)
+            funciones[nombre] = funcion
+        return copia
+    
+    def guardar(self, ruta):
+        """
+        Guarda la sesión en una imagen (ver ImagenSesion)
+        
+        Args:
+            ruta: str - Archivo de la imagen
+        
+        Returns:
+            dict: Resumen de guardar_sesion()
+        
+        Raises:
+            ImagenIncompleta: Si se omitieron variables o funciones nativas
+                              (la imagen se guarda igual; el resumen está
+                              en la excepción)
+        """
+        from ImagenSesion import guardar_sesion, ImagenIncompleta
+        resumen = guardar_sesion(ruta, self.evaluador, OrderedDict(self.cache_ast.items()))
+        if resumen["omitidas"] or resumen["funciones_omitidas"]:
+            raise ImagenIncompleta(ruta, resumen)
+        return resumen
+    
+    @classmethod
+    def restaurar(cls, ruta, cache_ast=None, salida=None):
+        """
+        Crea una sesión a partir de una imagen
+        
+        Las líneas de la caché guardada se agregan a la caché de la sesión.
+        
+        Args:
+            ruta: str - Archivo de la imagen
+            cache_ast: CacheASA - Caché de análisis (por defecto CACHE_ASA)
+            salida: file - Destino de lo que imprime ejecutar()
+        
+        Returns:
+            Sesion: Sesión restaurada
+        
+        Raises:
+            ErrorImagen: Si el archivo no es una imagen de sesión válida
+        """
+        from ImagenSesion import cargar_sesion
+        evaluador, entradas = cargar_sesion(ruta)
+        sesion = cls(evaluador, cache_ast, salida)
+        for fuente, ast in entradas.items():
+            sesion.cache_ast.agregar(fuente, ast)
+        return sesion
+    
+    def _registrar_error(self, ex):
+        """Marca que la sesión tuvo un error"""
+        self.existen_errores = True
+        self.ultimo_error = str(ex)
+
+
+def formatear(valor):
+    """
+    Convierte un resultado en el texto que muestra el REPL
+    
+    Args:
+        valor: object - Resultado de una evaluación
+    
+    Returns:
+        str: null, true/false o el valor
+    """
+    if valor is None:
+        return "null"
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    return str(valor)
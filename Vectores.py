@@ -0,0 +1,291 @@
+"""
+Valores vectoriales con NumPy (dependencia opcional)
+
+Permite guardar arreglos de NumPy en el entorno del evaluador y operar
+sobre columnas completas en una sola evaluación:
+
+    evaluador = Evaluador()
+    habilitar_vectores(evaluador)
+    evaluador.entorno["x"] = numpy.linspace(0, 1, 1_000_000)
+    # "sin(x) * 2 + 1" se calcula elemento a elemento en C
+
+Los operadores + - * / % se aplican elemento a elemento con las reglas de
+difusión (broadcasting) de NumPy, y sin/cos/sqrt/pow se calculan con las
+ufuncs correspondientes. Con escalares, las funciones conservan su
+comportamiento habitual.
+
+Semántica de errores elemento a elemento (parámetro 'politica'):
+    "estricta" - igual que con escalares: si algún divisor es cero se
+                 produce "División por cero"/"Módulo por cero", una raíz
+                 de un negativo produce el error de sqrt() y cualquier
+                 otro resultado indefinido (NaN a partir de valores que
+                 no lo eran) produce un error de dominio.
+    "nan"      - aritmética IEEE: x/0 da ±inf (0/0 da nan), x%0 y sqrt
+                 de un negativo dan nan, sin errores.
+
+Los arreglos usan los tipos de NumPy (enteros de 64 bits, no enteros de
+tamaño arbitrario) y nunca se memorizan porque no son hashables. Las
+operaciones enteras (+ - * y pow) no dan la vuelta en silencio: si algún
+elemento no cabe en el tipo entero, la política estricta produce
+"Desbordamiento numérico" y la política "nan" promueve el resultado a
+float.
+"""
+
+from TipoToken import TipoToken
+from Errores import ErrorSemantico
+from Operadores import NUMEROS
+from Funciones import FuncionBuiltIn, FuncionTipada
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional
+    numpy = None
+
+
+# True si NumPy está instalado
+DISPONIBLE = numpy is not None
+
+# Políticas de errores elemento a elemento
+POLITICAS = ("estricta", "nan")
+
+# Tipos de NumPy que se tratan como valores vectoriales (los escalares de
+# NumPy, como numpy.int64, también se operan con NumPy)
+VECTORIALES = (numpy.ndarray, numpy.generic) if DISPONIBLE else ()
+
+# Mayor magnitud hasta la que todos los enteros son exactos en float
+EXACTO_FLOAT = float(2 ** 53)
+
+
+def habilitar_vectores(evaluador, politica="estricta"):
+    """
+    Habilita los valores vectoriales en un evaluador
+    
+    Registra los operadores para arreglos de NumPy en su tabla de
+    operadores y reemplaza sin/cos/sqrt/pow por versiones que aceptan
+    arreglos.
+    
+    Args:
+        evaluador: Evaluador - Evaluador a extender
+        politica: str - "estricta" o "nan" (ver documentación del módulo)
+    
+    Raises:
+        ImportError: Si NumPy no está instalado
+        ValueError: Si la política no existe
+    """
+    if not DISPONIBLE:
+        raise ImportError("Los valores vectoriales requieren NumPy (pip install numpy)")
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: '{politica}' (opciones: {', '.join(POLITICAS)})")
+    
+    registrar_operadores(evaluador.operadores, politica)
+    evaluador.politica_vectores = politica
+    
+    funciones = evaluador.funciones
+    for nombre, (ufunc, dominio) in _funciones_vectoriales(politica).items():
+        escalar = funciones.get(nombre)
+        # Solo se extienden las funciones originales (no las redefinidas por el usuario)
+        if isinstance(escalar, FuncionTipada):
+            funciones[nombre] = FuncionVectorial(escalar, ufunc, politica, dominio)
+
+
+def registrar_operadores(tabla, politica="estricta"):
+    """
+    Registra los operadores elemento a elemento en una tabla de operadores
+    
+    Args:
+        tabla: TablaOperadores - Tabla a extender
+        politica: str - "estricta" o "nan"
+    """
+    estricta = politica == "estricta"
+    aritmeticos = {
+        TipoToken.PLUS: _entera(numpy.add, numpy.add, "+", estricta),
+        TipoToken.MINUS: _entera(numpy.subtract, numpy.subtract, "-", estricta),
+        TipoToken.STAR: _entera(numpy.multiply, numpy.multiply, "*", estricta),
+        TipoToken.SLASH: _division(numpy.true_divide, "División por cero", estricta),
+        TipoToken.MOD: _division(numpy.remainder, "Módulo por cero", estricta),
+    }
+    
+    operandos = VECTORIALES + NUMEROS
+    for operador, manejador in aritmeticos.items():
+        for izquierdo in operandos:
+            for derecho in operandos:
+                if izquierdo in VECTORIALES or derecho in VECTORIALES:
+                    tabla.registrar_binario(operador, izquierdo, derecho, manejador)
+    
+    negacion = _entera(numpy.negative, numpy.negative, "-", estricta)
+    for tipo in VECTORIALES:
+        tabla.registrar_unario(TipoToken.MINUS, tipo, negacion)
+
+
+def _entera(ufunc, flotante, simbolo, estricta):
+    """
+    Crea el manejador de una operación que con enteros puede desbordarse
+    
+    NumPy da la vuelta en silencio cuando un resultado entero no cabe en
+    su tipo. El resultado se compara con el mismo cálculo en float: los
+    elementos claramente fuera de rango se desbordaron, y los que están
+    cerca del límite (o cuyos operandos float no son exactos) se
+    comprueban con enteros de Python.
+    
+    Args:
+        ufunc: numpy.ufunc - Operación de NumPy
+        flotante: callable - La misma operación sobre float
+        simbolo: str - Operador o función, para el mensaje de error
+        estricta: bool - Si un desbordamiento produce un error (si no, el
+                  resultado se promueve a float)
+    
+    Returns:
+        callable: Manejador (*operandos) -> resultado
+    """
+    def manejador(*operandos):
+        resultado = ufunc(*operandos)
+        tipo = numpy.result_type(resultado)
+        if tipo.kind not in "iu":
+            return resultado
+        
+        limites = numpy.iinfo(tipo)
+        reales = [numpy.asarray(operando, dtype=float) for operando in operandos]
+        with numpy.errstate(all="ignore"):
+            aproximado = flotante(*reales)
+        magnitud = numpy.abs(aproximado)
+        desbordado = magnitud > 2.0 * limites.max
+        inexactos = magnitud > EXACTO_FLOAT
+        for real in reales:
+            inexactos = inexactos | (numpy.abs(real) > EXACTO_FLOAT)
+        dudosos = inexactos & ~desbordado
+        desbordado = desbordado | (~inexactos & ((aproximado > limites.max) | (aproximado < limites.min)))
+        
+        if numpy.any(dudosos):
+            difundidos = numpy.broadcast_arrays(*operandos)
+            exactos = ufunc(*(numpy.asarray(operando)[dudosos].astype(object) for operando in difundidos))
+            if any(valor > limites.max or valor < limites.min for valor in exactos.flat):
+                desbordado = True
+        
+        if not numpy.any(desbordado):
+            return resultado
+        if estricta:
+            raise ErrorSemantico(
+                f"Desbordamiento numérico en '{simbolo}': el resultado no cabe en {tipo}"
+            )
+        return aproximado
+    return manejador
+
+
+def _division(ufunc, mensaje, estricta):
+    """
+    Crea el manejador de / o %, que no están definidos con divisor cero
+    
+    Args:
+        ufunc: numpy.ufunc - Operación de NumPy
+        mensaje: str - Error a producir con la política estricta
+        estricta: bool - Si un divisor cero produce un error
+    
+    Returns:
+        callable: Manejador (izquierda, derecha) -> resultado
+    """
+    def manejador(izquierda, derecha):
+        hay_cero = numpy.any(numpy.equal(derecha, 0))
+        if hay_cero:
+            if estricta:
+                raise ErrorSemantico(mensaje)
+            # Con enteros, NumPy daría 0 en lugar de nan
+            izquierda = numpy.asarray(izquierda, dtype=float)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return ufunc(izquierda, derecha)
+    return manejador
+
+
+class FuncionVectorial(FuncionBuiltIn):
+    """
+    Función matemática que acepta arreglos de NumPy.
+    
+    Con argumentos escalares delega en la función original, de modo que
+    los resultados, los errores y la memoización no cambian.
+    """
+    
+    def __init__(self, escalar, ufunc, politica, dominio=None):
+        """
+        Constructor
+        
+        Args:
+            escalar: FuncionTipada - Función original para escalares
+            ufunc: callable - Implementación elemento a elemento
+            politica: str - "estricta" o "nan"
+            dominio: callable - Validación previa (argumentos) para la
+                     política estricta, o None
+        """
+        super().__init__(escalar.nombre, escalar.aridad, pura=escalar.pura, costo=escalar.costo)
+        self.escalar = escalar
+        self.ufunc = ufunc
+        self.estricta = politica == "estricta"
+        self.dominio = dominio
+    
+    def llamar(self, evaluador, argumentos):
+        if not any(isinstance(argumento, VECTORIALES) for argumento in argumentos):
+            return self.escalar.llamar(evaluador, argumentos)
+        return self._calcular(argumentos)
+    
+    def llamar1(self, evaluador, a):
+        if not isinstance(a, VECTORIALES):
+            return self.escalar.llamar1(evaluador, a)
+        return self._calcular([a])
+    
+    def llamar2(self, evaluador, a, b):
+        if not isinstance(a, VECTORIALES) and not isinstance(b, VECTORIALES):
+            return self.escalar.llamar2(evaluador, a, b)
+        return self._calcular([a, b])
+    
+    def _calcular(self, argumentos):
+        """Aplica la ufunc validando tipos y, si corresponde, el dominio"""
+        firma = self.escalar.firma
+        for posicion, argumento in enumerate(argumentos):
+            if isinstance(argumento, VECTORIALES):
+                if argumento.dtype.kind not in "biuf":
+                    raise firma.error_argumento(self.nombre, posicion, argumento)
+            elif not isinstance(argumento, NUMEROS):
+                raise firma.error_argumento(self.nombre, posicion, argumento)
+        
+        if self.estricta and self.dominio is not None:
+            self.dominio(*argumentos)
+        
+        with numpy.errstate(all="ignore"):
+            resultado = self.ufunc(*argumentos)
+        
+        if self.estricta:
+            # Un NaN nuevo indica un valor fuera del dominio (como math.sin(inf))
+            nuevos = numpy.isnan(resultado)
+            for argumento in argumentos:
+                nuevos &= ~numpy.isnan(argumento)
+            if numpy.any(nuevos):
+                raise ErrorSemantico(f"Error al ejecutar '{self.nombre}': math domain error")
+        return resultado
+
+
+def _dominio_sqrt(valor):
+    """Rechaza raíces de negativos, con el mismo mensaje que para escalares"""
+    negativos = numpy.less(valor, 0)
+    if numpy.any(negativos):
+        primero = numpy.asarray(valor)[negativos].flat[0]
+        raise ErrorSemantico(f"sqrt() no puede calcular la raíz cuadrada de un número negativo: {primero}")
+
+
+def _potencia(estricta):
+    """pow() elemento a elemento; exacto con enteros y exponentes no negativos"""
+    entera = _entera(numpy.power, numpy.float_power, "pow", estricta)
+    
+    def potencia(base, exponente):
+        if (numpy.asarray(base).dtype.kind in "biu" and numpy.asarray(exponente).dtype.kind in "biu"
+                and not numpy.any(numpy.less(exponente, 0))):
+            return entera(base, exponente)
+        return numpy.float_power(base, exponente)
+    return potencia
+
+
+def _funciones_vectoriales(politica):
+    """Retorna nombre -> (ufunc, dominio) de las funciones con versión vectorial"""
+    return {
+        "sin": (numpy.sin, None),
+        "cos": (numpy.cos, None),
+        "sqrt": (numpy.sqrt, _dominio_sqrt),
+        "pow": (_potencia(politica == "estricta"), None),
+    }
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mediciones de rendimiento del intérprete
+
+Cada medición compara una variante del evaluador contra su línea base y
+muestra el tiempo por evaluación. Para ejecutar todas:
+
+    python benchmark.py
+"""
+
+import operator
+import time
+import timeit
+from Scanner import Scanner
+from Parser import Parser
+from TipoToken import TipoToken
+from Evaluador import Evaluador
+
+
+def compilar(evaluador, expresion):
+    """Analiza y resuelve una expresión, retornando su ASA"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    return evaluador.compilar(ast)
+
+
+def medir(funcion, repeticiones=5, numero=2000):
+    """
+    Mide el mejor tiempo por llamada de una función
+    
+    Args:
+        funcion: callable - Función sin argumentos a medir
+        repeticiones: int - Número de repeticiones
+        numero: int - Llamadas por repetición
+    
+    Returns:
+        float: Microsegundos por llamada
+    """
+    mejor = min(timeit.repeat(funcion, number=numero, repeat=repeticiones))
+    return mejor / numero * 1e6
+
+
+def mostrar(titulo, resultados):
+    """Imprime una tabla de resultados (nombre, microsegundos)"""
+    print(f"\n{titulo}")
+    print("-" * 60)
+    base = resultados[0][1]
+    for nombre, tiempo in resultados:
+        print(f"  {nombre:<30} {tiempo:10.2f} us   x{base / tiempo:5.2f}")
+
+
+def bench_enteros():
+    """Aritmética entera (literales int) contra la línea base en float"""
+    expresion_entera = "(i * 7 + 3) % 11 + pow(i, 3) - i / 2"
+    expresion_real = "(i * 7.0 + 3.0) % 11.0 + pow(i, 3.0) - i / 2.0"
+    
+    evaluador_real = Evaluador()
+    evaluador_real.entorno["i"] = 12345.0
+    ast_real = compilar(evaluador_real, expresion_real)
+    
+    evaluador_entero = Evaluador()
+    evaluador_entero.entorno["i"] = 12345
+    ast_entero = compilar(evaluador_entero, expresion_entera)
+    
+    mostrar("Aritmética entera vs. float", [
+        ("float (línea base)", medir(lambda: evaluador_real.evaluar(ast_real))),
+        ("int", medir(lambda: evaluador_entero.evaluar(ast_entero))),
+    ])
+    
+    # Exactitud más allá de 2**53
+    grande = compilar(evaluador_entero, "pow(3, 40) + 1")
+    print(f"  pow(3, 40) + 1 = {evaluador_entero.evaluar(grande)[0]} (exacto)")
+
+
+def bench_cadenas():
+    """Concatenación repetida (s = s + "x") con cuerdas contra str plano"""
+    print("\nConcatenación repetida: s = s + \"x\"")
+    print("-" * 60)
+    print(f"  {'n':>8} {'str (línea base)':>20} {'Cuerda':>14}")
+    
+    for n in (5000, 10000, 20000, 40000):
+        tiempos = []
+        for usar_cuerda in (False, True):
+            evaluador = Evaluador()
+            if not usar_cuerda:
+                evaluador.operadores.registrar_binario(TipoToken.PLUS, str, str, operator.add)
+            evaluador.entorno["s"] = ""
+            ast = compilar(evaluador, 's = s + "xxxxxxxxxx";')
+            
+            inicio = time.perf_counter()
+            for _ in range(n):
+                evaluador.evaluar(ast)
+            len(str(evaluador.entorno["s"]))  # Incluye el aplanado final
+            tiempos.append((time.perf_counter() - inicio) / n * 1e6)
+        
+        print(f"  {n:>8} {tiempos[0]:>17.2f} us {tiempos[1]:>11.2f} us")
+
+
+def bench_memoizacion():
+    """Funciones puras sobre entradas cuantizadas, con y sin memoización"""
+    expresion = "sqrt(pow(sin(x), 2) + pow(cos(x), 2)) * pow(x, 3)"
+    valores = [i / 8 for i in range(64)]
+    
+    resultados = []
+    # sin/cos/sqrt/pow (costo 2) se memorizan por defecto; con un costo
+    # mínimo mayor se desactiva la caché para compararla
+    for nombre, costo_minimo in (("sin caché (línea base)", 3), ("con caché LRU", None)):
+        evaluador = Evaluador()
+        if costo_minimo is not None:
+            evaluador.cache_funciones.costo_minimo = costo_minimo
+        ast = compilar(evaluador, expresion)
+        
+        def evaluar_todos():
+            for valor in valores:
+                evaluador.entorno["x"] = valor
+                evaluador.evaluar(ast)
+        
+        resultados.append((nombre, medir(evaluar_todos, numero=200) / len(valores)))
+    
+    mostrar("Memoización de funciones puras (64 entradas distintas)", resultados)
+
+
+def bench_vectores():
+    """Una fórmula sobre una columna: evaluación por punto contra NumPy"""
+    import Vectores
+    if not Vectores.DISPONIBLE:
+        print("\nValores vectoriales: NumPy no está instalado, se omite")
+        return
+    
+    numpy = Vectores.numpy
+    expresion = "sqrt(x * x + 1) * sin(x) + x % 3"
+    puntos = 20000
+    columna = numpy.linspace(0, 100, puntos)
+    
+    evaluador = Evaluador()
+    ast = compilar(evaluador, expresion)
+    
+    def por_punto():
+        for valor in columna.tolist():
+            evaluador.entorno["x"] = valor
+            evaluador.evaluar(ast)
+    
+    evaluador_vectorial = Evaluador()
+    Vectores.habilitar_vectores(evaluador_vectorial)
+    evaluador_vectorial.entorno["x"] = columna
+    ast_vectorial = compilar(evaluador_vectorial, expresion)
+    
+    mostrar(f"Fórmula sobre {puntos} puntos (tiempo por punto)", [
+        ("una evaluación por punto", medir(por_punto, repeticiones=3, numero=1) / puntos),
+        ("arreglo de NumPy", medir(lambda: evaluador_vectorial.evaluar(ast_vectorial),
+                                   repeticiones=3, numero=20) / puntos),
+    ])
+
+
+def bench_lote():
+    """Una expresión sobre muchas filas: análisis por fila contra compilada"""
+    from EvaluacionLote import ExpresionCompilada
+    expresion = "sqrt(x * x + y * y) / (x + 1)"
+    filas = [{"x": i, "y": i % 7} for i in range(2000)]
+    
+    def analizar_cada_fila():
+        evaluador = Evaluador()
+        for fila in filas:
+            evaluador.entorno.update(fila)
+            evaluador.evaluar(compilar(evaluador, expresion))
+    
+    compilada = ExpresionCompilada(expresion)
+    mostrar(f"Lote de {len(filas)} filas (tiempo por fila)", [
+        ("análisis en cada fila", medir(analizar_cada_fila, repeticiones=3, numero=3) / len(filas)),
+        ("ExpresionCompilada", medir(lambda: compilada.evaluar_lote(filas),
+                                     repeticiones=3, numero=3) / len(filas)),
+    ])
+
+
+def bench_entornos():
+    """Bifurcar un entorno grande: copia de dict contra EntornoPersistente"""
+    import tracemalloc
+    from Entorno import EntornoPersistente
+    variables = {f"v{i}": i for i in range(50000)}
+    ramas = 100
+    
+    print(f"\nBifurcar {ramas} veces un entorno de {len(variables)} variables (y asignar en cada rama)")
+    print("-" * 60)
+    for nombre, base in (("dict.copy (línea base)", dict(variables)),
+                         ("EntornoPersistente", EntornoPersistente(variables))):
+        copiar = base.copy
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        copias = []
+        for i in range(ramas):
+            copia = copiar()
+            copia["v0"] = i
+            copias.append(copia)
+        tiempo = (time.perf_counter() - inicio) / ramas * 1e6
+        memoria = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+        del copias
+        print(f"  {nombre:<30} {tiempo:10.2f} us/rama {memoria:10.1f} MiB")
+    
+    persistente = EntornoPersistente(variables)
+    mostrar("Lectura de una variable", [
+        ("dict (línea base)", medir(lambda: variables["v12345"], numero=200000)),
+        ("EntornoPersistente", medir(lambda: persistente["v12345"], numero=200000)),
+    ])
+
+
+def bench_reactivo():
+    """Actualizar una variable en una sesión grande: re-ejecutar todo contra modo reactivo"""
+    from Reactivo import EvaluadorReactivo
+    definiciones = 2000
+    sentencias = [f"base{i} = {i};" for i in range(definiciones)]
+    sentencias += [f"d{i} = base{i} * 2 + sqrt(base{i});" for i in range(definiciones)]
+    
+    evaluador = Evaluador()
+    asts = [compilar(evaluador, sentencia) for sentencia in sentencias]
+    for ast in asts[:definiciones]:
+        evaluador.evaluar(ast)
+    
+    def reejecutar_todo():
+        evaluador.entorno["base7"] = 70
+        for ast in asts[definiciones:]:
+            evaluador.evaluar(ast)
+    
+    reactivo = EvaluadorReactivo()
+    for sentencia in sentencias:
+        reactivo.evaluar(compilar(reactivo, sentencia))
+    
+    mostrar(f"Cambio de una variable entre {definiciones} definiciones", [
+        ("re-ejecutar todas", medir(reejecutar_todo, repeticiones=3, numero=20)),
+        ("EvaluadorReactivo", medir(lambda: reactivo.asignar("base7", 70), repeticiones=3, numero=2000)),
+    ])
+
+
+def bench_sesion():
+    """Reanudar una sesión grande: re-ejecutar el script contra restaurar una imagen"""
+    import os
+    import tempfile
+    from ImagenSesion import guardar_sesion, cargar_sesion
+    sentencias = [f"v{i} = {i} * 3 + sqrt({i});" for i in range(20000)]
+    
+    def reejecutar():
+        evaluador = Evaluador()
+        for sentencia in sentencias:
+            evaluador.evaluar(compilar(evaluador, sentencia))
+        return evaluador
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        inicio = time.perf_counter()
+        evaluador = reejecutar()
+        tiempo_reejecutar = (time.perf_counter() - inicio) * 1e3
+        
+        inicio = time.perf_counter()
+        guardar_sesion(ruta, evaluador)
+        tiempo_guardar = (time.perf_counter() - inicio) * 1e3
+        
+        inicio = time.perf_counter()
+        restaurado, _ = cargar_sesion(ruta)
+        restaurado.entorno["v12345"]
+        tiempo_restaurar = (time.perf_counter() - inicio) * 1e3
+        tamano = os.path.getsize(ruta) / 2**10
+        restaurado.entorno._lector.cerrar()
+    
+    print(f"\nReanudar una sesión de {len(sentencias)} variables")
+    print("-" * 60)
+    print(f"  {'Re-ejecutar el script (línea base)':<36} {tiempo_reejecutar:10.1f} ms")
+    print(f"  {'Restaurar imagen y leer 1 variable':<36} {tiempo_restaurar:10.1f} ms")
+    print(f"  {'Guardar imagen':<36} {tiempo_guardar:10.1f} ms ({tamano:.0f} KiB)")
+
+
+def bench_sesiones():
+    """Evaluaciones concurrentes: una sesión por hilo"""
+    import os
+    import sys
+    import threading
+    from Sesion import Sesion
+    evaluaciones = 20000
+    lineas = ["x = x + 1;", "y = sqrt(x * x) + pow(x, 2) % 7;"]
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    
+    print(f"\nSesiones concurrentes ({evaluaciones} evaluaciones por hilo, "
+          f"{os.cpu_count()} núcleos, GIL {'activo' if gil else 'desactivado'})")
+    print("-" * 60)
+    base = None
+    for hilos in (1, 2, 4, 8):
+        sesiones = [Sesion() for _ in range(hilos)]
+        
+        def trabajar(sesion):
+            sesion.evaluar("x = 0;")
+            for i in range(evaluaciones):
+                sesion.evaluar(lineas[i & 1])
+        
+        trabajadores = [threading.Thread(target=trabajar, args=(sesion,)) for sesion in sesiones]
+        inicio = time.perf_counter()
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+        tiempo = time.perf_counter() - inicio
+        por_segundo = hilos * evaluaciones / tiempo
+        base = base or por_segundo
+        print(f"  {hilos} hilo(s) {por_segundo:14.0f} evaluaciones/s {por_segundo / base:8.2f}x")
+
+
+def _tamano_tabla(tabla):
+    """Trabajo de un proceso: recibe la tabla serializada"""
+    return len(tabla)
+
+
+def _tamano_compartida(nombre):
+    """Trabajo de un proceso: usa la tabla adjuntada al iniciar"""
+    from MemoriaCompartida import VARIABLES_PROCESO
+    return len(VARIABLES_PROCESO[nombre])
+
+
+def bench_memoria_compartida():
+    """Enviar una tabla grande a cada proceso: pickle contra memoria compartida"""
+    import Vectores
+    if not Vectores.DISPONIBLE:
+        print("\nMemoria compartida: NumPy no está instalado (omitido)")
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    from MemoriaCompartida import MemoriaCompartida, adjuntar_en_proceso
+    tabla = Vectores.numpy.random.default_rng(0).random(8_000_000)
+    procesos = trabajos = 4
+    
+    print(f"\nEnviar una tabla de {tabla.nbytes / 2**20:.0f} MiB a {trabajos} trabajos ({procesos} procesos)")
+    print("-" * 60)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(procesos) as grupo:
+        list(grupo.map(_tamano_tabla, [tabla] * trabajos))
+    tiempo = (time.perf_counter() - inicio) * 1e3
+    print(f"  {'pickle por trabajo (línea base)':<36} {tiempo:10.1f} ms")
+    
+    inicio = time.perf_counter()
+    with MemoriaCompartida() as memoria:
+        memoria.publicar("tabla", tabla)
+        with ProcessPoolExecutor(procesos, initializer=adjuntar_en_proceso,
+                                 initargs=(memoria.descriptores(),)) as grupo:
+            list(grupo.map(_tamano_compartida, ["tabla"] * trabajos))
+    tiempo = (time.perf_counter() - inicio) * 1e3
+    print(f"  {'MemoriaCompartida':<36} {tiempo:10.1f} ms")
+
+
+def bench_fork():
+    """Latencia por trabajo: proceso nuevo contra fork de un intérprete caliente"""
+    import os
+    import subprocess
+    import sys
+    if not hasattr(os, "fork"):
+        print("\nProcesos con fork: os.fork no disponible (omitido)")
+        return
+    import ServidorFork
+    codigo = "x = 3\nsqrt(x * x + 16)"
+    programa = f"import ServidorFork; ServidorFork.ejecutar_trabajo({codigo!r})"
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    trabajos = 20
+    
+    def medir_trabajos(ejecutar):
+        inicio = time.perf_counter()
+        for _ in range(trabajos):
+            ejecutar()
+        return (time.perf_counter() - inicio) / trabajos * 1e3
+    
+    print(f"\nLatencia por trabajo ({trabajos} trabajos)")
+    print("-" * 60)
+    tiempo = medir_trabajos(lambda: subprocess.run([sys.executable, "-c", programa], cwd=directorio, check=True))
+    print(f"  {'Proceso nuevo (línea base)':<36} {tiempo:10.2f} ms")
+    tiempo = medir_trabajos(lambda: ServidorFork.ejecutar_en_fork(codigo))
+    print(f"  {'fork por trabajo':<36} {tiempo:10.2f} ms")
+    with ServidorFork.GrupoFork(procesos=2) as grupo:
+        tiempo = medir_trabajos(lambda: grupo.ejecutar(codigo))
+    print(f"  {'GrupoFork (procesos creados)':<36} {tiempo:10.2f} ms")
+
+
+def bench_ejecutor_lotes():
+    """Scripts por segundo: un proceso por script contra EjecutorLotes"""
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import EjecutorLotes
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    
+    with tempfile.TemporaryDirectory() as temporal:
+        scripts = []
+        for i in range(2000):
+            ruta = os.path.join(temporal, f"s{i:05d}.txt")
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                archivo.write(f"x = {i};\nsqrt(x * x + 16) * pow(x, 2) % 7\n")
+            scripts.append(ruta)
+        destino = os.path.join(temporal, "resultados.jsonl")
+        
+        print(f"\nScripts por segundo ({len(scripts)} scripts pequeños)")
+        print("-" * 60)
+        muestra = scripts[:20]
+        inicio = time.perf_counter()
+        for ruta in muestra:
+            with open(ruta, encoding="utf-8") as entrada:
+                subprocess.run([sys.executable, "Interprete.py"], stdin=entrada, cwd=directorio,
+                               stdout=subprocess.DEVNULL, check=True)
+        por_segundo = len(muestra) / (time.perf_counter() - inicio)
+        print(f"  {'Interprete.py < script (línea base)':<36} {por_segundo:10.0f} /s")
+        for procesos in sorted({1, os.cpu_count() or 1}):
+            resumen = EjecutorLotes.ejecutar_lote(scripts, destino, procesos=procesos)
+            print(f"  {f'EjecutorLotes ({procesos} procesos)':<36} {resumen['por_segundo']:10.0f} /s")
+
+
+def bench_paralela():
+    """Script ancho: sentencias independientes en secuencia contra EjecucionParalela"""
+    import io
+    import os
+    from Sesion import Sesion
+    from EjecucionParalela import ejecutar_paralelo
+    lineas = [f"a{i} = pow(3, {600000 + i}) % 1000007;" for i in range(8)]
+    lineas.append(" + ".join(f"a{i}" for i in range(8)))
+    
+    print(f"\nScript ancho ({len(lineas) - 1} fórmulas independientes)")
+    print("-" * 60)
+    sesion = Sesion(salida=io.StringIO())
+    inicio = time.perf_counter()
+    for linea in lineas:
+        sesion.ejecutar(linea)
+    base = time.perf_counter() - inicio
+    print(f"  {'Secuencial (línea base)':<36} {base * 1e3:10.1f} ms")
+    for procesos in sorted({2, os.cpu_count() or 1}):
+        sesion = Sesion(salida=io.StringIO())
+        inicio = time.perf_counter()
+        ejecutar_paralelo(sesion, lineas, procesos=procesos)
+        tiempo = time.perf_counter() - inicio
+        print(f"  {f'EjecucionParalela ({procesos} procesos)':<36} {tiempo * 1e3:10.1f} ms  ({base / tiempo:.1f}x)")
+
+
+def bench_presupuesto():
+    """Costo de evaluar con presupuesto (pasos, tiempo y memoria) contra sin presupuesto"""
+    from Presupuesto import Presupuesto
+    evaluador = Evaluador()
+    evaluador.entorno.update({"x": 3, "y": 4.5, "s": "abc"})
+    evaluador.evaluar(compilar(evaluador, "f(a, b) = a * b + a - b"))
+    ast = compilar(evaluador, "(x * 7 + 3) % 11 + f(x, y) * sqrt(y) - x / 2 + f(y, x)")
+    presupuesto = Presupuesto(pasos=100000, segundos=1.0, memoria=1 << 20)
+    
+    mostrar("Evaluación con presupuesto", [
+        ("Sin presupuesto (línea base)", medir(lambda: evaluador.evaluar(ast))),
+        ("Con presupuesto", medir(lambda: presupuesto.evaluar(evaluador, ast))),
+    ])
+
+
+def bench_planificador():
+    """Latencia de consultas cortas mientras otras sesiones evalúan fórmulas pesadas"""
+    from concurrent.futures import ThreadPoolExecutor
+    from Planificador import Planificador
+    from Sesion import Sesion
+    
+    def pesada():
+        sesion = Sesion()
+        sesion.evaluar("h2(a) = a + rand()")
+        for i in range(2, 17):
+            sesion.evaluar(f"h{i + 1}(a) = h{i}(a) + h{i}(a)")
+        return sesion
+    
+    lotes = [pesada() for _ in range(3)]
+    interactiva = Sesion()
+    interactiva.evaluar("x = 2")
+    
+    def escenario(enviar):
+        pesadas = [enviar(sesion, "h17(1)") for sesion in lotes for _ in range(2)]
+        latencias = []
+        for _ in range(30):
+            inicio = time.perf_counter()
+            enviar(interactiva, "x * 21 + 1").result()
+            latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.005)
+        for futuro in pesadas:
+            futuro.result()
+        latencias.sort()
+        return latencias[len(latencias) // 2], latencias[-1]
+    
+    with ThreadPoolExecutor(1) as ejecutor:
+        fifo = escenario(lambda sesion, fuente: ejecutor.submit(sesion.evaluar, fuente))
+    with Planificador(trabajadores=1) as planificador:
+        justo = escenario(planificador.enviar)
+    
+    print("\nConsultas cortas junto a 6 fórmulas pesadas (1 trabajador)")
+    print("-" * 60)
+    for nombre, (p50, maxima) in (("Cola FIFO", fifo), ("Planificador", justo)):
+        print(f"  {nombre:<40} p50 {p50 * 1e3:9.2f} ms   máx. {maxima * 1e3:9.2f} ms")
+
+
+def main():
+    """Ejecuta todas las mediciones"""
+    print("=" * 60)
+    print("MEDICIONES DE RENDIMIENTO")
+    print("=" * 60)
+    
+    bench_enteros()
+    bench_cadenas()
+    bench_memoizacion()
+    bench_vectores()
+    bench_lote()
+    bench_entornos()
+    bench_reactivo()
+    bench_sesion()
+    bench_sesiones()
+    bench_memoria_compartida()
+    bench_fork()
+    bench_ejecutor_lotes()
+    bench_paralela()
+    bench_presupuesto()
+    bench_planificador()
+    
+    print()
+
+
+if __name__ == "__main__":
+    main()
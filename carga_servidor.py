@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cliente de carga para Servidor.py
+
+Abre varias conexiones y en cada una envía solicitudes con una ventana de
+pipelining (solicitudes enviadas sin esperar respuesta). Informa las
+solicitudes por segundo y la latencia de cada solicitud (desde que se
+envía hasta que llega su respuesta):
+
+    python Servidor.py --puerto 7878 &
+    python carga_servidor.py --puerto 7878 --conexiones 32 --solicitudes 2000
+
+Sin --puerto ni --unix, inicia un servidor en este mismo proceso.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from Planificador import percentil
+from Servidor import Servidor
+
+
+# Código que se evalúa por defecto (las líneas se alternan)
+CODIGO_POR_DEFECTO = ["x = 3;", "sqrt(x * x + 16) * pow(x, 2) % 7"]
+
+
+async def ejecutar_carga(host="127.0.0.1", puerto=7878, ruta_unix=None, conexiones=16,
+                         solicitudes=1000, ventana=8, codigo=CODIGO_POR_DEFECTO):
+    """
+    Ejecuta una prueba de carga
+    
+    Args:
+        host: str - Dirección TCP del servidor
+        puerto: int - Puerto TCP
+        ruta_unix: str - Socket Unix (en lugar de TCP)
+        conexiones: int - Conexiones simultáneas
+        solicitudes: int - Solicitudes por conexión
+        ventana: int - Solicitudes sin respuesta permitidas por conexión
+        codigo: list - Líneas que se envían (en ciclo)
+    
+    Returns:
+        dict: solicitudes, errores, segundos, por_segundo, p50_ms, p99_ms
+              y max_ms
+    """
+    latencias = []
+    errores = 0
+    
+    async def cliente():
+        nonlocal errores
+        if ruta_unix:
+            lector, escritor = await asyncio.open_unix_connection(ruta_unix)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto)
+        enviadas = {}  # id -> instante de envío
+        permiso = asyncio.Semaphore(ventana)
+        
+        async def enviar():
+            for i in range(solicitudes):
+                await permiso.acquire()
+                linea = json.dumps({"id": i, "codigo": codigo[i % len(codigo)]})
+                enviadas[i] = time.perf_counter()
+                escritor.write(linea.encode("utf-8") + b"\n")
+                await escritor.drain()
+        
+        async def recibir():
+            nonlocal errores
+            for _ in range(solicitudes):
+                respuesta = json.loads(await lector.readline())
+                latencias.append(time.perf_counter() - enviadas.pop(respuesta["id"]))
+                if not respuesta["ok"]:
+                    errores += 1
+                permiso.release()
+        
+        await asyncio.gather(enviar(), recibir())
+        escritor.close()
+        await escritor.wait_closed()
+    
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    segundos = time.perf_counter() - inicio
+    
+    latencias.sort()
+    total = len(latencias)
+    return {
+        "solicitudes": total,
+        "errores": errores,
+        "segundos": segundos,
+        "por_segundo": total / segundos if segundos else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1e3,
+        "p99_ms": percentil(latencias, 99) * 1e3,
+        "max_ms": latencias[-1] * 1e3 if latencias else 0.0,
+    }
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Args:
+        argumentos: list - Argumentos (por defecto sys.argv[1:])
+    
+    Returns:
+        int: Código de salida
+    """
+    analizador = argparse.ArgumentParser(description="Prueba de carga del servidor de evaluación")
+    analizador.add_argument("--host", default="127.0.0.1", help="Dirección TCP del servidor")
+    analizador.add_argument("--puerto", type=int, help="Puerto TCP del servidor")
+    analizador.add_argument("--unix", metavar="RUTA", help="Socket Unix del servidor")
+    analizador.add_argument("--conexiones", type=int, default=16, help="Conexiones simultáneas")
+    analizador.add_argument("--solicitudes", type=int, default=1000, help="Solicitudes por conexión")
+    analizador.add_argument("--ventana", type=int, default=8, help="Solicitudes en vuelo por conexión")
+    analizador.add_argument("--codigo", action="append", help="Línea a evaluar (puede repetirse)")
+    opciones = analizador.parse_args(argumentos)
+    
+    async def ejecutar():
+        servidor = None
+        puerto = opciones.puerto
+        if puerto is None and opciones.unix is None:
+            servidor = Servidor(puerto=0)
+            _, puerto = await servidor.iniciar()
+        try:
+            return await ejecutar_carga(opciones.host, puerto, opciones.unix, opciones.conexiones,
+                                        opciones.solicitudes, opciones.ventana,
+                                        opciones.codigo or CODIGO_POR_DEFECTO)
+        finally:
+            if servidor is not None:
+                await servidor.cerrar()
+    
+    resumen = asyncio.run(ejecutar())
+    print(f"{resumen['solicitudes']} solicitudes en {resumen['segundos']:.2f} s "
+          f"({resumen['por_segundo']:.0f}/s), {resumen['errores']} con error")
+    print(f"Latencia: p50 {resumen['p50_ms']:.2f} ms, p99 {resumen['p99_ms']:.2f} ms, "
+          f"máx {resumen['max_ms']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,12 +8,19 @@ Prueba todas las funcionalidades implementadas:
 - Asignación
 - Funciones built-in
 - Manejo de errores semánticos
+- Tabla de operadores: registro de tipos propios y búsqueda por MRO
+- Literales enteros, reglas de promoción, pow() exacto y desbordamiento
+- Serialización de cuerdas profundas
 """
 
+import pickle
 import sys
 from Scanner import Scanner
 from Parser import Parser
 from Evaluador import Evaluador, ErrorSemantico
+from Operadores import TablaOperadores
+from TipoToken import TipoToken
+from Matematicas import MAX_BITS_POTENCIA
 
 def probar_expresion(expresion, descripcion):
     """Prueba una expresión y muestra el resultado"""
@@ -60,6 +67,10 @@ def main():
     probar_expresion("2 + 3 * 4", "Precedencia de operadores")
     probar_expresion("(2 + 3) * 4", "Agrupación con paréntesis")
     
+    # Pruebas de cadenas
+    probar_expresion('"Hola, " + "mundo"', "Concatenación de cadenas")
+    probar_expresion('"' + "a" * 70 + '" + "b"', "Concatenación larga (cuerda)")
+    
     # Pruebas de operación unaria
     probar_expresion("-5", "Negación unaria")
     probar_expresion("--10", "Doble negación")
@@ -129,5 +140,104 @@ def main():
     print("PRUEBAS COMPLETADAS")
     print(f"{'='*60}\n")
 
+def evaluar(evaluador, expresion):
+    """Analiza y evalúa una expresión; retorna su resultado"""
+    resultado, _ = evaluador.evaluar(Parser(Scanner(expresion).scan()).parse())
+    return resultado
+
+
+class Metros(float):
+    """Tipo numérico propio para las pruebas de la tabla de operadores"""
+
+
+def test_tabla_operadores():
+    """Registro de manejadores propios y respaldo por MRO"""
+    print("\n[TEST] Tabla de operadores")
+    tabla = TablaOperadores()
+    
+    # bool y las subclases de float usan los manejadores de int y float
+    assert tabla.binaria(TipoToken.PLUS, True, 2) == 3
+    assert tabla.binaria(TipoToken.STAR, Metros(2.5), 2) == 5.0
+    assert tabla.unaria(TipoToken.MINUS, Metros(1.5)) == -1.5
+    print("✓ bool y subclases de float resueltos por su MRO")
+    
+    # Un registro más específico tiene prioridad y se aplica aunque ya se haya usado el par
+    assert tabla.binaria(TipoToken.PLUS, Metros(1), Metros(2)) == 3.0
+    tabla.registrar_binario(TipoToken.PLUS, Metros, Metros, lambda a, b: Metros(a + b + 1000))
+    resultado = tabla.binaria(TipoToken.PLUS, Metros(1), Metros(2))
+    assert type(resultado) is Metros and resultado == 1003
+    assert tabla.binaria(TipoToken.PLUS, Metros(1), 2.0) == 3.0
+    print("✓ Manejador propio registrado")
+    
+    try:
+        tabla.binaria(TipoToken.MINUS, "a", 1)
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "'-'" in str(e) and "str y int" in str(e)
+        print(f"✓ {e}")
+    
+    # Cada evaluador tiene su propia tabla
+    evaluador = Evaluador()
+    evaluador.operadores.registrar_binario(TipoToken.STAR, str, int, lambda a, b: a * b)
+    assert evaluar(evaluador, '"ab" * 3') == "ababab"
+    try:
+        evaluar(Evaluador(), '"ab" * 3')
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico:
+        pass
+    copia = evaluador.operadores.copiar()
+    copia.registrar_binario(TipoToken.STAR, str, int, lambda a, b: b)
+    assert evaluar(evaluador, '"ab" * 2') == "abab"
+    print("✓ Tablas independientes por evaluador y copias")
+
+
+def test_enteros_y_promocion():
+    """Literales enteros exactos y promoción a float"""
+    print("\n[TEST] Enteros y promoción")
+    evaluador = Evaluador()
+    casos = [
+        ("10", 10, int),
+        ("10.0", 10.0, float),
+        ("7 % 3", 1, int),
+        ("-4 * 2", -8, int),
+        ("6 / 3", 2.0, float),      # La división siempre es real
+        ("2 * 3.0", 6.0, float),
+        ("12345678901234567890 + 1", 12345678901234567891, int),
+        ("pow(3, 40)", 3 ** 40, int),  # Exacto, sin pasar por float
+        ("pow(2, -1)", 0.5, float),
+        ("pow(2, 0.5)", 2 ** 0.5, float),
+        ("pow(-1, 10000001)", -1, int),
+    ]
+    for expresion, esperado, tipo in casos:
+        resultado = evaluar(evaluador, expresion)
+        assert resultado == esperado and type(resultado) is tipo, (expresion, resultado)
+    print(f"✓ {len(casos)} casos con el tipo esperado")
+    
+    # Límite de pow() exacto
+    assert evaluar(evaluador, f"pow(2, {MAX_BITS_POTENCIA})") == 2 ** MAX_BITS_POTENCIA
+    for expresion in (f"pow(2, {MAX_BITS_POTENCIA + 1})", f"pow(3, {MAX_BITS_POTENCIA * 2 // 3})",
+                      "pow(10, 400) * 1.5", "pow(2.0, 5000)"):
+        try:
+            evaluar(evaluador, expresion)
+            assert False, f"Se esperaba un error semántico: {expresion}"
+        except ErrorSemantico as e:
+            print(f"✓ {e}")
+
+
+def test_cuerda_profunda():
+    """Una cuerda de muchas concatenaciones se serializa como str"""
+    print("\n[TEST] Cuerda profunda con pickle")
+    evaluador = Evaluador()
+    evaluar(evaluador, 's = ""')
+    for _ in range(5000):
+        evaluar(evaluador, 's = s + "x"')
+    copia = pickle.loads(pickle.dumps(evaluador.entorno["s"], pickle.HIGHEST_PROTOCOL))
+    assert type(copia) is str and copia == "x" * 5000
+    print(f"✓ {len(copia)} caracteres")
+
+
 if __name__ == "__main__":
     main()
+    test_tabla_operadores()
+    test_enteros_y_promocion()
+    test_cuerda_profunda()
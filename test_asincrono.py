@@ -0,0 +1,137 @@
+"""
+Pruebas del evaluador asíncrono
+
+Verifica:
+- Llamadas a funciones asíncronas
+- Espera concurrente de llamadas independientes
+- rand() en ramas concurrentes sigue el orden del código
+- Funciones del usuario que llaman a funciones asíncronas
+- Rechazo de funciones asíncronas en el evaluador síncrono
+"""
+
+import asyncio
+import time
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+from EvaluadorAsincrono import EvaluadorAsincrono
+from Funciones import FuncionTipada, Firma, RegistroFunciones, NUMERO
+from Aleatorio import FlujoAleatorio
+
+
+# Demora simulada de cada consulta, en segundos
+DEMORA = 0.05
+
+
+class FuncionConsulta(FuncionTipada):
+    """Función consulta(clave) - simula una búsqueda lenta de E/S"""
+    
+    firma = Firma(NUMERO)
+    
+    def __init__(self):
+        super().__init__("consulta")
+    
+    async def calcular(self, clave):
+        await asyncio.sleep(DEMORA)
+        return clave * 10
+
+
+class FuncionDemora(FuncionTipada):
+    """Función demora(n) - espera n veces DEMORA y retorna n * 10"""
+    
+    firma = Firma(NUMERO)
+    
+    def __init__(self):
+        super().__init__("demora")
+    
+    async def calcular(self, n):
+        await asyncio.sleep(DEMORA * n)
+        return n * 10
+
+
+def crear_registro():
+    """Registro con sqrt(), rand(), consulta() y demora()"""
+    registro = RegistroFunciones()
+    registro.registrar("sqrt", "Matematicas:FuncionSqrt")
+    registro.registrar("rand", "Matematicas:FuncionRand")
+    registro.registrar("consulta", FuncionConsulta)
+    registro.registrar("demora", FuncionDemora)
+    return registro
+
+
+def analizar(expresion):
+    """Analiza una expresión y retorna su ASA"""
+    return Parser(Scanner(expresion).scan()).parse()
+
+
+def test_llamadas_concurrentes():
+    """Las llamadas independientes se esperan al mismo tiempo"""
+    print("\n[TEST] Llamadas asíncronas concurrentes")
+    evaluador = EvaluadorAsincrono(registro=crear_registro())
+    ast = evaluador.compilar(analizar("consulta(1) + consulta(2) + sqrt(consulta(3) - 5)"))
+    
+    inicio = time.perf_counter()
+    resultado, _ = evaluador.evaluar_lote([ast])[0]
+    duracion = time.perf_counter() - inicio
+    
+    assert resultado == 35.0
+    assert duracion < 2.5 * DEMORA, f"Se esperaba concurrencia, tomó {duracion:.3f}s"
+    print(f"✓ Resultado {resultado} en {duracion * 1000:.0f} ms")
+
+
+def test_lote_con_asignaciones():
+    """Un lote de sentencias comparte entorno y ciclo de eventos"""
+    print("\n[TEST] Lote de sentencias")
+    evaluador = EvaluadorAsincrono(registro=crear_registro())
+    fuentes = ["a = consulta(2);", "b = a + consulta(a)", "b * 2"]
+    resultados = evaluador.evaluar_lote([evaluador.compilar(analizar(f)) for f in fuentes])
+    
+    assert [valor for valor, _ in resultados] == [20, 220, 440]
+    print(f"✓ Resultados: {[valor for valor, _ in resultados]}")
+
+
+def test_rand_en_orden():
+    """Los valores de rand() no dependen de qué espera termina primero"""
+    print("\n[TEST] rand() en ramas concurrentes")
+    evaluador = EvaluadorAsincrono(registro=crear_registro(), semilla=5)
+    ast = evaluador.compilar(analizar("(demora(2) + rand() * 10) - (demora(1) + rand())"))
+    resultado, _ = evaluador.evaluar_lote([ast])[0]
+    
+    flujo = FlujoAleatorio(5)
+    primero, segundo = flujo.siguiente(), flujo.siguiente()
+    assert resultado == (20 + primero * 10) - (10 + segundo)
+    print(f"✓ Mismo resultado que la evaluación secuencial: {resultado}")
+
+
+def test_funcion_usuario_asincrona():
+    """Una función del usuario no puede llamar a funciones asíncronas"""
+    print("\n[TEST] Función del usuario con llamada asíncrona")
+    evaluador = EvaluadorAsincrono(registro=crear_registro())
+    try:
+        evaluador.evaluar_lote([evaluador.compilar(analizar("f(x) = consulta(x) + 1"))])
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "asíncronas" in str(e)
+        print(f"✓ {e}")
+    assert "f" not in evaluador.funciones
+
+
+def test_evaluador_sincrono_rechaza():
+    """El evaluador síncrono informa que la función es asíncrona"""
+    print("\n[TEST] Función asíncrona en evaluador síncrono")
+    evaluador = Evaluador(registro=crear_registro())
+    try:
+        evaluador.compilar(analizar("consulta(1)"))
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "asíncrona" in str(e)
+        print(f"✓ {e}")
+
+
+if __name__ == "__main__":
+    test_llamadas_concurrentes()
+    test_lote_con_asignaciones()
+    test_rand_en_orden()
+    test_funcion_usuario_asincrona()
+    test_evaluador_sincrono_rechaza()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
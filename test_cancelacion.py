@@ -0,0 +1,196 @@
+"""
+Pruebas de la cancelación de evaluaciones y del segundo plano del REPL
+
+Verifica:
+- Presupuesto.cancelar() desde otro hilo deshace las asignaciones
+- Planificador.cancelar() de tareas en curso y pendientes
+- Sesion.bifurcar() copia variables y funciones
+- Trabajos en segundo plano del REPL ("&")
+"""
+
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from Errores import ErrorCancelado, ErrorPresupuesto
+from Evaluador import Evaluador
+from Interprete import Interprete
+from Planificador import Planificador
+from Presupuesto import Presupuesto
+from Sesion import Sesion
+
+
+def _pesada(sesion, niveles=40):
+    """Define h2(a) = a + rand(), h3(a) = h2(a) + h2(a), ... (costo exponencial)"""
+    sesion.evaluar("h2(a) = a + rand()")
+    for i in range(2, niveles):
+        sesion.evaluar(f"h{i + 1}(a) = h{i}(a) + h{i}(a)")
+    return sesion
+
+
+def test_presupuesto_cancelable():
+    print("\n=== Prueba: Presupuesto cancelable ===")
+    presupuesto = Presupuesto(cancelable=True)
+    sesion = _pesada(Sesion(presupuesto=presupuesto))
+    sesion.evaluar("x = 1")
+    threading.Timer(0.05, presupuesto.cancelar).start()
+    try:
+        sesion.evaluar("y = (x = 5) + h40(1)")
+        assert False, "Debió cancelarse"
+    except ErrorCancelado as ex:
+        assert isinstance(ex, ErrorPresupuesto)
+        print(f"✓ {ex}")
+    assert sesion.entorno["x"] == 1 and "y" not in sesion.entorno
+    assert sesion.evaluar("x + 1") == (2, True)  # La cancelación no se arrastra
+    print("✓ Asignaciones deshechas")
+
+
+def test_planificador_cancelar():
+    print("\n=== Prueba: Cancelar tareas del planificador ===")
+    sesion = _pesada(Sesion())
+    sesion.evaluar("x = 1")
+    with Planificador(trabajadores=1) as planificador:
+        en_curso = planificador.enviar(sesion, "x = h40(1)")
+        pendiente = planificador.enviar(sesion, "x = 7")
+        time.sleep(0.05)
+        assert planificador.cancelar(pendiente) and pendiente.cancelled()
+        assert planificador.cancelar(en_curso)
+        try:
+            en_curso.result()
+            assert False, "Debió cancelarse"
+        except ErrorCancelado:
+            pass
+        terminada = planificador.enviar(sesion, "x + 1")
+        assert terminada.result() == (2, True)
+        assert not planificador.cancelar(terminada)
+    print("✓ Tarea en curso detenida y pendiente descartada")
+
+
+def test_bifurcar():
+    print("\n=== Prueba: Bifurcar una sesión ===")
+    sesion = Sesion()
+    sesion.evaluar("x = 2")
+    sesion.evaluar("f(a) = a * x")
+    copia = sesion.bifurcar()
+    assert copia.evaluar("f(3)") == (6, True)
+    copia.evaluar("x = 5")
+    copia.evaluar("g(a) = a + 1")
+    assert sesion.entorno == {"x": 2} and copia.evaluar("f(3)") == (15, True)
+    assert "g" not in sesion.evaluador.funciones
+    print("✓ Copia independiente")
+    
+    class EvaluadorPropio(Evaluador):
+        pass
+    
+    flujos = []
+    for _ in range(2):
+        sesion = Sesion(EvaluadorPropio(semilla=7))
+        copia = sesion.bifurcar()
+        assert type(copia.evaluador) is EvaluadorPropio
+        flujos.append([copia.evaluar("rand()")[0] for _ in range(3)])
+        assert flujos[-1][0] != sesion.evaluar("rand()")[0]
+    assert flujos[0] == flujos[1]
+    print("✓ Misma clase de evaluador y flujo de rand() derivado y reproducible")
+    
+    try:
+        from Vectores import habilitar_vectores
+    except ImportError:
+        return
+    sesion = Sesion()
+    habilitar_vectores(sesion.evaluador)
+    sesion.entorno["v"] = __import__("numpy").arange(3)
+    copia = sesion.bifurcar()
+    assert list(copia.evaluar("v * 2 + sin(0)")[0]) == [0, 2, 4]
+    print("✓ Operadores vectoriales copiados")
+
+
+def test_segundo_plano():
+    print("\n=== Prueba: Trabajos en segundo plano del REPL ===")
+    anterior = Interprete.sesion
+    Interprete.sesion = sesion = _pesada(Sesion(salida=io.StringIO()), 17)
+    salida = io.StringIO()
+    try:
+        with redirect_stdout(salida):
+            Interprete.planificar()
+            Interprete.ejecutar("x = 1")
+            numero = Interprete.en_segundo_plano("total = h17(1) + x")
+            Interprete.en_segundo_plano("cuadrado(a) = a * a")
+            Interprete.en_segundo_plano("x = h17(2)")
+            Interprete.ejecutar("x = 3")  # No espera a los trabajos
+            assert sesion.entorno["x"] == 3 and "total" not in sesion.entorno
+            while Interprete.trabajos:
+                time.sleep(0.01)
+            Interprete.ejecutar("y = cuadrado(4)")
+    finally:
+        Interprete.cancelar_trabajos()
+        Interprete.planificador.cerrar()
+        Interprete.planificador = None
+        Interprete.sesion = anterior
+    texto = salida.getvalue()
+    print(texto)
+    assert f"[{numero}] Terminado" in texto
+    assert "no se sobrescriben): x" in texto
+    assert sesion.entorno["x"] == 3 and sesion.entorno["y"] == 16
+    assert sesion.entorno["total"] > 1
+    print("✓ Resultados informados y cambios aplicados sin pisar la sesión")
+
+
+def _con_repl(sesion, funcion):
+    """Ejecuta una función con el planificador del REPL sobre una sesión; retorna lo impreso"""
+    anterior = Interprete.sesion
+    Interprete.sesion = sesion
+    salida = io.StringIO()
+    try:
+        with redirect_stdout(salida):
+            Interprete.planificar()
+            funcion()
+    finally:
+        Interprete.cancelar_trabajos()
+        Interprete.planificador.cerrar()
+        Interprete.planificador = None
+        Interprete.sesion = anterior
+    return salida.getvalue()
+
+
+def test_funciones_modificadas():
+    print("\n=== Prueba: Funciones redefinidas mientras corre un trabajo ===")
+    sesion = _pesada(Sesion(salida=io.StringIO()), 17)
+    
+    def trabajar():
+        Interprete.en_segundo_plano("t = h17(1)")
+        Interprete.en_segundo_plano("f(a) = a + 100")
+        Interprete.ejecutar("f(a) = a * 3")  # Prioritaria: corre antes que el segundo trabajo
+        while Interprete.trabajos:
+            time.sleep(0.01)
+    
+    texto = _con_repl(sesion, trabajar)
+    assert "no se sobrescriben): f()" in texto, texto
+    assert sesion.evaluar("f(2)") == (6, True)
+    print("✓ Se conserva la definición de la sesión")
+
+
+def test_salir_con_trabajos():
+    print("\n=== Prueba: Salir con trabajos en cola ===")
+    sesion = _pesada(Sesion(salida=io.StringIO()), 24)
+    
+    def encolar():
+        for i in range(3):
+            Interprete.en_segundo_plano(f"t{i} = h24(1)")
+    
+    salida = []
+    hilo = threading.Thread(target=lambda: salida.append(_con_repl(sesion, encolar)), daemon=True)
+    hilo.start()
+    hilo.join(10)
+    assert not hilo.is_alive(), "El cierre quedó bloqueado"
+    assert not any(f"t{i}" in sesion.entorno for i in range(3))
+    print("✓ Los trabajos se cancelan sin bloquear el cierre")
+
+
+if __name__ == "__main__":
+    test_presupuesto_cancelable()
+    test_planificador_cancelar()
+    test_bifurcar()
+    test_segundo_plano()
+    test_funciones_modificadas()
+    test_salir_con_trabajos()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,75 @@
+"""
+Pruebas del ejecutor de scripts por lotes
+
+Verifica:
+- Búsqueda de scripts en directorios
+- Un registro JSON por script, con salida, errores y tiempo
+- Un script lento no detiene a los demás (requiere os.fork)
+"""
+
+import json
+import os
+import tempfile
+import EjecutorLotes
+
+
+def _escribir(directorio, nombre, contenido):
+    ruta = os.path.join(directorio, nombre)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+    return ruta
+
+
+def _leer(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return {r["script"]: r for r in map(json.loads, archivo)}
+
+
+def test_lote():
+    print("\n=== Prueba: Lote de scripts ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        scripts = os.path.join(directorio, "scripts")
+        os.makedirs(os.path.join(scripts, "sub"))
+        bien = _escribir(scripts, "a.txt", "x = 6;\nx * 7\n")
+        mal = _escribir(scripts, "b.txt", "x\n")  # El entorno empieza vacío
+        anidado = _escribir(os.path.join(scripts, "sub"), "c.txt", 'texto = "hola"\n')
+        _escribir(scripts, "notas.md", "no es un script")
+        
+        encontrados = EjecutorLotes.buscar_scripts([scripts], "*.txt")
+        assert encontrados == [bien, mal, anidado]
+        print(f"✓ {len(encontrados)} scripts encontrados")
+        
+        destino = os.path.join(directorio, "resultados.jsonl")
+        resumen = EjecutorLotes.ejecutar_lote(encontrados, destino, procesos=2)
+        assert resumen["scripts"] == 3 and resumen["con_errores"] == 1
+        
+        registros = _leer(destino)
+        assert registros[bien]["ok"] and registros[bien]["salida"] == "42\n"
+        assert not registros[mal]["ok"] and "'x'" in registros[mal]["error"]
+        assert registros[anidado]["salida"] == "hola\n"
+        assert all(r["segundos"] >= 0 for r in registros.values())
+        print("✓ Un registro por script")
+
+
+def test_script_lento():
+    print("\n=== Prueba: Script lento con tiempo límite ===")
+    if not hasattr(os, "fork"):
+        print("(os.fork no disponible: prueba omitida)")
+        return
+    with tempfile.TemporaryDirectory() as directorio:
+        lento = _escribir(directorio, "lento.txt", "".join(f"pow(3, {600000 + i}) % 7\n" for i in range(1000)))
+        rapidos = [_escribir(directorio, f"r{i}.txt", f"{i} + 1\n") for i in range(20)]
+        destino = os.path.join(directorio, "resultados.jsonl")
+        
+        assert EjecutorLotes.main([directorio, "-o", destino, "--procesos", "2",
+                                   "--tiempo-limite", "0.5"]) == 1
+        registros = _leer(destino)
+        assert "Tiempo límite" in registros[lento]["error"]
+        assert [registros[r]["salida"] for r in rapidos] == [f"{i + 1}\n" for i in range(20)]
+        print(f"✓ {registros[lento]['error']}")
+
+
+if __name__ == "__main__":
+    test_lote()
+    test_script_lento()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,208 @@
+"""
+Pruebas del entorno persistente
+
+Verifica:
+- Comportamiento de diccionario (asignar, leer, eliminar, recorrer)
+- Instantáneas y restauración tras un error
+- Bifurcaciones independientes
+- Claves con el mismo hash
+- Entorno respaldado en disco
+- Entorno en disco usado desde varios hilos
+- Variables que no pueden pasar al disco y tamaño de las cuerdas
+"""
+
+import pickle
+import threading
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+from Entorno import EntornoPersistente
+from EntornoDisco import EntornoDisco, estimar_tamano
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+class Clave:
+    """Clave con hash fijo para forzar colisiones"""
+    
+    def __init__(self, nombre):
+        self.nombre = nombre
+    
+    def __hash__(self):
+        return 42
+    
+    def __eq__(self, otra):
+        return isinstance(otra, Clave) and otra.nombre == self.nombre
+
+
+def test_diccionario():
+    """El entorno se comporta como un dict"""
+    print("\n[TEST] Operaciones de diccionario")
+    entorno = EntornoPersistente()
+    esperado = {}
+    for i in range(5000):
+        entorno[f"v{i}"] = i
+        esperado[f"v{i}"] = i
+    for i in range(0, 5000, 3):
+        del entorno[f"v{i}"]
+        del esperado[f"v{i}"]
+    
+    assert len(entorno) == len(esperado)
+    assert dict(entorno.items()) == esperado
+    assert "v3" not in entorno and entorno["v4"] == 4
+    
+    colisiones = EntornoPersistente({Clave("a"): 1, Clave("b"): 2})
+    del colisiones[Clave("a")]
+    assert colisiones[Clave("b")] == 2 and len(colisiones) == 1
+    
+    assert pickle.loads(pickle.dumps(entorno)) == entorno
+    print(f"✓ {len(entorno)} variables")
+
+
+def test_instantaneas():
+    """Una instantánea permite deshacer las asignaciones de una sentencia"""
+    print("\n[TEST] Instantáneas")
+    entorno = EntornoPersistente({"a": 1})
+    evaluador = Evaluador(entorno=entorno)
+    
+    antes = entorno.instantanea()
+    try:
+        evaluar(evaluador, "b = (a = 10) / 0")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico:
+        assert entorno["a"] == 10
+        entorno.restaurar(antes)
+    
+    assert dict(entorno.items()) == {"a": 1}
+    assert dict(antes.items()) == {"a": 1}
+    print("✓ Asignaciones deshechas")
+
+
+def test_bifurcaciones():
+    """Las bifurcaciones no se afectan entre sí"""
+    print("\n[TEST] Bifurcaciones")
+    base = EntornoPersistente({f"v{i}": i for i in range(1000)})
+    ramas = [base.bifurcar() for _ in range(100)]
+    for i, rama in enumerate(ramas):
+        rama["v0"] = -i
+        evaluar(Evaluador(entorno=rama), "x = v0 * 2")
+    
+    assert base["v0"] == 0 and "x" not in base
+    assert [rama["x"] for rama in ramas[:3]] == [0, -2, -4]
+    print("✓ 100 ramas independientes")
+
+
+def test_entorno_disco():
+    """Las variables frías pasan al disco y vuelven al leerlas"""
+    print("\n[TEST] Entorno en disco")
+    entorno = EntornoDisco(max_variables=10)
+    evaluador = Evaluador(entorno=entorno)
+    try:
+        for i in range(100):
+            evaluar(evaluador, f'v{i} = "{"x" * i}"')
+        assert len(entorno) == 100
+        assert entorno.estadisticas()["variables_en_memoria"] == 10
+        assert entorno.estadisticas()["variables_en_disco"] == 90
+        
+        assert evaluar(evaluador, "v3 + v4") == "x" * 7
+        assert entorno.fallos == 2
+        
+        del entorno["v5"]
+        assert "v5" not in entorno and len(entorno) == 99
+        
+        # El límite de bytes también desaloja
+        entorno.max_bytes = 1
+        entorno.ajustar()
+        assert entorno.estadisticas()["variables_en_memoria"] == 1
+        assert sorted(entorno) == sorted(f"v{i}" for i in range(100) if i != 5)
+        print(f"✓ {entorno.estadisticas()}")
+    finally:
+        entorno.cerrar()
+
+
+def test_entorno_disco_hilos():
+    """Los contadores y la LRU se mantienen coherentes con varios hilos"""
+    print("\n[TEST] Entorno en disco con varios hilos")
+    entorno = EntornoDisco(max_variables=8)
+    errores = []
+    lecturas = [0] * 4
+    
+    def trabajar(hilo):
+        try:
+            for i in range(2000):
+                nombre = f"v{(i * 7 + hilo) % 40}"
+                if i % 5 == 0:
+                    entorno[nombre] = i
+                elif nombre in entorno:
+                    entorno[nombre]
+                    lecturas[hilo] += 1
+                else:
+                    entorno[nombre] = -1
+        except Exception as e:
+            errores.append(e)
+    
+    try:
+        hilos = [threading.Thread(target=trabajar, args=(h,)) for h in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        assert not errores, errores
+        estadisticas = entorno.estadisticas()
+        assert estadisticas["variables"] == 40
+        assert estadisticas["variables_en_memoria"] <= 8
+        assert estadisticas["bytes_en_memoria"] == sum(entrada[1] for entrada in entorno._memoria.values())
+        assert estadisticas["aciertos"] + estadisticas["fallos"] == sum(lecturas)
+        print(f"✓ {sum(lecturas)} lecturas, {estadisticas['desalojos']} desalojos")
+    finally:
+        entorno.cerrar()
+
+
+def test_entorno_disco_no_serializable():
+    """Una variable que no puede escribirse en el disco se conserva en memoria"""
+    print("\n[TEST] Variable no serializable en el entorno en disco")
+    entorno = EntornoDisco(max_variables=2)
+    evaluador = Evaluador(entorno=entorno)
+    try:
+        entorno["candado"] = threading.Lock()
+        evaluar(evaluador, "a = 1")
+        try:
+            evaluar(evaluador, "b = 2")
+            assert False, "Se esperaba un error semántico"
+        except ErrorSemantico as e:
+            assert "'candado'" in str(e)
+            print(f"✓ {e}")
+        # 'a' se desaloja igual y 'b' quedó asignada
+        assert "candado" in entorno._memoria and "a" not in entorno._memoria
+        assert entorno.desalojos == 1 and entorno["b"] == 2
+        evaluar(evaluador, "c = 3")
+        assert evaluar(evaluador, "a + b + c") == 6 and "candado" in entorno
+        print("✓ La variable sigue en memoria y las demás se desalojan")
+    finally:
+        entorno.cerrar()
+    
+    evaluador = Evaluador()
+    evaluar(evaluador, 's = ""')
+    for _ in range(1000):
+        evaluar(evaluador, 's = s + "x"')
+    cuerda = evaluador.entorno["s"]
+    assert estimar_tamano(cuerda) > 20 * len(cuerda)
+    cuerda.aplanar()
+    assert estimar_tamano(cuerda) < 2 * len(cuerda)
+    print("✓ Los nodos de las cuerdas cuentan en el tamaño estimado")
+
+
+if __name__ == "__main__":
+    test_diccionario()
+    test_instantaneas()
+    test_bifurcaciones()
+    test_entorno_disco()
+    test_entorno_disco_hilos()
+    test_entorno_disco_no_serializable()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
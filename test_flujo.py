@@ -0,0 +1,125 @@
+"""
+Pruebas de la evaluación por flujo sobre archivos
+
+Verifica:
+- CSV leído por bloques, con errores por fila en la salida
+- Columnas .npy en mapas de memoria con salida .npy (si hay NumPy)
+- La salida .npy se amplía si un bloque posterior produce NaN
+- rand() da un valor por elemento, igual que por filas
+- Propagación de errores del hilo lector
+"""
+
+import csv
+import os
+import tempfile
+import EvaluacionFlujo
+import Vectores
+
+
+def test_csv():
+    """Cada fila del CSV produce una fila de salida, en orden"""
+    print("\n[TEST] Flujo CSV")
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, "datos.csv")
+        salida = os.path.join(directorio, "salida.csv")
+        with open(entrada, "w", newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["x", "y"])
+            for i in range(10):
+                escritor.writerow([i, i % 3])
+        
+        resumen = EvaluacionFlujo.evaluar_csv("x / y", entrada, salida, tam_bloque=4)
+        assert resumen == {"filas": 10, "errores": 4}
+        
+        with open(salida, newline="") as archivo:
+            filas = list(csv.reader(archivo))
+        assert filas[0] == ["resultado", "error"]
+        assert filas[1] == ["", "División por cero"]
+        assert filas[3] == ["1.0", ""]
+        assert len(filas) == 11
+    print(f"✓ {resumen}")
+
+
+def test_npy():
+    """Las columnas .npy se evalúan por bloques como arreglos"""
+    print("\n[TEST] Flujo .npy")
+    if not Vectores.DISPONIBLE:
+        print("NumPy no está instalado, se omite")
+        return
+    numpy = Vectores.numpy
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_x = os.path.join(directorio, "x.npy")
+        salida = os.path.join(directorio, "salida.npy")
+        numpy.save(ruta_x, numpy.arange(1000, dtype=float))
+        
+        resumen = EvaluacionFlujo.evaluar_npy("x * 2 + 1", {"x": ruta_x}, salida, tam_bloque=64)
+        assert resumen["filas"] == 1000
+        assert numpy.array_equal(numpy.load(salida), numpy.arange(1000) * 2.0 + 1)
+    print("✓ Salida .npy completa")
+
+
+def test_npy_tipos_y_rand():
+    """Un NaN en un bloque posterior no se convierte a entero; rand() es por elemento"""
+    print("\n[TEST] Tipo de salida y rand() con .npy")
+    if not Vectores.DISPONIBLE:
+        print("NumPy no está instalado, se omite")
+        return
+    numpy = Vectores.numpy
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_x = os.path.join(directorio, "x.npy")
+        ruta_y = os.path.join(directorio, "y.npy")
+        salida = os.path.join(directorio, "salida.npy")
+        numpy.save(ruta_x, numpy.arange(200, dtype=numpy.int64))
+        divisores = numpy.full(200, 7, dtype=numpy.int64)
+        divisores[150] = 0  # Solo en el tercer bloque
+        numpy.save(ruta_y, divisores)
+        
+        resumen = EvaluacionFlujo.evaluar_npy("x % y", {"x": ruta_x, "y": ruta_y}, salida, tam_bloque=64)
+        resultado = numpy.load(salida)
+        assert resultado.dtype.kind == "f", resultado.dtype
+        assert numpy.isnan(resultado[150]) and resultado[149] == 149 % 7
+        assert resumen == {"filas": 200, "errores": 1}
+        print(f"✓ Salida ampliada a {resultado.dtype}: {resumen}")
+        
+        entrada = os.path.join(directorio, "x.csv")
+        salida_csv = os.path.join(directorio, "salida.csv")
+        with open(entrada, "w", newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["x"])
+            escritor.writerows([i] for i in range(200))
+        EvaluacionFlujo.evaluar_csv("x + rand()", entrada, salida_csv, tam_bloque=64, semilla=3)
+        EvaluacionFlujo.evaluar_npy("x + rand()", {"x": ruta_x}, salida, tam_bloque=64, semilla=3)
+        with open(salida_csv, newline="") as archivo:
+            por_filas = [float(fila[0]) for fila in list(csv.reader(archivo))[1:]]
+        por_bloques = numpy.load(salida)
+        assert len(set(numpy.round(por_bloques - numpy.arange(200), 12))) == 200
+        assert numpy.allclose(por_bloques, por_filas)
+    print("✓ rand() por elemento, igual que la evaluación por filas")
+
+
+def test_error_lector():
+    """Un error al leer se relanza en el hilo que evalúa"""
+    print("\n[TEST] Error en el hilo lector")
+    
+    def bloques():
+        yield 1
+        raise ValueError("archivo dañado")
+    
+    leidos = []
+    try:
+        for bloque in EvaluacionFlujo.leer_en_segundo_plano(bloques()):
+            leidos.append(bloque)
+        assert False, "Se esperaba un error"
+    except ValueError as e:
+        assert leidos == [1]
+        print(f"✓ {e}")
+
+
+if __name__ == "__main__":
+    test_csv()
+    test_npy()
+    test_npy_tipos_y_rand()
+    test_error_lector()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
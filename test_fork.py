@@ -0,0 +1,61 @@
+"""
+Pruebas de los procesos de trabajo creados con fork
+
+Verifica:
+- Un trabajo en un proceso creado en el momento
+- Grupo de procesos: resultados en orden y entorno nuevo por trabajo
+- Tiempo límite y reemplazo de procesos
+- Dejar de iterar repartir() no deja resultados viejos en los procesos
+
+Si el sistema no tiene os.fork, las pruebas se omiten.
+"""
+
+import os
+import ServidorFork
+
+
+def test_ejecutar_en_fork():
+    print("\n=== Prueba: Trabajo en un proceso nuevo ===")
+    if not hasattr(os, "fork"):
+        print("(os.fork no disponible: prueba omitida)")
+        return
+    resultado = ServidorFork.ejecutar_en_fork("x = 2\nx * 21\ny")
+    assert resultado["salida"].startswith("2\n42\n")
+    assert resultado["errores"] and "'y'" in resultado["error"]
+    print(f"✓ {resultado['segundos'] * 1e3:.2f} ms")
+
+
+def test_grupo():
+    print("\n=== Prueba: Grupo de procesos ===")
+    if not hasattr(os, "fork"):
+        print("(os.fork no disponible: prueba omitida)")
+        return
+    with ServidorFork.GrupoFork(procesos=2) as grupo:
+        codigos = [f"x = {i};\nx * x" for i in range(10)] + ["x"]
+        resultados = grupo.mapear(codigos)
+        assert [r["salida"] for r in resultados[:10]] == [f"{i * i}\n" for i in range(10)]
+        assert resultados[10]["errores"]  # Cada trabajo empieza con el entorno vacío
+        print("✓ Resultados en orden, entorno nuevo por trabajo")
+        
+        # Un trabajo que no termina no detiene a los demás
+        lento = "".join(f"pow(3, {600000 + i}) % 7\n" for i in range(1000))
+        resultados = grupo.mapear([lento, "1 + 1", "2 + 2"], tiempo_limite=0.5)
+        assert "Tiempo límite" in resultados[0]["error"]
+        assert [r["salida"] for r in resultados[1:]] == ["2\n", "4\n"]
+        assert grupo.ejecutar("3 * 3")["salida"] == "9\n"
+        print(f"✓ {resultados[0]['error']}")
+        
+        # Los trabajos en curso al cerrar el iterador no contaminan la siguiente llamada
+        lento = "".join(f"pow(3, {200000 + i}) % 7\n" for i in range(20))
+        iterador = grupo.repartir([lento, "1 + 1"])
+        indice, resultado = next(iterador)
+        assert indice == 1 and resultado["salida"] == "2\n"
+        iterador.close()
+        assert [r["salida"] for r in grupo.mapear(["5 + 5", "6 + 6"])] == ["10\n", "12\n"]
+        print("✓ Procesos ocupados reemplazados al cerrar el iterador")
+
+
+if __name__ == "__main__":
+    test_ejecutar_en_fork()
+    test_grupo()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,272 @@
+"""
+Pruebas del registro de funciones y de la memoización
+
+Verifica:
+- Carga perezosa de las funciones del registro
+- pop()/popitem() de funciones del registro aún no cargadas
+- Invalidación de los sitios de llamada al cambiar la tabla de funciones
+- Funciones definidas con firma tipada
+- Registro de funciones propias (plugins)
+- Memoización de funciones puras
+- Flujos aleatorios reproducibles de rand()
+- Funciones definidas por el usuario
+"""
+
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+from Funciones import FuncionTipada, Firma, RegistroFunciones, NUMERO, CADENA
+from Aleatorio import FlujoAleatorio
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+class FuncionRepetir(FuncionTipada):
+    """Función repetir(texto, veces) - función de ejemplo con firma tipada"""
+    
+    firma = Firma(CADENA, NUMERO, pura=True, costo=5)
+    
+    def __init__(self):
+        super().__init__("repetir")
+        self.llamadas = 0
+    
+    def calcular(self, texto, veces):
+        self.llamadas += 1
+        return texto * int(veces)
+
+
+def test_carga_perezosa():
+    """Las funciones del registro se cargan solo al usarse"""
+    print("\n[TEST] Carga perezosa del registro")
+    registro = RegistroFunciones()
+    registro.registrar("seno", "Matematicas:FuncionSin")
+    evaluador = Evaluador(registro=registro)
+    
+    assert "seno" in evaluador.funciones
+    assert "seno" not in dict.keys(evaluador.funciones)
+    assert evaluador.funciones.nombres() == ["seno"]
+    assert evaluador.funciones.version == 0
+    
+    assert evaluar(evaluador, "seno(0)") == 0.0
+    assert "seno" in dict.keys(evaluador.funciones)
+    assert evaluador.funciones.version == 0
+    print("✓ 'seno' cargada al primer uso")
+
+
+def test_pop_perezoso():
+    """pop() y popitem() cargan la función y la eliminan como del"""
+    print("\n[TEST] pop() de funciones no cargadas")
+    registro = RegistroFunciones()
+    registro.registrar("seno", "Matematicas:FuncionSin")
+    registro.registrar("coseno", "Matematicas:FuncionCos")
+    funciones = Evaluador(registro=registro).funciones
+    
+    assert funciones.pop("seno").nombre == "sin"
+    assert "seno" not in funciones and funciones.get("seno") is None
+    assert funciones.pop("seno", None) is None
+    assert funciones.version == 1
+    try:
+        funciones.pop("seno")
+        assert False, "Se esperaba KeyError"
+    except KeyError:
+        pass
+    
+    nombre, funcion = funciones.popitem()
+    assert nombre == "coseno" and funcion.nombre == "cos"
+    assert funciones.nombres() == []
+    try:
+        funciones.popitem()
+        assert False, "Se esperaba KeyError"
+    except KeyError:
+        pass
+    
+    assert funciones.setdefault("seno", funcion) is funcion
+    assert funciones.nombres() == ["seno"]
+    print("✓ Las funciones quitadas no vuelven a cargarse del registro")
+
+
+def test_sitios_de_llamada():
+    """Un ASA ya resuelto sigue la tabla de funciones cuando cambia su versión"""
+    print("\n[TEST] Invalidación de sitios de llamada")
+    evaluador = Evaluador()
+    funciones = evaluador.funciones
+    evaluar(evaluador, "f(a) = a * 10")
+    ast = evaluador.compilar(Parser(Scanner("sqrt(16) + f(2)").scan()).parse())
+    assert evaluador.evaluar(ast)[0] == 24.0
+    version = funciones.version
+    assert evaluador.evaluar(ast)[0] == 24.0 and funciones.version == version
+    
+    # Redefinir una función del usuario o reemplazar una nativa
+    evaluar(evaluador, "f(a) = a + 1")
+    assert funciones.version > version
+    assert evaluador.evaluar(ast)[0] == 7.0
+    funciones["sqrt"] = FuncionRepetir()
+    try:
+        evaluador.evaluar(ast)
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "espera 2 argumento(s)" in str(e)
+    print("✓ Redefiniciones aplicadas al mismo ASA")
+    
+    # Eliminar y volver a agregar
+    del funciones["sqrt"]
+    try:
+        evaluador.evaluar(ast)
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "no definida" in str(e)
+    funciones["sqrt"] = funciones.registro.obtener("sqrt")
+    assert evaluador.evaluar(ast)[0] == 7.0
+    print("✓ Funciones eliminadas y restauradas")
+
+
+def test_firma_tipada():
+    """La validación se genera a partir de la firma"""
+    print("\n[TEST] Firma tipada")
+    registro = RegistroFunciones()
+    registro.registrar("repetir", FuncionRepetir)
+    evaluador = Evaluador(registro=registro)
+    
+    assert evaluar(evaluador, 'repetir("ab", 3)') == "ababab"
+    
+    try:
+        evaluar(evaluador, "repetir(1, 3)")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert str(e) == "repetir() requiere argumentos de texto, el primer argumento es: int"
+        print(f"✓ {e}")
+    
+    try:
+        evaluar(evaluador, 'repetir("a")')
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "espera 2 argumento(s)" in str(e)
+        print(f"✓ {e}")
+
+
+def test_memoizacion():
+    """Las funciones puras costosas se memorizan; rand() nunca"""
+    print("\n[TEST] Memoización de funciones puras")
+    registro = RegistroFunciones()
+    registro.registrar("repetir", FuncionRepetir)
+    registro.registrar("rand", "Matematicas:FuncionRand")
+    evaluador = Evaluador(registro=registro)
+    
+    for _ in range(3):
+        evaluar(evaluador, 'repetir("x", 2)')
+    evaluar(evaluador, 'repetir("x", 2.0)')
+    
+    funcion = evaluador.funciones["repetir"]
+    estadisticas = evaluador.cache_funciones.estadisticas()
+    assert funcion.llamadas == 2
+    assert estadisticas["repetir"] == {"aciertos": 2, "fallos": 2, "desalojos": 0}
+    
+    assert evaluar(evaluador, "rand()") != evaluar(evaluador, "rand()")
+    assert "rand" not in evaluador.cache_funciones.estadisticas()
+    print(f"✓ Estadísticas: {estadisticas}")
+
+
+def test_memoizacion_nativas():
+    """sin/cos/sqrt/pow se memorizan por defecto y costo_minimo se aplica a sitios ya resueltos"""
+    print("\n[TEST] Memoización de funciones matemáticas")
+    evaluador = Evaluador()
+    cache = evaluador.cache_funciones
+    ast = evaluador.compilar(Parser(Scanner("sin(x) + cos(x) + sqrt(x) + pow(x, 2)").scan()).parse())
+    evaluador.entorno["x"] = 0.5
+    for _ in range(3):
+        evaluador.evaluar(ast)
+    estadisticas = cache.estadisticas()
+    assert sorted(estadisticas) == ["cos", "pow", "sin", "sqrt"]
+    assert all(e["aciertos"] == 2 and e["fallos"] == 1 for e in estadisticas.values())
+    print("✓ Memorizadas por defecto")
+    
+    cache.costo_minimo = 3
+    evaluador.evaluar(ast)
+    assert cache.estadisticas()["sin"]["aciertos"] == 2
+    cache.costo_minimo = 2
+    evaluador.evaluar(ast)
+    assert cache.estadisticas()["sin"]["aciertos"] == 3
+    print("✓ Cambiar costo_minimo afecta a los sitios ya resueltos")
+
+
+def test_desalojo():
+    """La caché respeta su capacidad global"""
+    print("\n[TEST] Desalojo LRU")
+    registro = RegistroFunciones()
+    registro.registrar("repetir", FuncionRepetir)
+    evaluador = Evaluador(registro=registro)
+    evaluador.cache_funciones.capacidad = 2
+    
+    for veces in (1, 2, 3, 1):
+        evaluar(evaluador, f'repetir("x", {veces})')
+    
+    assert len(evaluador.cache_funciones) == 2
+    assert evaluador.cache_funciones.estadisticas()["repetir"]["desalojos"] == 2
+    print("✓ Capacidad respetada")
+
+
+def test_rand_reproducible():
+    """rand() repite la secuencia con la misma semilla"""
+    print("\n[TEST] Flujos aleatorios")
+    primero = Evaluador(semilla=42)
+    segundo = Evaluador(semilla=42)
+    valores = [evaluar(primero, "rand()") for _ in range(2000)]
+    assert valores == [evaluar(segundo, "rand()") for _ in range(2000)]
+    assert all(0 <= valor < 1 for valor in valores)
+    
+    # Los flujos hijos son deterministas e independientes entre sí
+    hijo = primero.aleatorio.derivar(1)
+    assert hijo.siguiente() == FlujoAleatorio(42).derivar(1).siguiente()
+    assert hijo.semilla != primero.aleatorio.derivar(2).semilla
+    print("✓ Secuencias reproducibles")
+
+
+def test_funciones_usuario():
+    """Funciones definidas en el lenguaje: pureza, memoización y recursión"""
+    print("\n[TEST] Funciones del usuario")
+    evaluador = Evaluador()
+    
+    evaluar(evaluador, "f(x, y) = x * y + 1")
+    evaluar(evaluador, "g(x) = f(x, x) + pow(x, 2)")
+    assert evaluar(evaluador, "g(3)") == 19
+    assert evaluar(evaluador, "g(3)") == 19
+    assert evaluador.funciones["g"].pura
+    assert evaluador.cache_funciones.estadisticas()["g"]["aciertos"] == 1
+    
+    # Redefinir f invalida los resultados memorizados de g
+    evaluar(evaluador, "f(x, y) = x - y")
+    assert evaluar(evaluador, "g(3)") == 9
+    
+    # Leer variables globales hace que la función no sea pura
+    evaluar(evaluador, "h(x) = x + a")
+    evaluar(evaluador, "a = 1")
+    assert evaluar(evaluador, "h(1)") == 2
+    evaluar(evaluador, "a = 2")
+    assert evaluar(evaluador, "h(1)") == 3
+    assert not evaluador.funciones["h"].pura
+    
+    try:
+        evaluar(evaluador, "r(x) = r(x + 1)")
+        evaluar(evaluador, "r(0)")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "profundidad máxima" in str(e)
+        print(f"✓ {e}")
+
+
+if __name__ == "__main__":
+    test_carga_perezosa()
+    test_pop_perezoso()
+    test_sitios_de_llamada()
+    test_firma_tipada()
+    test_memoizacion()
+    test_memoizacion_nativas()
+    test_desalojo()
+    test_rand_reproducible()
+    test_funciones_usuario()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,61 @@
+"""
+Pruebas de la evaluación por lotes
+
+Verifica:
+- Evaluación de una expresión compilada con distintas variables
+- Errores por fila sin detener el lote
+- Entrada por filas y por columnas
+- Resultados iguales en un solo proceso y con un grupo de procesos
+"""
+
+from EvaluacionLote import ExpresionCompilada, ResultadoFila
+
+
+def test_filas_y_columnas():
+    """Filas y columnas producen los mismos resultados, en orden"""
+    print("\n[TEST] Filas y columnas")
+    expresion = ExpresionCompilada("sqrt(x * x + y * y)")
+    assert expresion.evaluar({"x": 3, "y": 4}) == 5.0
+    
+    filas = [{"x": 3, "y": 4}, {"x": 6, "y": 8}, {"x": 0, "y": 1}]
+    columnas = {"x": [3, 6, 0], "y": [4, 8, 1]}
+    esperado = [ResultadoFila(5.0), ResultadoFila(10.0), ResultadoFila(1.0)]
+    assert expresion.evaluar_lote(filas, tam_bloque=2) == esperado
+    assert expresion.evaluar_lote(iter(filas)) == esperado
+    assert expresion.evaluar_lote(columnas, tam_bloque=2) == esperado
+    print("✓ Resultados en orden")
+
+
+def test_errores_por_fila():
+    """Un error semántico solo afecta a su fila"""
+    print("\n[TEST] Errores por fila")
+    expresion = ExpresionCompilada("y = 10 / x")
+    resultados = expresion.evaluar_lote({"x": [2, 0, 5]})
+    assert [r.ok for r in resultados] == [True, False, True]
+    assert resultados[1].error == "División por cero"
+    assert resultados[2].valor == 2.0
+    
+    # Las asignaciones de una fila no llegan a la siguiente
+    expresion = ExpresionCompilada("y")
+    resultados = expresion.evaluar_lote([{"y": 1}, {}])
+    assert resultados[1].error == "Variable no definida: 'y'"
+    print(f"✓ {resultados}")
+
+
+def test_procesos():
+    """Con procesos el resultado (incluido rand()) es el mismo"""
+    print("\n[TEST] Grupo de procesos")
+    expresion = ExpresionCompilada("x * 2 + rand()", semilla=7)
+    datos = {"x": list(range(100))}
+    serie = expresion.evaluar_lote(datos, tam_bloque=16)
+    paralelo = expresion.evaluar_lote(datos, tam_bloque=16, procesos=2)
+    assert serie == paralelo
+    assert len(paralelo) == 100
+    print("✓ Resultados reproducibles")
+
+
+if __name__ == "__main__":
+    test_filas_y_columnas()
+    test_errores_por_fila()
+    test_procesos()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
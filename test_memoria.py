@@ -0,0 +1,94 @@
+"""
+Pruebas de las variables en memoria compartida
+
+Verifica:
+- Publicar arreglos y números y adjuntarlos sin copiar
+- Vistas de solo lectura
+- Uso desde un grupo de procesos
+- Eliminación de los bloques al cerrar
+
+Si NumPy no está instalado, las pruebas se omiten.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador
+import Vectores
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+def evaluar_en_proceso(expresion):
+    """Trabajo de un proceso: evalúa con las variables adjuntadas al iniciar"""
+    from MemoriaCompartida import VARIABLES_PROCESO
+    evaluador = Evaluador()
+    Vectores.habilitar_vectores(evaluador)
+    evaluador.entorno.update(VARIABLES_PROCESO)
+    return evaluar(evaluador, expresion).tolist()
+
+
+def test_publicar_y_adjuntar():
+    print("\n=== Prueba: Publicar y adjuntar ===")
+    if not Vectores.DISPONIBLE:
+        print("(NumPy no está instalado: prueba omitida)")
+        return
+    from MemoriaCompartida import MemoriaCompartida, adjuntar
+    numpy = Vectores.numpy
+    
+    with MemoriaCompartida() as memoria:
+        memoria.publicar("tabla", numpy.arange(6.0).reshape(2, 3))
+        memoria.publicar("factor", 10)
+        memoria.publicar_entorno({"n": numpy.array([1, 2, 3]), "texto": "hola"})
+        assert sorted(memoria.descriptores()) == ["factor", "n", "tabla"]
+        
+        evaluador = Evaluador()
+        valores = adjuntar(evaluador, memoria.descriptores())
+        tabla = evaluador.entorno["tabla"]
+        assert evaluar(evaluador, "tabla") is tabla  # Sin copias
+        assert not tabla.flags.writeable
+        assert evaluar(evaluador, "tabla * factor").tolist() == [[0, 10, 20], [30, 40, 50]]
+        assert evaluar(evaluador, "n + 1").tolist() == [2, 3, 4]
+        assert valores["factor"] == 10
+        print("✓ Variables adjuntadas como vistas de solo lectura")
+        
+        # Un proceso de trabajo adjunta los mismos bloques
+        from MemoriaCompartida import adjuntar_en_proceso
+        with ProcessPoolExecutor(1, initializer=adjuntar_en_proceso,
+                                 initargs=(memoria.descriptores(),)) as grupo:
+            assert grupo.submit(evaluar_en_proceso, "n * factor").result() == [10, 20, 30]
+        print("✓ Variables leídas desde otro proceso")
+        
+        bloque = memoria.descriptores()["tabla"].bloque
+    
+    try:
+        shared_memory.SharedMemory(name=bloque).close()
+        assert False, "El bloque debería haberse eliminado"
+    except FileNotFoundError:
+        print("✓ Bloques eliminados al cerrar")
+
+
+def test_valores_no_numericos():
+    print("\n=== Prueba: Valores no numéricos ===")
+    if not Vectores.DISPONIBLE:
+        print("(NumPy no está instalado: prueba omitida)")
+        return
+    from MemoriaCompartida import MemoriaCompartida
+    with MemoriaCompartida() as memoria:
+        try:
+            memoria.publicar("texto", ["a", "b"])
+            assert False, "Se esperaba TypeError"
+        except TypeError as e:
+            print(f"✓ {e}")
+
+
+if __name__ == "__main__":
+    test_publicar_y_adjuntar()
+    test_valores_no_numericos()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
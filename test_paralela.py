@@ -0,0 +1,117 @@
+"""
+Pruebas de la ejecución en paralelo de sentencias independientes
+
+Verifica:
+- Grafo de dependencias (variables, funciones y rand() en orden)
+- Misma salida y mismo entorno que la ejecución secuencial
+- Ejecución con un grupo de hilos y con un grupo de procesos
+- Un mismo grupo compartido por varias sesiones no mezcla sus funciones
+- Las sesiones de trabajo se reutilizan con copias de las mismas funciones
+"""
+
+import io
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from Evaluador import Evaluador
+from Sesion import Sesion
+import EjecucionParalela
+from EjecucionParalela import planificar, ejecutar_paralelo, ejecutar_paso
+
+
+SCRIPT = [
+    "f(n) = pow(3, n) % 1000007",
+    "a = f(4000)",
+    "b = f(4001)",
+    "r = rand();",
+    "s = rand()",
+    "a + b",
+    "x",
+    "y = (z = 5) + q",
+    "z",
+    "g(k) = k + a",
+    "a = 1",
+    "g(1)",
+    "sqrt(a + b)",
+]
+
+
+def _secuencial(lineas):
+    sesion = Sesion(Evaluador(semilla=7), salida=io.StringIO())
+    for linea in lineas:
+        sesion.ejecutar(linea)
+    return sesion
+
+
+def test_dependencias():
+    print("\n=== Prueba: Grafo de dependencias ===")
+    pasos = planificar(SCRIPT, Evaluador())
+    dependencias = {paso.fuente: paso.dependencias for paso in pasos}
+    assert dependencias["a = f(4000)"] == (0,) and dependencias["b = f(4001)"] == (0,)
+    assert dependencias["s = rand()"] == (3,)           # rand() conserva su orden
+    assert dependencias["a + b"] == (1, 2)
+    assert dependencias["z"] == (7,)                    # Asignación anidada
+    assert dependencias["a = 1"] == (1, 5)              # Escritura después de lectura
+    assert dependencias["g(1)"] == (9, 10)              # Lee 'a' a través de g
+    assert [paso.remoto for paso in pasos[:5]] == [False, True, True, False, False]
+    print("✓ Dependencias y sentencias remotas correctas")
+
+
+def test_equivalente_secuencial():
+    print("\n=== Prueba: Mismo resultado que la ejecución secuencial ===")
+    esperado = _secuencial(SCRIPT)
+    
+    with ThreadPoolExecutor(4) as ejecutor:
+        sesion = Sesion(Evaluador(semilla=7), salida=io.StringIO())
+        assert not ejecutar_paralelo(sesion, SCRIPT, ejecutor)
+    assert sesion.salida.getvalue() == esperado.salida.getvalue()
+    assert sesion.entorno == esperado.entorno
+    assert sesion.existen_errores and "'q'" in sesion.ultimo_error
+    print("✓ Grupo de hilos")
+    
+    sesion = Sesion(Evaluador(semilla=7), salida=io.StringIO())
+    ejecutar_paralelo(sesion, SCRIPT, procesos=2)
+    assert sesion.salida.getvalue() == esperado.salida.getvalue()
+    assert sesion.entorno == esperado.entorno
+    print("✓ Grupo de procesos")
+
+
+def test_ejecutor_compartido():
+    print("\n=== Prueba: Ejecutor compartido entre sesiones ===")
+    with ThreadPoolExecutor(1) as ejecutor:
+        propia = Sesion(salida=io.StringIO())
+        ejecutar_paralelo(propia, ["sin(x) = x * 2", "a = sin(1)", "c = sin(2)"], ejecutor)
+        assert propia.entorno == {"a": 2, "c": 4}
+        
+        otra = Sesion(salida=io.StringIO())
+        ejecutar_paralelo(otra, ["b = sin(1)", "d = cos(0)"], ejecutor)
+    assert abs(otra.entorno["b"] - 0.8414709848078965) < 1e-12 and otra.entorno["d"] == 1.0
+    print("✓ La redefinición de sin() no pasa a la otra sesión")
+
+
+
+def test_reutilizar_sesion():
+    print("\n=== Prueba: Reutilizar la sesión de trabajo ===")
+    pasos = planificar(SCRIPT, Evaluador())
+    a, b = pasos[1], pasos[2]
+    assert a.clave and a.clave == b.clave
+    # Como al cruzar a otro proceso: los ASA llegan como objetos nuevos
+    ejecutar_paso(a.fuente, pickle.loads(pickle.dumps(a.funciones)), {}, a.escrituras, None, a.clave)
+    sesion = EjecucionParalela._trabajo.sesion
+    _, error, cambios = ejecutar_paso(b.fuente, pickle.loads(pickle.dumps(b.funciones)), {},
+                                      b.escrituras, None, b.clave)
+    assert error is None and cambios == {"b": pow(3, 4001, 1000007)}
+    assert EjecucionParalela._trabajo.sesion is sesion
+    
+    otras = planificar(["f(n) = n + 1", "a = f(1)"], Evaluador())
+    assert otras[1].clave != a.clave
+    ejecutar_paso(otras[1].fuente, otras[1].funciones, {}, otras[1].escrituras, None, otras[1].clave)
+    assert EjecucionParalela._trabajo.sesion is not sesion
+    print("✓ Se reutiliza solo con las mismas definiciones")
+
+
+if __name__ == "__main__":
+    test_dependencias()
+    test_equivalente_secuencial()
+    test_ejecutor_compartido()
+    test_reutilizar_sesion()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,145 @@
+"""
+Pruebas del planificador de evaluaciones
+
+Verifica:
+- Resultados y orden de las evaluaciones de una sesión
+- Una consulta corta no espera a que termine una fórmula pesada
+- Prioridades y pesos
+- Los límites de presupuesto de la sesión siguen vigentes
+- Métricas y cierre
+"""
+
+import io
+import threading
+import time
+from concurrent.futures import CancelledError
+from Errores import ErrorPresupuesto
+from Planificador import Planificador
+from Presupuesto import Presupuesto
+from Sesion import Sesion
+
+
+def _pesada(niveles=17, presupuesto=None):
+    """Sesión con h2(a) = a + rand(), h3(a) = h2(a) + h2(a), ... (costo exponencial)"""
+    sesion = Sesion(presupuesto=presupuesto)
+    sesion.evaluar("h2(a) = a + rand()")
+    for i in range(2, niveles):
+        sesion.evaluar(f"h{i + 1}(a) = h{i}(a) + h{i}(a)")
+    return sesion
+
+
+def test_resultados_y_orden():
+    print("\n=== Prueba: Resultados y orden por sesión ===")
+    sesion = Sesion(salida=io.StringIO())
+    with Planificador(trabajadores=2) as planificador:
+        futuros = [planificador.enviar(sesion, f"x = {i}") for i in range(20)]
+        futuros.append(planificador.enviar(sesion, "x * 2"))
+        assert futuros[-1].result() == (38, True)
+        try:
+            planificador.enviar(sesion, "1 +").result()
+            assert False, "Debió fallar el análisis"
+        except Exception as ex:
+            print(f"✓ Error propagado al futuro: {type(ex).__name__}")
+        assert planificador.ejecutar(sesion, sesion.ejecutar, "x + 1").result()
+    assert sesion.salida.getvalue().splitlines()[-1] == "20"
+    assert sesion.presupuesto is None
+    print("✓ Evaluaciones en orden de envío")
+
+
+def test_consulta_corta():
+    print("\n=== Prueba: Consulta corta junto a una pesada ===")
+    lote = _pesada()
+    interactiva = Sesion()
+    with Planificador(trabajadores=1) as planificador:
+        pesada = planificador.enviar(lote, "h17(1)")
+        time.sleep(0.02)
+        inicio = time.perf_counter()
+        assert planificador.enviar(interactiva, "2 * 21").result() == (42, True)
+        espera = time.perf_counter() - inicio
+        assert not pesada.done()
+        assert espera < 0.1, espera
+        pesada.result()
+        assert planificador.cesiones > 0
+    print(f"✓ Respondida en {espera * 1e3:.1f} ms mientras la pesada continuaba")
+
+
+def test_prioridad_y_peso():
+    print("\n=== Prueba: Prioridades y pesos ===")
+    alta, baja = _pesada(16), _pesada(16)
+    with Planificador(trabajadores=1) as planificador:
+        planificador.registrar(alta, prioridad=0)
+        planificador.registrar(baja, prioridad=1)
+        futuro_baja = planificador.enviar(baja, "h16(1)")
+        futuro_alta = planificador.enviar(alta, "h16(1)")
+        futuro_alta.result()
+        assert not futuro_baja.done()
+        futuro_baja.result()
+    print("✓ La sesión prioritaria terminó primero")
+    
+    pesada, liviana = _pesada(17), _pesada(17)
+    with Planificador(trabajadores=1) as planificador:
+        planificador.registrar(pesada, peso=3.0)
+        planificador.registrar(liviana, peso=1.0)
+        futuros = [planificador.enviar(sesion, "h17(1)") for sesion in (pesada, liviana)]
+        futuros[0].result()
+        ejecucion_pesada = planificador.metricas(pesada)["ejecucion_ms"]
+        ejecucion_liviana = planificador.metricas(liviana)["ejecucion_ms"]
+        futuros[1].result()
+    proporcion = ejecucion_pesada / ejecucion_liviana
+    assert proporcion > 2.0, proporcion
+    print(f"✓ Peso 3 contra 1: recibió {proporcion:.1f} veces más tiempo")
+
+
+def test_presupuesto():
+    print("\n=== Prueba: Límites de la sesión ===")
+    sesion = _pesada(30, Presupuesto(pasos=20000))
+    sesion.evaluar("x = 1")
+    with Planificador(trabajadores=1) as planificador:
+        try:
+            planificador.enviar(sesion, "x = h30(1)").result()
+            assert False, "Debió agotarse el presupuesto"
+        except ErrorPresupuesto as ex:
+            print(f"✓ {ex}")
+    assert sesion.entorno["x"] == 1
+    assert type(sesion.presupuesto) is Presupuesto
+    print("✓ Asignación deshecha y presupuesto restaurado")
+
+
+def test_metricas_y_cierre():
+    print("\n=== Prueba: Métricas y cierre ===")
+    sesion = Sesion()
+    lote = _pesada()
+    planificador = Planificador(trabajadores=1)
+    for i in range(10):
+        planificador.enviar(sesion, f"{i} + 1").result()
+    metricas = planificador.metricas()
+    assert metricas["completadas"] == 10 and metricas["en_cola"] == 0
+    assert metricas["latencia_p50_ms"] <= metricas["latencia_p99_ms"] <= metricas["latencia_max_ms"]
+    assert planificador.metricas(sesion)["completadas"] == 10
+    print(f"✓ Latencia p50 {metricas['latencia_p50_ms']:.2f} ms")
+    
+    iniciada = planificador.enviar(lote, "h17(1)")
+    pendiente = planificador.enviar(lote, "h17(2)")
+    planificador.cerrar()
+    assert iniciada.result()[1]
+    assert not [hilo for hilo in threading.enumerate() if hilo.name == "planificador"]
+    try:
+        pendiente.result()
+        assert False, "Debió cancelarse"
+    except CancelledError:
+        pass
+    try:
+        planificador.enviar(sesion, "1")
+        assert False, "Debió rechazarse"
+    except RuntimeError:
+        pass
+    print("✓ Al cerrar terminan las iniciadas, se cancelan las pendientes y no quedan hilos")
+
+
+if __name__ == "__main__":
+    test_resultados_y_orden()
+    test_consulta_corta()
+    test_prioridad_y_peso()
+    test_presupuesto()
+    test_metricas_y_cierre()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,147 @@
+"""
+Pruebas de los presupuestos de evaluación
+
+Verifica:
+- Límite de pasos (incluidas las funciones del usuario)
+- Límite de memoria con una cadena que se duplica
+- Tiempo límite
+- Las asignaciones de una evaluación abortada se deshacen
+- También las funciones y las definiciones reactivas
+- Memoria de los resultados de las funciones nativas
+- Cancelación pedida antes de empezar una evaluación
+"""
+
+import time
+from Evaluador import ErrorSemantico
+from Errores import ErrorPresupuesto, ErrorCancelado
+from Presupuesto import Presupuesto
+from Reactivo import EvaluadorReactivo
+from Sesion import Sesion
+import Servidor
+
+
+def _duplicadoras(sesion, prefijo, base, niveles):
+    """Define f2(a) = base, f3(a) = f2(a) + f2(a), ... (costo exponencial)"""
+    sesion.evaluar(f"{prefijo}2(a) = {base}")
+    for i in range(2, niveles):
+        sesion.evaluar(f"{prefijo}{i + 1}(a) = {prefijo}{i}(a) + {prefijo}{i}(a)")
+
+
+def test_pasos():
+    print("\n=== Prueba: Límite de pasos ===")
+    presupuesto = Presupuesto(pasos=500)
+    sesion = Sesion(presupuesto=presupuesto)
+    sesion.evaluar("x = 1")
+    try:
+        sesion.evaluar("y = (x = 5) + " + " + ".join(["1"] * 300))
+        assert False, "Debió agotarse el presupuesto"
+    except ErrorPresupuesto as ex:
+        assert isinstance(ex, ErrorSemantico)
+        print(f"✓ {ex}")
+    assert presupuesto.pasos == 501
+    assert sesion.entorno == {"x": 1}  # Se deshicieron las dos asignaciones
+    print("✓ Asignaciones deshechas")
+    
+    # Las funciones del usuario también consumen pasos
+    _duplicadoras(sesion, "f", "a + rand()", 30)
+    try:
+        sesion.evaluar("z = f30(1)")
+        assert False, "Debió agotarse el presupuesto"
+    except ErrorPresupuesto:
+        pass
+    assert "z" not in sesion.entorno
+    assert sesion.evaluar("x + 1") == (2, True)
+    evaluador = sesion.evaluador
+    assert "evaluar" not in vars(evaluador) and evaluador.presupuesto is None
+    print("✓ Funciones del usuario limitadas y evaluador restaurado")
+
+
+def test_memoria_y_tiempo():
+    print("\n=== Prueba: Límites de memoria y de tiempo ===")
+    sesion = Sesion(presupuesto=Presupuesto(memoria=1 << 20))
+    _duplicadoras(sesion, "d", "a + a", 40)
+    try:
+        sesion.evaluar('texto = d40("abcdefgh")')
+        assert False, "Debió agotarse el presupuesto"
+    except ErrorPresupuesto as ex:
+        print(f"✓ {ex}")
+    
+    sesion = Sesion(presupuesto=Presupuesto(segundos=0.1))
+    _duplicadoras(sesion, "h", "a + rand()", 40)
+    inicio = time.perf_counter()
+    try:
+        sesion.evaluar("h40(1)")
+        assert False, "Debió agotarse el presupuesto"
+    except ErrorPresupuesto as ex:
+        transcurrido = time.perf_counter() - inicio
+        assert transcurrido < 1.0
+        print(f"✓ {ex} ({transcurrido:.2f} s)")
+
+    
+    # Los resultados de las funciones nativas también ocupan memoria
+    sesion = Sesion(presupuesto=Presupuesto(memoria=1 << 16))
+    sesion.evaluar("p(a) = pow(3, a)")
+    for linea in ("x = pow(3, 600000)", "x = p(600000)"):
+        try:
+            sesion.evaluar(linea)
+            assert False, "Debió agotarse el presupuesto"
+        except ErrorPresupuesto as ex:
+            print(f"✓ {linea}: {ex}")
+    assert "x" not in sesion.entorno
+    assert sesion.evaluar("p(4)") == (81, True)
+
+
+def test_definiciones_deshechas():
+    print("\n=== Prueba: Funciones y definiciones reactivas deshechas ===")
+    sesion = Sesion(EvaluadorReactivo(), presupuesto=Presupuesto(pasos=2000))
+    _duplicadoras(sesion, "d", "a + rand()", 20)
+    sesion.evaluar("f(a) = a + 1")
+    sesion.evaluar("x = 1")
+    sesion.evaluar("y = f(x)")
+    # Redefinir f recalcula y, y la nueva definición agota el presupuesto
+    try:
+        sesion.evaluar("f(a) = d20(a)")
+        assert False, "Debió agotarse el presupuesto"
+    except ErrorPresupuesto as ex:
+        print(f"✓ {ex}")
+    evaluador = sesion.evaluador
+    assert sesion.evaluar("f(5)") == (6, True)
+    assert evaluador.definiciones["y"].llamadas == frozenset({"f"})
+    assert sesion.evaluar("x = 2") == (2, True) and sesion.entorno["y"] == 3
+    print("✓ Se conserva la definición anterior de f y la de y")
+
+
+def test_cancelacion_pendiente():
+    print("\n=== Prueba: Cancelación antes de empezar ===")
+    presupuesto = Presupuesto(cancelable=True)
+    sesion = Sesion(presupuesto=presupuesto)
+    _duplicadoras(sesion, "c", "a + rand()", 12)
+    presupuesto.cancelar()
+    try:
+        sesion.evaluar("z = c12(1)")
+        assert False, "Debió cancelarse la evaluación"
+    except ErrorCancelado as ex:
+        print(f"✓ {ex}")
+    # La cancelación se aplica solo a la evaluación siguiente
+    sesion.evaluar("z = c12(1)")
+    assert sesion.entorno["z"] > 1024
+    print("✓ La evaluación siguiente no se cancela")
+
+
+def test_servidor():
+    print("\n=== Prueba: Presupuesto en el servidor ===")
+    sesion = Sesion(presupuesto=Presupuesto(pasos=100))
+    respuesta = Servidor.procesar(sesion, '{"id": 1, "codigo": "' + " + ".join(["1"] * 80) + '"}')
+    assert respuesta["tipo"] == "presupuesto"
+    respuesta = Servidor.procesar(sesion, '{"id": 2, "codigo": "1 + 1"}')
+    assert respuesta["ok"] and respuesta["resultado"] == 2
+    print("✓ Respuesta de tipo presupuesto")
+
+
+if __name__ == "__main__":
+    test_pasos()
+    test_memoria_y_tiempo()
+    test_definiciones_deshechas()
+    test_cancelacion_pendiente()
+    test_servidor()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,138 @@
+"""
+Pruebas del modo reactivo
+
+Verifica:
+- Recálculo de las definiciones dependientes en orden topológico
+- Que solo se recalcula lo afectado por el cambio
+- Detección de dependencias circulares
+- Errores durante el recálculo
+- Redefinición de funciones del usuario y asignaciones anidadas
+"""
+
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import ErrorSemantico
+from Reactivo import EvaluadorReactivo
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+def test_recalculo():
+    """Al cambiar una variable se actualizan sus dependientes"""
+    print("\n[TEST] Recálculo incremental")
+    evaluador = EvaluadorReactivo()
+    for sentencia in ("a = 4", "b = a * 2", "c = b + sqrt(a)", "x = 1", "y = x + 1"):
+        evaluar(evaluador, sentencia)
+    assert evaluador.entorno["c"] == 10.0
+    
+    evaluar(evaluador, "a = 9")
+    assert evaluador.entorno["b"] == 18
+    assert evaluador.entorno["c"] == 21.0
+    assert evaluador.ultimas_recalculadas == ["b", "c"]
+    
+    # Las funciones del usuario que leen variables también crean dependencias
+    evaluar(evaluador, "escala(v) = v * x")
+    evaluar(evaluador, "z = escala(a)")
+    evaluador.asignar("x", 2)
+    assert evaluador.entorno["z"] == 18
+    assert sorted(evaluador.ultimas_recalculadas) == ["y", "z"]
+    print(f"✓ Recalculadas: {evaluador.ultimas_recalculadas}")
+
+
+def test_ciclos():
+    """Las definiciones circulares se rechazan sin modificar el entorno"""
+    print("\n[TEST] Dependencias circulares")
+    evaluador = EvaluadorReactivo()
+    evaluar(evaluador, "a = 1")
+    evaluar(evaluador, "b = a + 1")
+    for sentencia, camino in (("a = b * 2", "a -> b -> a"), ("b = b + 1", "b -> b")):
+        try:
+            evaluar(evaluador, sentencia)
+            assert False, "Se esperaba un error semántico"
+        except ErrorSemantico as e:
+            assert camino in str(e)
+            print(f"✓ {e}")
+    assert evaluador.entorno == {"a": 1, "b": 2}
+
+
+def test_error_en_recalculo():
+    """Un error se informa y las dependientes conservan su valor"""
+    print("\n[TEST] Error durante el recálculo")
+    evaluador = EvaluadorReactivo()
+    evaluar(evaluador, "a = 1")
+    evaluar(evaluador, "b = 10 / a")
+    evaluar(evaluador, "c = b + 1")
+    try:
+        evaluar(evaluador, "a = 0")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "b (División por cero)" in str(e) and "c (depende de 'b')" in str(e)
+        print(f"✓ {e}")
+    assert evaluador.entorno["c"] == 11.0
+    
+    evaluar(evaluador, "a = 5")
+    assert evaluador.entorno["c"] == 3.0
+
+
+def test_redefinir_funcion():
+    """Redefinir una función recalcula sus llamadas con sus nuevas lecturas"""
+    print("\n[TEST] Redefinición de funciones")
+    evaluador = EvaluadorReactivo()
+    for sentencia in ("x = 1", "escala(v) = v * 2", "z = escala(3)",
+                      "f(v) = v + 1", "g(v) = f(v) * 10", "w = g(1)"):
+        evaluar(evaluador, sentencia)
+    assert evaluador.entorno["z"] == 6 and evaluador.entorno["w"] == 20
+    
+    evaluar(evaluador, "escala(v) = v * x")
+    assert evaluador.entorno["z"] == 3
+    evaluador.asignar("x", 5)
+    assert evaluador.entorno["z"] == 15
+    evaluar(evaluador, "f(v) = v + 2")
+    assert evaluador.entorno["w"] == 30
+    print("✓ Llamadas directas e indirectas recalculadas")
+    
+    try:
+        evaluar(evaluador, "escala(v) = v * z")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "z -> z" in str(e)
+        print(f"✓ {e}")
+    assert evaluar(evaluador, "escala(1)") == 5
+    evaluador.asignar("x", 2)
+    assert evaluador.entorno["z"] == 6
+
+
+def test_asignacion_anidada():
+    """Una asignación anidada propaga a las definiciones que leen su variable"""
+    print("\n[TEST] Asignaciones anidadas")
+    evaluador = EvaluadorReactivo()
+    for sentencia in ("a = 1", "b = (c = a * 2) + 1", "c = 100", "d = c + 1"):
+        evaluar(evaluador, sentencia)
+    assert evaluador.entorno["d"] == 101
+    
+    evaluar(evaluador, "a = 5")
+    assert evaluador.entorno["b"] == 11 and evaluador.entorno["c"] == 10
+    assert evaluador.entorno["d"] == 11
+    assert evaluador.ultimas_recalculadas == ["b", "d"]
+    
+    try:
+        evaluar(evaluador, "e = (c = 1) + d")
+        assert False, "Se esperaba un error semántico"
+    except ErrorSemantico as e:
+        assert "c -> d -> e -> c" in str(e)
+        print(f"✓ {e}")
+    print(f"✓ Recalculadas: {evaluador.ultimas_recalculadas}")
+
+
+if __name__ == "__main__":
+    test_recalculo()
+    test_ciclos()
+    test_error_en_recalculo()
+    test_redefinir_funcion()
+    test_asignacion_anidada()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
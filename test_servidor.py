@@ -0,0 +1,99 @@
+"""
+Pruebas del servidor de evaluación
+
+Verifica:
+- Una sesión independiente por conexión
+- Respuestas en orden con solicitudes encadenadas (pipelining)
+- Errores semánticos, de análisis y de protocolo
+- Cliente de carga
+"""
+
+import asyncio
+import json
+from Servidor import Servidor
+from carga_servidor import ejecutar_carga
+
+
+async def enviar_todo(puerto, solicitudes):
+    """Envía todas las solicitudes sin esperar y retorna las respuestas"""
+    lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+    for solicitud in solicitudes:
+        texto = solicitud if isinstance(solicitud, str) else json.dumps(solicitud)
+        escritor.write(texto.encode("utf-8") + b"\n")
+    await escritor.drain()
+    respuestas = [json.loads(await lector.readline()) for _ in solicitudes]
+    escritor.close()
+    await escritor.wait_closed()
+    return respuestas
+
+
+def test_sesiones_por_conexion():
+    print("\n=== Prueba: Sesiones por conexión ===")
+    
+    async def probar():
+        servidor = Servidor(puerto=0, max_pendientes=2)
+        _, puerto = await servidor.iniciar()
+        try:
+            uno, dos = await asyncio.gather(
+                enviar_todo(puerto, [{"id": i, "codigo": f"x = {i};"} for i in range(20)]
+                            + [{"id": "fin", "codigo": "x * 2"}]),
+                enviar_todo(puerto, [{"id": 1, "codigo": "x"}, {"id": 2, "codigo": '"a" + "b"'}]),
+            )
+        finally:
+            await servidor.cerrar()
+        
+        assert [r["id"] for r in uno] == list(range(20)) + ["fin"]
+        assert uno[-1] == {"id": "fin", "ok": True, "resultado": 38, "imprimir": True}
+        assert dos[0]["ok"] is False and dos[0]["tipo"] == "semantico"
+        assert dos[1]["resultado"] == "ab"
+        print("✓ Respuestas en orden y entornos separados")
+    
+    asyncio.run(probar())
+
+
+def test_errores():
+    print("\n=== Prueba: Errores ===")
+    
+    async def probar():
+        servidor = Servidor(puerto=0)
+        _, puerto = await servidor.iniciar()
+        try:
+            return await enviar_todo(puerto, [
+                {"id": 1, "codigo": "1 / 0"},
+                {"id": 2, "codigo": "(1 + "},
+                "esto no es json",
+                {"id": 4, "codigo": "1 / 0.0 + 0.5"},
+            ])
+        finally:
+            await servidor.cerrar()
+    
+    division, sintaxis, protocolo, ultimo = asyncio.run(probar())
+    assert division["tipo"] == "semantico" and "cero" in division["error"]
+    assert sintaxis["tipo"] == "analisis"
+    assert protocolo["tipo"] == "protocolo" and protocolo["id"] is None
+    assert ultimo["id"] == 4
+    print(f"✓ {division['error']} / {sintaxis['error']} / {protocolo['error']}")
+
+
+def test_carga():
+    print("\n=== Prueba: Cliente de carga ===")
+    
+    async def probar():
+        servidor = Servidor(puerto=0)
+        _, puerto = await servidor.iniciar()
+        try:
+            return await ejecutar_carga(puerto=puerto, conexiones=4, solicitudes=50, ventana=4)
+        finally:
+            await servidor.cerrar()
+    
+    resumen = asyncio.run(probar())
+    assert resumen["solicitudes"] == 200 and resumen["errores"] == 0
+    assert resumen["p50_ms"] <= resumen["p99_ms"] <= resumen["max_ms"]
+    print(f"✓ {resumen['por_segundo']:.0f} solicitudes/s, p99 {resumen['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    test_sesiones_por_conexion()
+    test_errores()
+    test_carga()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
@@ -0,0 +1,236 @@
+"""
+Pruebas de las imágenes de sesión
+
+Verifica:
+- Variables, funciones del usuario y rand() restaurados
+- Carga perezosa de las variables
+- Guardar de nuevo una sesión restaurada sin cargarla
+- Caché de ASA del intérprete
+- Sesiones aisladas en hilos concurrentes
+- Funciones nativas que no pueden volver a crearse y valores vectoriales
+- Cadenas concatenadas y variables que no pueden guardarse
+- Rechazo de archivos que no son imágenes
+"""
+
+import io
+import os
+import tempfile
+import threading
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador
+from Funciones import FuncionBuiltIn
+from Cuerda import aplanar
+from ImagenSesion import guardar_sesion, cargar_sesion, ErrorImagen, ImagenIncompleta
+from Interprete import Interprete
+from Sesion import Sesion, CacheASA
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+class FuncionDoble(FuncionBuiltIn):
+    """Función nativa agregada directamente a la tabla de un evaluador"""
+    
+    def __init__(self):
+        super().__init__("doble", 1, pura=True)
+    
+    def llamar(self, evaluador, argumentos):
+        return argumentos[0] * 2
+
+
+def test_guardar_y_restaurar():
+    print("\n=== Prueba: Guardar y restaurar ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        
+        original = Evaluador(semilla=7)
+        for linea in ('x = 3', 'saludo = "ho" + "la"', 'f(a) = a * x + 1', 'nada = null'):
+            evaluar(original, linea)
+        original.funciones["doble"] = FuncionDoble()
+        del original.funciones["cos"]
+        evaluar(original, "rand()")
+        
+        resumen = guardar_sesion(ruta, original)
+        assert resumen["variables"] == 3 and resumen["funciones"] == 1
+        # Al ejecutarse como script la clase está en __main__ y no se guarda
+        guardada = FuncionDoble.__module__ != "__main__"
+        assert resumen["funciones_omitidas"] == ([] if guardada else ["doble"])
+        assert not [n for n in os.listdir(directorio) if n != "sesion.img"]  # Sin temporales
+        
+        restaurado, _ = cargar_sesion(ruta)
+        entorno = restaurado.entorno
+        assert entorno.pendientes == 3
+        assert evaluar(restaurado, "f(2)") == 7
+        assert entorno.pendientes == 2  # Solo se leyó x
+        assert aplanar(evaluar(restaurado, "saludo")) == "hola"
+        if guardada:
+            assert evaluar(restaurado, "doble(21)") == 42
+        assert "cos" not in restaurado.funciones
+        assert evaluar(restaurado, "rand()") == evaluar(original, "rand()")
+        assert dict(entorno.items()) == {"x": 3, "saludo": "hola", "nada": None}
+        print("✓ Variables, funciones y rand() restaurados")
+
+
+def test_guardar_restaurada():
+    print("\n=== Prueba: Guardar una sesión restaurada ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        
+        original = Evaluador()
+        original.entorno.update({f"v{i}": i * i for i in range(1000)})
+        guardar_sesion(ruta, original)
+        
+        restaurado, _ = cargar_sesion(ruta)
+        evaluar(restaurado, "v1 = v2 + 1")
+        del restaurado.entorno["v3"]
+        
+        # Las variables pendientes se copian sin cargarse
+        guardar_sesion(ruta, restaurado)
+        assert restaurado.entorno.pendientes == 997
+        assert evaluar(restaurado, "v999") == 999 * 999
+        
+        otra, _ = cargar_sesion(ruta)
+        assert len(otra.entorno) == 999 and "v3" not in otra.entorno
+        assert evaluar(otra, "v1") == 5
+        print(f"✓ {len(otra.entorno)} variables tras guardar de nuevo")
+
+
+def test_cache_ast():
+    print("\n=== Prueba: Caché de ASA del intérprete ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        sesion_anterior = Interprete.sesion
+        try:
+            Interprete.sesion = Sesion(cache_ast=CacheASA())
+            Interprete.ejecutar("total = 2 + 3;")
+            Interprete.ejecutar("total = 2 + 3;")
+            assert Interprete.sesion.cache_ast.aciertos == 1
+            Interprete.guardar_sesion(ruta)
+            
+            Interprete.sesion = Sesion(cache_ast=CacheASA())
+            Interprete.restaurar_sesion(ruta)
+            assert "total = 2 + 3;" in Interprete.sesion.cache_ast
+            assert Interprete.sesion.entorno["total"] == 5
+        finally:
+            Interprete.sesion = sesion_anterior
+        print("✓ Caché restaurada")
+
+
+def test_sesiones_concurrentes():
+    print("\n=== Prueba: Sesiones concurrentes ===")
+    salida = io.StringIO()
+    sesiones = [Sesion(salida=salida) for _ in range(8)]
+    errores = []
+    
+    def trabajar(indice, sesion):
+        try:
+            sesion.evaluar(f"x = {indice}")
+            for _ in range(300):
+                # Todas las sesiones comparten el ASA de estas líneas
+                sesion.evaluar("x = x + 1")
+                sesion.evaluar("y = sqrt(x * x)")
+            sesion.ejecutar("variable_inexistente")
+        except Exception as e:
+            errores.append(e)
+    
+    hilos = [threading.Thread(target=trabajar, args=(i, s)) for i, s in enumerate(sesiones)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert not errores, errores
+    for indice, sesion in enumerate(sesiones):
+        assert sesion.entorno == {"x": indice + 300, "y": float(indice + 300)}
+        assert sesion.existen_errores and "variable_inexistente" in sesion.ultimo_error
+    print(f"✓ {len(sesiones)} sesiones aisladas")
+
+
+def test_funciones_no_construibles():
+    print("\n=== Prueba: Funciones nativas no construibles y vectores ===")
+    
+    class FuncionLocal(FuncionBuiltIn):
+        def __init__(self):
+            super().__init__("local", 0)
+        
+        def llamar(self, evaluador, argumentos):
+            return 1
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        original = Evaluador()
+        original.funciones["local"] = FuncionLocal()
+        evaluar(original, "x = 2")
+        try:
+            from Vectores import habilitar_vectores
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy is not None:
+            habilitar_vectores(original)
+            original.entorno["v"] = numpy.arange(3.0)
+        
+        resumen = guardar_sesion(ruta, original)
+        assert resumen["funciones_omitidas"] == ["local"]
+        restaurado, _ = cargar_sesion(ruta)
+        assert "local" not in restaurado.funciones
+        assert evaluar(restaurado, "sqrt(x * 8)") == 4.0
+        print("✓ La función local se omite y se informa")
+        
+        if numpy is not None:
+            assert restaurado.politica_vectores == original.politica_vectores
+            assert list(evaluar(restaurado, "sqrt(v * v) + 1")) == [1.0, 2.0, 3.0]
+            print("✓ Valores vectoriales habilitados al restaurar")
+
+
+def test_variables_omitidas():
+    print("\n=== Prueba: Cadenas concatenadas y variables omitidas ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "sesion.img")
+        sesion = Sesion(salida=io.StringIO())
+        sesion.evaluar('s = ""')
+        for _ in range(5000):
+            sesion.evaluar('s = s + "x"')
+        assert sesion.guardar(ruta)["omitidas"] == []
+        restaurada = Sesion.restaurar(ruta, CacheASA())
+        assert restaurada.entorno["s"] == "x" * 5000
+        print("✓ Una cadena concatenada 5000 veces se guarda y se restaura")
+        
+        sesion.entorno["candado"] = threading.Lock()
+        try:
+            sesion.guardar(ruta)
+            assert False, "Se esperaba ImagenIncompleta"
+        except ImagenIncompleta as e:
+            assert e.resumen["omitidas"] == ["candado"]
+            print(f"✓ {e}")
+        restaurada = Sesion.restaurar(ruta, CacheASA())
+        assert "candado" not in restaurada.entorno and len(restaurada.entorno["s"]) == 5000
+
+
+def test_archivo_invalido():
+    print("\n=== Prueba: Archivo inválido ===")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "otro.img")
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"no es una imagen")
+        try:
+            cargar_sesion(ruta)
+            assert False, "Se esperaba ErrorImagen"
+        except ErrorImagen as e:
+            print(f"✓ {e}")
+
+
+if __name__ == "__main__":
+    test_guardar_y_restaurar()
+    test_guardar_restaurada()
+    test_cache_ast()
+    test_sesiones_concurrentes()
+    test_funciones_no_construibles()
+    test_variables_omitidas()
+    test_archivo_invalido()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")
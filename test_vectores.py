@@ -0,0 +1,114 @@
+"""
+Pruebas de los valores vectoriales (NumPy)
+
+Verifica:
+- Operadores elemento a elemento con difusión
+- sin/cos/sqrt/pow sobre arreglos
+- Política estricta y política "nan" para los casos indefinidos
+- Desbordamiento de las operaciones enteras
+
+Si NumPy no está instalado, las pruebas se omiten.
+"""
+
+from Scanner import Scanner
+from Parser import Parser
+from Evaluador import Evaluador, ErrorSemantico
+import Vectores
+
+
+def evaluar(evaluador, expresion):
+    """Analiza, resuelve y evalúa una expresión"""
+    ast = Parser(Scanner(expresion).scan()).parse()
+    resultado, _ = evaluador.evaluar(evaluador.compilar(ast))
+    return resultado
+
+
+def crear_evaluador(politica="estricta"):
+    """Evaluador con vectores habilitados y dos columnas x, n"""
+    numpy = Vectores.numpy
+    evaluador = Evaluador()
+    Vectores.habilitar_vectores(evaluador, politica)
+    evaluador.entorno["x"] = numpy.array([1.0, 4.0, 9.0])
+    evaluador.entorno["n"] = numpy.array([1, 2, 3])
+    return evaluador
+
+
+def test_operadores_vectoriales():
+    """Los operadores y funciones se aplican elemento a elemento"""
+    print("\n[TEST] Operadores vectoriales")
+    if not Vectores.DISPONIBLE:
+        print("NumPy no está instalado, se omite")
+        return
+    evaluador = crear_evaluador()
+    
+    assert evaluar(evaluador, "x * 2 + 1").tolist() == [3.0, 9.0, 19.0]
+    assert evaluar(evaluador, "-n").tolist() == [-1, -2, -3]
+    assert evaluar(evaluador, "n % 2").tolist() == [1, 0, 1]
+    assert evaluar(evaluador, "sqrt(x)").tolist() == [1.0, 2.0, 3.0]
+    assert evaluar(evaluador, "pow(n, 2)").tolist() == [1, 4, 9]
+    
+    # Con escalares las funciones no cambian
+    assert evaluar(evaluador, "pow(2, 3)") == 8
+    assert evaluar(evaluador, "sqrt(4)") == 2.0
+    print("✓ Operaciones elemento a elemento")
+
+
+def test_politicas():
+    """Casos indefinidos con la política estricta y con la política nan"""
+    print("\n[TEST] Políticas de error")
+    if not Vectores.DISPONIBLE:
+        print("NumPy no está instalado, se omite")
+        return
+    
+    estricto = crear_evaluador()
+    for expresion, mensaje in (("x / (n - 1)", "División por cero"),
+                               ("n % (n - 1)", "Módulo por cero"),
+                               ("sqrt(x - 5)", "raíz cuadrada de un número negativo")):
+        try:
+            evaluar(estricto, expresion)
+            assert False, "Se esperaba un error semántico"
+        except ErrorSemantico as e:
+            assert mensaje in str(e)
+            print(f"✓ {expresion}: {e}")
+    
+    numpy = Vectores.numpy
+    ieee = crear_evaluador("nan")
+    division = evaluar(ieee, "x / (n - 1)")
+    assert numpy.isinf(division[0]) and division[1] == 4.0
+    assert numpy.isnan(evaluar(ieee, "n % (n - 1)")[0])
+    assert numpy.isnan(evaluar(ieee, "sqrt(x - 5)")).tolist() == [True, True, False]
+    print("✓ Política nan")
+
+
+def test_desbordamiento_entero():
+    """Las operaciones con enteros de 64 bits no dan la vuelta en silencio"""
+    print("\n[TEST] Desbordamiento entero")
+    if not Vectores.DISPONIBLE:
+        print("NumPy no está instalado, se omite")
+        return
+    numpy = Vectores.numpy
+    
+    estricto = crear_evaluador()
+    estricto.entorno["g"] = numpy.array([2 ** 62, -2 ** 63, 5])
+    for expresion in ("pow(n, 70)", "pow(n, 40)", "g + g", "g - 1", "n * g", "-g"):
+        try:
+            evaluar(estricto, expresion)
+            assert False, f"Se esperaba un desbordamiento en {expresion}"
+        except ErrorSemantico as e:
+            assert "Desbordamiento numérico" in str(e)
+            print(f"✓ {expresion}: {e}")
+    # Los resultados que caben siguen siendo enteros exactos
+    assert evaluar(estricto, "pow(n, 39)").tolist() == [1, 2 ** 39, 3 ** 39]
+    assert evaluar(estricto, "g * 1 + 0").tolist() == [2 ** 62, -2 ** 63, 5]
+    
+    ieee = crear_evaluador("nan")
+    potencia = evaluar(ieee, "pow(n, 70)")
+    assert potencia.dtype.kind == "f" and potencia.tolist() == [1.0, 2.0 ** 70, 3.0 ** 70]
+    print("✓ Política nan: el resultado se promueve a float")
+
+
+if __name__ == "__main__":
+    test_operadores_vectoriales()
+    test_politicas()
+    test_desbordamiento_entero()
+    print("\n[OK] TODAS LAS PRUEBAS COMPLETADAS")